@@ -4,9 +4,40 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def get_room_volume_comparison():
+from compact_dates import milestones_between
+from material_normalization import has_material_catalog, material_performance_summary
+from chart_cache import ChartCache, DEFAULT_CACHE_DIR
+
+# Chart specs; together with the plotted data they key the chart cache
+ROOM_VOLUMES_CHART = {
+    'kind': 'boxplot',
+    'x': 'project_name',
+    'y': 'volume_cubic_ft',
+    'title': 'Room Volume Distribution by Project',
+    'xlabel': 'Project',
+    'ylabel': 'Volume (cubic feet)',
+    'figsize': (12, 6),
+    'xtick_rotation': 45,
+}
+
+MATERIAL_PERFORMANCE_CHART = {
+    'kind': 'scatterplot',
+    'material_type': 'Room Treatment',
+    'x': 'cost_per_sqft',
+    'y': 'nrc_single_value',
+    'hue': 'material_name',
+    'marker_size': 100,
+    'title': 'NRC vs Cost for Room Treatment Materials',
+    'xlabel': 'Cost per Square Foot ($)',
+    'ylabel': 'NRC Rating',
+    'figsize': (12, 6),
+}
+
+def get_room_volume_comparison(db_path='project_management.db', conn=None):
     """Compare room volumes across all projects"""
-    conn = sqlite3.connect('project_management.db')
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
     
     query = """
     SELECT 
@@ -24,6 +55,8 @@ def get_room_volume_comparison():
     """
     
     df = pd.read_sql_query(query, conn)
+    if own_conn:
+        conn.close()
     
     # Create a summary by project
     project_summary = df.groupby('project_name').agg({
@@ -37,9 +70,15 @@ def get_room_volume_comparison():
     
     return df, project_summary
 
-def get_material_performance_comparison():
-    """Compare material performance and costs across projects"""
-    conn = sqlite3.connect('project_management.db')
+def get_material_performance_comparison(db_path='project_management.db', conn=None, include_rows=True):
+    """Compare material performance and costs across projects
+
+    Normalized databases aggregate over the shared catalog, so there the
+    per-material rows are only read with ``include_rows`` (df is None otherwise).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
     
     query = """
     SELECT 
@@ -55,7 +94,17 @@ def get_material_performance_comparison():
     JOIN projects p ON am.project_id = p.project_id
     """
     
-    df = pd.read_sql_query(query, conn)
+    normalized = has_material_catalog(conn)
+    df = None
+    if include_rows or not normalized:
+        df = pd.read_sql_query(query, conn)
+    
+    if normalized:
+        performance_summary = material_performance_summary(conn)
+    if own_conn:
+        conn.close()
+    if normalized:
+        return df, performance_summary
     
     # Create performance-cost summary
     performance_summary = df.groupby('material_type').agg({
@@ -67,56 +116,109 @@ def get_material_performance_comparison():
     
     return df, performance_summary
 
-def plot_room_volumes(df):
+def get_milestone_timeline(db_path='project_management.db', start_date=None, end_date=None):
+    """Milestones planned in a date range with their schedule slip in days"""
+    conn = sqlite3.connect(db_path)
+    milestones = milestones_between(conn, start_date, end_date)
+    projects = pd.read_sql_query('SELECT project_id, project_name FROM projects', conn)
+    conn.close()
+    
+    # Dates arrive as datetime64 arrays, so the slip is one vectorised subtraction
+    df = pd.DataFrame(milestones)
+    df['slip_days'] = (df['actual_date'] - df['planned_date']) / np.timedelta64(1, 'D')
+    df = df.merge(projects, on='project_id', how='left')
+    
+    slip_summary = df.groupby('milestone_type').agg({
+        'milestone_id': 'count',
+        'slip_days': ['mean', 'max']
+    }).round(2)
+    
+    return df, slip_summary
+
+def plot_room_volumes(df, output_path='room_volumes.png', cache=None):
     """Create visualizations for room volumes"""
-    plt.figure(figsize=(12, 6))
+    spec = ROOM_VOLUMES_CHART
+    data = df[[spec['x'], spec['y']]]
+    if cache is not None:
+        key = cache.key(data, spec)
+        if cache.fetch(key, output_path):
+            return
+    
+    plt.figure(figsize=spec['figsize'])
     
     # Create box plot of room volumes by project
-    sns.boxplot(data=df, x='project_name', y='volume_cubic_ft')
-    plt.xticks(rotation=45)
-    plt.title('Room Volume Distribution by Project')
-    plt.xlabel('Project')
-    plt.ylabel('Volume (cubic feet)')
+    sns.boxplot(data=data, x=spec['x'], y=spec['y'])
+    plt.xticks(rotation=spec['xtick_rotation'])
+    plt.title(spec['title'])
+    plt.xlabel(spec['xlabel'])
+    plt.ylabel(spec['ylabel'])
     plt.tight_layout()
-    plt.savefig('room_volumes.png')
+    plt.savefig(output_path)
     plt.close()
+    
+    if cache is not None:
+        cache.store(key, output_path)
 
-def plot_material_performance(df):
+def plot_material_performance(df, output_path='material_performance.png', cache=None):
     """Create visualizations for material performance vs cost"""
-    plt.figure(figsize=(12, 6))
+    spec = MATERIAL_PERFORMANCE_CHART
+    room_treatments = df.loc[df['material_type'] == spec['material_type'], [spec['x'], spec['y'], spec['hue']]]
+    if cache is not None:
+        key = cache.key(room_treatments, spec)
+        if cache.fetch(key, output_path):
+            return
+    
+    plt.figure(figsize=spec['figsize'])
     
     # Create scatter plot of NRC vs cost for room treatments
-    room_treatments = df[df['material_type'] == 'Room Treatment']
     sns.scatterplot(data=room_treatments, 
-                   x='cost_per_sqft', 
-                   y='nrc_single_value',
-                   hue='material_name',
-                   s=100)
-    plt.title('NRC vs Cost for Room Treatment Materials')
-    plt.xlabel('Cost per Square Foot ($)')
-    plt.ylabel('NRC Rating')
+                   x=spec['x'], 
+                   y=spec['y'],
+                   hue=spec['hue'],
+                   s=spec['marker_size'])
+    plt.title(spec['title'])
+    plt.xlabel(spec['xlabel'])
+    plt.ylabel(spec['ylabel'])
     plt.tight_layout()
-    plt.savefig('material_performance.png')
+    plt.savefig(output_path)
     plt.close()
+    
+    if cache is not None:
+        cache.store(key, output_path)
 
-def main():
-    # Get room volume analysis
-    room_df, room_summary = get_room_volume_comparison()
+def main(db_path='project_management.db', delta_dir=None, parallel=None, chart_cache_dir=DEFAULT_CACHE_DIR):
+    if parallel:
+        # Partitioned across worker processes; True uses every core
+        from parallel_analysis import analyze_parallel
+        workers = None if parallel is True else parallel
+        room_df, room_summary, material_df, material_summary = analyze_parallel(db_path, workers)
+    else:
+        room_df, room_summary = get_room_volume_comparison(db_path)
+        material_df, material_summary = get_material_performance_comparison(db_path)
+    
+    # Room volume analysis
     print("\nRoom Volume Analysis by Project:")
     print(room_summary)
     
-    # Get material performance analysis
-    material_df, material_summary = get_material_performance_comparison()
+    # Material performance analysis
     print("\nMaterial Performance Summary:")
     print(material_summary)
     
-    # Create visualizations
-    plot_room_volumes(room_df)
-    plot_material_performance(material_df)
+    # Create visualizations, reusing cached charts when their data is unchanged
+    cache = ChartCache(chart_cache_dir) if chart_cache_dir else None
+    plot_room_volumes(room_df, cache=cache)
+    plot_material_performance(material_df, cache=cache)
     
-    # Save detailed analysis to CSV
-    room_df.to_csv('room_analysis.csv', index=False)
-    material_df.to_csv('material_analysis.csv', index=False)
+    # Save detailed analysis, either in full or as changes since the last export
+    if delta_dir is not None:
+        from change_capture import export_deltas
+        conn = sqlite3.connect(db_path)
+        for path in export_deltas(conn, delta_dir):
+            print(f"Wrote {path}")
+        conn.close()
+    else:
+        room_df.to_csv('room_analysis.csv', index=False)
+        material_df.to_csv('material_analysis.csv', index=False)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,268 @@
+import sqlite3
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from create_project_database import create_database, generate_sample_data
+from generate_sample_data import (
+    generate_acoustic_material_data,
+    generate_equipment_data,
+    generate_equipment_spaces_data,
+    generate_email_correspondence,
+    generate_milestones,
+)
+from analyze_projects import (
+    get_room_volume_comparison,
+    get_material_performance_comparison,
+    plot_room_volumes,
+    plot_material_performance,
+)
+from database_migrations import DatabaseMigration
+
+# Each scale factor multiplies the 5 sample projects of create_project_database
+PROJECTS_PER_SCALE = 5
+DEFAULT_SCALES = (1, 10, 100, 1000)
+DEFAULT_THRESHOLD = 0.15
+BENCHMARK_MIGRATIONS = 20
+
+def _timed(func, *args, **kwargs):
+    """Call func and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def _best_of(repeat, func, *args, **kwargs):
+    """Best elapsed time over `repeat` calls, ignoring printed output"""
+    best = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            _, elapsed = _timed(func, *args, **kwargs)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def _count_rows(conn, table):
+    return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+def _rate(rows, seconds):
+    return round(rows / seconds, 1) if seconds > 0 else None
+
+def benchmark_generation(db_path, num_projects):
+    """Build a database and time rows/sec for each generated table"""
+    results = {}
+
+    conn, elapsed = _timed(create_database, db_path)
+    results['schema'] = {'rows': 0, 'seconds': elapsed, 'rows_per_sec': None}
+
+    _, elapsed = _timed(generate_sample_data, conn, num_projects)
+    rows = _count_rows(conn, 'projects')
+    results['projects'] = {'rows': rows, 'seconds': elapsed, 'rows_per_sec': _rate(rows, elapsed)}
+
+    projects = [
+        (project_id, datetime.strptime(start, '%Y-%m-%d'), datetime.strptime(end, '%Y-%m-%d'))
+        for project_id, start, end in conn.execute('SELECT project_id, start_date, end_date FROM projects')
+    ]
+
+    stages = [
+        ('acoustic_materials', lambda p: generate_acoustic_material_data(conn, p[0])),
+        ('equipment', lambda p: generate_equipment_data(conn, p[0])),
+        ('equipment_spaces', lambda p: generate_equipment_spaces_data(conn, p[0])),
+        ('email_correspondence', lambda p: generate_email_correspondence(conn, p[0], p[1])),
+        ('milestones', lambda p: generate_milestones(conn, p[0], p[1], p[2])),
+    ]
+
+    for table, generate in stages:
+        start = time.perf_counter()
+        for project in projects:
+            generate(project)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        rows = _count_rows(conn, table)
+        results[table] = {'rows': rows, 'seconds': elapsed, 'rows_per_sec': _rate(rows, elapsed)}
+
+    conn.close()
+    return results
+
+def benchmark_analysis(db_path, work_dir, repeat=1):
+    """Time the analysis queries and chart rendering"""
+    room_df, _ = get_room_volume_comparison(db_path)
+    material_df, _ = get_material_performance_comparison(db_path)
+
+    return {
+        'get_room_volume_comparison': _best_of(repeat, get_room_volume_comparison, db_path),
+        'get_material_performance_comparison': _best_of(repeat, get_material_performance_comparison, db_path),
+        'plot_room_volumes': _best_of(repeat, plot_room_volumes, room_df,
+                                      os.path.join(work_dir, 'room_volumes.png')),
+        'plot_material_performance': _best_of(repeat, plot_material_performance, material_df,
+                                              os.path.join(work_dir, 'material_performance.png')),
+    }
+
+def _write_benchmark_migrations(migrations_dir, count):
+    """Write self-contained migrations that do not depend on the project schema"""
+    for i in range(count):
+        version = f"V20000101{i:06d}"
+        migration = {
+            'version': version,
+            'name': f"benchmark_{i}",
+            'up': f"CREATE TABLE benchmark_{i} (id INTEGER PRIMARY KEY, value TEXT);\n"
+                  f"CREATE INDEX idx_benchmark_{i}_value ON benchmark_{i}(value);",
+            'down': f"DROP TABLE benchmark_{i};",
+            'checksum': f"benchmark-{i}",
+        }
+        with open(Path(migrations_dir) / f"{version}_benchmark_{i}.sql", 'w') as f:
+            json.dump(migration, f, indent=2)
+
+def benchmark_migrations(db_path, work_dir, count=BENCHMARK_MIGRATIONS):
+    """Time migrate() on the generated database and both refresh paths"""
+    migrations_dir = os.path.join(work_dir, 'migrations')
+
+    with redirect_stdout(io.StringIO()):
+        migrator = DatabaseMigration(db_path, migrations_dir)
+        _write_benchmark_migrations(migrations_dir, count)
+
+        _, migrate_seconds = _timed(migrator.migrate)
+        _, refresh_seconds = _timed(migrator.refresh_database)
+        migrator.create_baseline()
+        _, baseline_refresh_seconds = _timed(migrator.refresh_database)
+
+    return {
+        'migrations': count,
+        'migrate': migrate_seconds,
+        'refresh_database': refresh_seconds,
+        'refresh_database_baseline': baseline_refresh_seconds,
+    }
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=1, keep_dir=None):
+    """Run the full suite for each scale factor and return the results"""
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'scales': {},
+    }
+
+    for scale in scales:
+        work_dir = tempfile.mkdtemp(prefix=f"bench_sf{scale}_")
+        db_path = os.path.join(work_dir, 'project_management.db')
+        num_projects = scale * PROJECTS_PER_SCALE
+        print(f"Scale factor {scale}: {num_projects} projects")
+
+        try:
+            generation = benchmark_generation(db_path, num_projects)
+            file_size = os.path.getsize(db_path)
+            analysis = benchmark_analysis(db_path, work_dir, repeat)
+            migrations = benchmark_migrations(db_path, work_dir)
+        finally:
+            if keep_dir:
+                shutil.copytree(work_dir, os.path.join(keep_dir, f"sf{scale}"), dirs_exist_ok=True)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        results['scales'][str(scale)] = {
+            'projects': num_projects,
+            'file_size_bytes': file_size,
+            'generation': generation,
+            'analysis': analysis,
+            'migrations': migrations,
+        }
+
+    return results
+
+def _flatten_metrics(results):
+    """Map metric name to (value, higher_is_better) for comparison"""
+    metrics = {}
+    for scale, data in results['scales'].items():
+        prefix = f"sf{scale}"
+        metrics[f"{prefix}.file_size_bytes"] = (data['file_size_bytes'], False)
+        for table, stats in data['generation'].items():
+            if stats['rows_per_sec'] is not None:
+                metrics[f"{prefix}.generation.{table}.rows_per_sec"] = (stats['rows_per_sec'], True)
+        for name, seconds in data['analysis'].items():
+            metrics[f"{prefix}.analysis.{name}"] = (seconds, False)
+        for name, value in data['migrations'].items():
+            if name != 'migrations':
+                metrics[f"{prefix}.migrations.{name}"] = (value, False)
+    return metrics
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return regressions of `current` against `baseline` beyond `threshold`
+
+    Each regression is (metric, baseline value, current value, relative change).
+    """
+    current_metrics = _flatten_metrics(current)
+    baseline_metrics = _flatten_metrics(baseline)
+    regressions = []
+
+    for name, (value, higher_is_better) in current_metrics.items():
+        if name not in baseline_metrics:
+            continue
+        base_value = baseline_metrics[name][0]
+        if not base_value:
+            continue
+        change = (value - base_value) / base_value
+        worse = -change if higher_is_better else change
+        if worse > threshold:
+            regressions.append((name, base_value, value, change))
+
+    return regressions
+
+def print_results(results):
+    """Print a readable summary of benchmark results"""
+    for scale, data in results['scales'].items():
+        print(f"\nScale factor {scale} ({data['projects']} projects, "
+              f"{data['file_size_bytes'] / 1024:.1f} KiB)")
+        print("  Generation:")
+        for table, stats in data['generation'].items():
+            rate = f"{stats['rows_per_sec']:.0f} rows/s" if stats['rows_per_sec'] else '-'
+            print(f"    {table:<22} {stats['rows']:>9} rows {stats['seconds']:>9.4f}s  {rate}")
+        print("  Analysis:")
+        for name, seconds in data['analysis'].items():
+            print(f"    {name:<38} {seconds:.4f}s")
+        print("  Migrations:")
+        for name, value in data['migrations'].items():
+            if name != 'migrations':
+                print(f"    {name:<38} {value:.4f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Project database benchmark suite')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help='scale factors to run (default: 1 10 100 1000)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='repetitions per analysis timing, best is kept')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='where to write the JSON results')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='baseline JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown that counts as a regression')
+    parser.add_argument('--keep-dir', help='copy the generated databases here')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scales, args.repeat, args.keep_dir)
+    print_results(results)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {args.compare}:")
+            for name, base_value, value, change in regressions:
+                print(f"  {name}: {base_value:.4g} -> {value:.4g} ({change:+.1%})")
+            return 1
+        print(f"\nNo regressions against {args.compare}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
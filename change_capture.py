@@ -0,0 +1,235 @@
+import sqlite3
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (only needed for Parquet deltas)
+except ImportError:
+    pyarrow = None
+
+from compact_dates import is_compact_schema
+from material_normalization import has_material_catalog
+
+CHANGELOG_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS changelog (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    operation TEXT NOT NULL CHECK (operation IN ('I', 'U', 'D')),
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_changelog_table_row ON changelog(table_name, row_id);
+
+CREATE TABLE IF NOT EXISTS export_watermarks (
+    consumer TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    last_seq INTEGER NOT NULL,
+    exported_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (consumer, dataset)
+);
+'''
+
+# Exported datasets: the analyze_projects queries plus a key column. `sources`
+# map a logged table to SQL turning its changed row ids (temp.changes) into
+# dataset keys; sources marked normalized only apply to a normalized catalog.
+DATASETS = {
+    'room_analysis': {
+        'key': 'space_id',
+        'query': '''
+        SELECT es.space_id, p.project_name, p.client_name, es.space_name, es.space_type,
+               es.volume_cubic_ft, es.nc_requirement, es.rt60_500hz, es.background_noise_dba
+        FROM equipment_spaces es
+        JOIN projects p ON es.project_id = p.project_id
+        ''',
+        'key_column': 'es.space_id',
+        'sources': {
+            'equipment_spaces': "SELECT row_id FROM temp.changes WHERE table_name = 'equipment_spaces'",
+            'projects': '''SELECT es.space_id FROM temp.changes c
+                           JOIN equipment_spaces es ON es.project_id = c.row_id
+                           WHERE c.table_name = 'projects' ''',
+        },
+    },
+    'material_analysis': {
+        'key': 'material_id',
+        'query': '''
+        SELECT am.material_id, p.project_name, p.client_name, am.material_name, am.material_type,
+               am.nrc_single_value, am.stc_rating, am.iic_rating, am.cost_per_sqft
+        FROM acoustic_materials am
+        JOIN projects p ON am.project_id = p.project_id
+        ''',
+        'key_column': 'am.material_id',
+        'sources': {
+            'acoustic_materials': "SELECT row_id FROM temp.changes WHERE table_name = 'acoustic_materials'",
+            'projects': '''SELECT am.material_id FROM temp.changes c
+                           JOIN acoustic_materials am ON am.project_id = c.row_id
+                           WHERE c.table_name = 'projects' ''',
+            ('material_catalog', 'normalized'): '''SELECT pm.material_id FROM temp.changes c
+                           JOIN project_materials pm ON pm.catalog_id = c.row_id
+                           WHERE c.table_name = 'material_catalog' ''',
+        },
+    },
+}
+
+def _captured_tables(conn):
+    """(logged name, physical table, key column) for every table feeding the datasets"""
+    projects = 'projects_data' if is_compact_schema(conn) else 'projects'
+    captured = [('projects', projects, 'project_id'),
+                ('equipment_spaces', 'equipment_spaces', 'space_id')]
+    if has_material_catalog(conn):
+        captured += [('acoustic_materials', 'project_materials', 'material_id'),
+                     ('material_catalog', 'material_catalog', 'catalog_id')]
+    else:
+        captured.append(('acoustic_materials', 'acoustic_materials', 'material_id'))
+    return captured
+
+def enable_change_capture(conn):
+    """Create the changelog and its triggers; safe to re-run after schema migrations"""
+    conn.executescript(CHANGELOG_SCHEMA)
+    for logged, table, key in _captured_tables(conn):
+        for event, op, ref in (('INSERT', 'I', 'NEW'), ('UPDATE', 'U', 'NEW'), ('DELETE', 'D', 'OLD')):
+            conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS cdc_{table}_{event.lower()} AFTER {event} ON {table}
+            BEGIN
+                INSERT INTO changelog (table_name, row_id, operation) VALUES ('{logged}', {ref}.{key}, '{op}');
+            END
+            ''')
+    conn.commit()
+
+def disable_change_capture(conn):
+    """Drop the capture triggers (the changelog and watermarks are kept)"""
+    triggers = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'cdc\\_%' ESCAPE '\\'")]
+    for trigger in triggers:
+        conn.execute(f'DROP TRIGGER {trigger}')
+    conn.commit()
+
+def get_watermark(conn, dataset, consumer='default'):
+    row = conn.execute('SELECT last_seq FROM export_watermarks WHERE consumer = ? AND dataset = ?',
+                       (consumer, dataset)).fetchone()
+    return None if row is None else row[0]
+
+def _set_watermark(conn, dataset, consumer, seq):
+    conn.execute('''
+    INSERT INTO export_watermarks (consumer, dataset, last_seq, exported_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(consumer, dataset) DO UPDATE SET last_seq = excluded.last_seq, exported_at = excluded.exported_at
+    ''', (consumer, dataset, seq, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+def changed_rows(conn, dataset, since, until):
+    """Current rows of a dataset changed in (since, until], plus the keys of deleted rows"""
+    spec = DATASETS[dataset]
+    normalized = has_material_catalog(conn)
+    conn.execute('DROP TABLE IF EXISTS temp.changes')
+    conn.execute('CREATE TEMP TABLE changes AS SELECT DISTINCT table_name, row_id FROM changelog '
+                 'WHERE seq > ? AND seq <= ?', (since, until))
+    sources = [sql for source, sql in spec['sources'].items()
+               if not (isinstance(source, tuple) and not normalized)]
+
+    conn.execute('DROP TABLE IF EXISTS temp.delta_keys')
+    conn.execute('CREATE TEMP TABLE delta_keys (key INTEGER PRIMARY KEY)')
+    conn.execute(f"INSERT OR IGNORE INTO temp.delta_keys {' UNION '.join(sources)}")
+
+    current = pd.read_sql_query(
+        f"{spec['query']} WHERE {spec['key_column']} IN (SELECT key FROM temp.delta_keys)", conn)
+    keys = [row[0] for row in conn.execute('SELECT key FROM temp.delta_keys')]
+    conn.execute('DROP TABLE temp.changes')
+    conn.execute('DROP TABLE temp.delta_keys')
+
+    deleted = sorted(set(keys) - set(current[spec['key']]))
+    return current, deleted
+
+def _write_delta(df, path, fmt):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == 'parquet':
+        if pyarrow is None:
+            raise RuntimeError("Parquet deltas require pyarrow (pip install pyarrow)")
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+def export_deltas(conn, output_dir='deltas', consumer='default', datasets=None, fmt='csv', compact=True):
+    """Write rows changed since each dataset's watermark as append-only delta files.
+
+    The first export for a consumer is a full snapshot. Each file is named
+    ``<dataset>_<from seq>_<to seq>.<fmt>`` and carries a ``change_op`` column
+    (``upsert`` with the current row, or ``delete`` with only the key).
+    Watermarks only move once the file is written. Returns the paths written.
+    """
+    enable_change_capture(conn)
+    until = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM changelog').fetchone()[0]
+    written = []
+
+    for dataset in datasets or DATASETS:
+        spec = DATASETS[dataset]
+        since = get_watermark(conn, dataset, consumer)
+        snapshot = since is None
+        if snapshot:
+            df = pd.read_sql_query(spec['query'], conn)
+            df.insert(0, 'change_op', 'upsert')
+            since = 0
+        elif since >= until:
+            continue
+        else:
+            current, deleted = changed_rows(conn, dataset, since, until)
+            current.insert(0, 'change_op', 'upsert')
+            df = current
+            if deleted:
+                df = pd.concat([current, pd.DataFrame({'change_op': 'delete', spec['key']: deleted})],
+                               ignore_index=True)
+                df[spec['key']] = df[spec['key']].astype('int64')
+
+        # Changes that don't touch this dataset only move its watermark
+        if snapshot or not df.empty:
+            path = Path(output_dir) / dataset / f"{dataset}_{since:012d}_{until:012d}.{fmt}"
+            _write_delta(df, path, fmt)
+            written.append(path)
+        _set_watermark(conn, dataset, consumer, until)
+        conn.commit()
+
+    if compact:
+        compact_changelog(conn)
+    return written
+
+def compact_changelog(conn):
+    """Drop changelog entries every consumer has exported, and older duplicates of the rest.
+
+    Only the newest entry per (table, row) is needed to find changed rows,
+    so anything superseded by a later entry is removed too. Returns the
+    number of entries deleted.
+    """
+    low = conn.execute('SELECT MIN(last_seq) FROM export_watermarks').fetchone()[0]
+    deleted = 0
+    if low is not None:
+        deleted += conn.execute('DELETE FROM changelog WHERE seq <= ?', (low,)).rowcount
+    deleted += conn.execute('''
+    DELETE FROM changelog
+    WHERE seq NOT IN (SELECT MAX(seq) FROM changelog GROUP BY table_name, row_id)
+    ''').rowcount
+    conn.commit()
+    return deleted
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export rows changed since the last export')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--output-dir', default='deltas')
+    parser.add_argument('--consumer', default='default')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--datasets', nargs='*', choices=list(DATASETS))
+    parser.add_argument('--no-compact', action='store_true', help='keep consumed changelog entries')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    written = export_deltas(conn, args.output_dir, args.consumer, args.datasets, args.format,
+                            compact=not args.no_compact)
+    conn.close()
+    for path in written:
+        print(f"Wrote {path}")
+    if not written:
+        print("No changes since the last export.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = '.chart_cache'
+MAX_ENTRIES = 500
+MAX_BYTES = 200 * 1024 * 1024
+
+class ChartCache:
+    """Directory of rendered charts keyed by the data and spec that produced them.
+
+    ``key(frame, spec)`` hashes the exact DataFrame slice feeding a chart
+    (values, column names and row order, via ``pd.util.hash_pandas_object``)
+    together with the chart spec. On a hit ``fetch`` copies the stored file
+    to the output path and the chart is not drawn; after a miss the plot
+    function draws it and calls ``store``. Entries are evicted least
+    recently used first once the cache exceeds ``max_entries`` files or
+    ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(frame, spec):
+        digest = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode())
+        digest.update(json.dumps([str(column) for column in frame.columns]).encode())
+        digest.update(json.dumps([str(dtype) for dtype in frame.dtypes]).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def _entry(self, key, output_path):
+        # The file format follows the output extension, so it is part of the entry name
+        return self.cache_dir / f"{key}{Path(output_path).suffix}"
+
+    def fetch(self, key, output_path):
+        """Copy a cached chart to output_path; returns False on a miss"""
+        entry = self._entry(key, output_path)
+        if not entry.exists():
+            self.misses += 1
+            return False
+        shutil.copyfile(entry, output_path)
+        os.utime(entry)  # mark as recently used
+        self.hits += 1
+        return True
+
+    def store(self, key, output_path):
+        """Keep a freshly rendered chart, then evict old entries"""
+        entry = self._entry(key, output_path)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(output_path, temp_path)
+        os.replace(temp_path, entry)
+        self.evict()
+
+    def entries(self):
+        """Cached files, least recently used first"""
+        files = [path for path in self.cache_dir.iterdir() if path.is_file() and path.suffix != '.tmp']
+        return sorted(files, key=lambda path: path.stat().st_mtime)
+
+    def evict(self):
+        """Drop least recently used entries beyond the limits; returns the number removed"""
+        files = self.entries()
+        total = sum(path.stat().st_size for path in files)
+        removed = 0
+        while files and (len(files) > self.max_entries or total > self.max_bytes):
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def clear(self):
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect or clear the rendered chart cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args(argv)
+
+    cache = ChartCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+    entries = cache.entries()
+    size = sum(path.stat().st_size for path in entries)
+    print(f"{len(entries)} cached charts, {size / 1e6:.1f} MB in {cache.cache_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import sqlite3
+import re
+import numpy as np
+
+from create_project_database import SCHEMA_SQL
+
+# Date columns stored as integers in the compact schema variant:
+# 'day' columns hold days since 1970-01-01, 'second' columns hold Unix seconds
+DATE_COLUMNS = {
+    'projects': {'start_date': 'day', 'end_date': 'day', 'created_at': 'second'},
+    'astm_tests': {'test_date': 'day'},
+    'budget': {'last_updated': 'day'},
+    'email_correspondence': {'sent_date': 'second'},
+    'deliverables': {'due_date': 'day', 'submission_date': 'day'},
+    'milestones': {'planned_date': 'day', 'actual_date': 'day'},
+}
+
+# Range-query indexes on the integer storage tables
+COMPACT_DATE_INDEXES = '''
+CREATE INDEX IF NOT EXISTS idx_projects_data_start ON projects_data(start_date);
+CREATE INDEX IF NOT EXISTS idx_milestones_data_planned ON milestones_data(planned_date);
+CREATE INDEX IF NOT EXISTS idx_milestones_data_project_planned ON milestones_data(project_id, planned_date);
+CREATE INDEX IF NOT EXISTS idx_email_data_sent ON email_correspondence_data(sent_date);
+CREATE INDEX IF NOT EXISTS idx_email_data_project_sent ON email_correspondence_data(project_id, sent_date);
+CREATE INDEX IF NOT EXISTS idx_deliverables_data_due ON deliverables_data(due_date);
+'''
+
+_INSERT_COLUMNS = re.compile(r'INSERT\s+INTO\s+\w+\s*\((.*?)\)', re.S | re.I)
+
+def storage_table(table):
+    """Name of the table holding the rows of `table` in the compact variant"""
+    return f"{table}_data" if table in DATE_COLUMNS else table
+
+def is_compact_schema(conn):
+    """True if the database uses the integer date schema variant"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_data'"
+    ).fetchone()
+    return row is not None
+
+# SQL conversions
+
+def _to_storage_sql(expr, unit):
+    """SQL turning an ISO string (or an already-encoded integer) into storage form"""
+    if unit == 'day':
+        encoded = f"CAST(julianday({expr}) - 2440587.5 AS INTEGER)"
+    else:
+        encoded = f"CAST(strftime('%s', {expr}) AS INTEGER)"
+    return f"CASE WHEN typeof({expr}) = 'integer' THEN {expr} ELSE {encoded} END"
+
+def _to_iso_sql(column, unit):
+    if unit == 'day':
+        return f"date({column} * 86400, 'unixepoch')"
+    return f"datetime({column}, 'unixepoch')"
+
+def _column_ddl(column, unit):
+    _, name, col_type, not_null, default, pk = column
+    if unit:
+        col_type = 'INTEGER'
+        if default == 'CURRENT_TIMESTAMP':
+            default = "(CAST(strftime('%s', 'now') AS INTEGER))"
+    parts = [name, col_type]
+    if pk:
+        parts.append('PRIMARY KEY')
+    if not_null:
+        parts.append('NOT NULL')
+    if default is not None:
+        parts.append(f'DEFAULT {default}')
+    return ' '.join(parts)
+
+def _table_sql(table, columns, foreign_keys):
+    """DDL for one storage table, with foreign keys pointing at storage tables"""
+    dates = DATE_COLUMNS.get(table, {})
+    lines = [_column_ddl(column, dates.get(column[1])) for column in columns]
+    for fk in foreign_keys:
+        _, _, ref_table, from_col, to_col = fk[:5]
+        lines.append(f"FOREIGN KEY ({from_col}) REFERENCES {storage_table(ref_table)}({to_col})")
+    body = ',\n    '.join(lines)
+    return f"CREATE TABLE IF NOT EXISTS {storage_table(table)} (\n    {body}\n);"
+
+def _view_sql(table, columns):
+    """Compatibility view presenting the integer columns as ISO strings"""
+    dates = DATE_COLUMNS[table]
+    select = []
+    for column in columns:
+        name = column[1]
+        if name in dates:
+            select.append(f"{_to_iso_sql(name, dates[name])} AS {name}")
+        else:
+            select.append(name)
+    return f"CREATE VIEW IF NOT EXISTS {table} AS SELECT {', '.join(select)} FROM {storage_table(table)};"
+
+def _trigger_sql(table, columns):
+    """INSTEAD OF triggers so existing INSERT/UPDATE/DELETE statements keep working"""
+    dates = DATE_COLUMNS[table]
+    data_table = storage_table(table)
+    pk = next(column[1] for column in columns if column[5])
+    names = [column[1] for column in columns]
+
+    def value(column):
+        # Omitted columns arrive as NULL in NEW, so re-apply column defaults
+        name, default = column[1], column[4]
+        expr = f"NEW.{name}"
+        if name in dates:
+            expr = _to_storage_sql(expr, dates[name])
+            if default == 'CURRENT_TIMESTAMP':
+                expr = f"COALESCE({expr}, CAST(strftime('%s', 'now') AS INTEGER))"
+        elif default is not None:
+            expr = f"COALESCE({expr}, {default})"
+        return expr
+
+    values = ', '.join(value(column) for column in columns)
+    assignments = ', '.join(f"{column[1]} = {value(column)}" for column in columns)
+    return f'''
+CREATE TRIGGER IF NOT EXISTS {table}_insert INSTEAD OF INSERT ON {table}
+BEGIN
+    INSERT INTO {data_table} ({', '.join(names)}) VALUES ({values});
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_update INSTEAD OF UPDATE ON {table}
+BEGIN
+    UPDATE {data_table} SET {assignments} WHERE {pk} = OLD.{pk};
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_delete INSTEAD OF DELETE ON {table}
+BEGIN
+    DELETE FROM {data_table} WHERE {pk} = OLD.{pk};
+END;
+'''
+
+def compact_schema_sql():
+    """Full DDL of the integer date schema variant"""
+    template = sqlite3.connect(':memory:')
+    template.executescript(SCHEMA_SQL)
+    tables = [row[0] for row in template.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid")]
+
+    statements = []
+    views = []
+    for table in tables:
+        columns = template.execute(f'PRAGMA table_info({table})').fetchall()
+        foreign_keys = template.execute(f'PRAGMA foreign_key_list({table})').fetchall()
+        statements.append(_table_sql(table, columns, foreign_keys))
+        if table in DATE_COLUMNS:
+            views.append(_view_sql(table, columns))
+            views.append(_trigger_sql(table, columns))
+    template.close()
+
+    return '\n\n'.join(statements + views) + '\n' + COMPACT_DATE_INDEXES
+
+def create_compact_schema(conn):
+    """Create the integer date variant of the project schema on a connection"""
+    conn.executescript(compact_schema_sql())
+    conn.commit()
+
+# Vectorised conversions
+
+def to_epoch_days(values):
+    """ISO date strings (or datetimes) to epoch days; None/NaT become None"""
+    days = np.asarray(values, dtype='datetime64[D]')
+    return _with_nulls(days.astype(np.int64), np.isnat(days))
+
+def to_epoch_seconds(values):
+    """ISO timestamps (or datetimes) to Unix seconds; None/NaT become None"""
+    seconds = np.asarray(values, dtype='datetime64[s]')
+    return _with_nulls(seconds.astype(np.int64), np.isnat(seconds))
+
+def _with_nulls(encoded, missing):
+    if not missing.any():
+        return encoded.tolist()
+    return [None if null else value for value, null in zip(encoded.tolist(), missing.tolist())]
+
+def from_epoch_days(values):
+    """Epoch days to a datetime64[D] array (None becomes NaT)"""
+    return _from_epoch(values, 'datetime64[D]')
+
+def from_epoch_seconds(values):
+    """Unix seconds to a datetime64[s] array (None becomes NaT)"""
+    return _from_epoch(values, 'datetime64[s]')
+
+def _from_epoch(values, dtype):
+    values = np.asarray(values, dtype=object)
+    missing = np.equal(values, None)
+    encoded = np.where(missing, 0, values).astype(np.int64).astype(dtype)
+    encoded[missing] = np.datetime64('NaT')
+    return encoded
+
+# Loading and querying
+
+def insert_columns(insert_sql):
+    """Column names of an ``INSERT INTO table (...) VALUES`` statement"""
+    match = _INSERT_COLUMNS.search(insert_sql)
+    return [column.strip() for column in match.group(1).split(',')]
+
+def bulk_load(conn, table, columns, rows, skip_existing=False):
+    """Insert rows straight into a storage table, encoding date columns with NumPy.
+
+    This bypasses the compatibility view's triggers, so each date column is
+    converted once per batch instead of once per row in SQL. With
+    ``skip_existing`` rows conflicting with a unique index are skipped.
+    """
+    if not rows:
+        return
+    dates = DATE_COLUMNS.get(table, {})
+    if dates:
+        transposed = list(zip(*rows))
+        for index, column in enumerate(columns):
+            unit = dates.get(column)
+            if unit == 'day':
+                transposed[index] = to_epoch_days(transposed[index])
+            elif unit == 'second':
+                transposed[index] = to_epoch_seconds(transposed[index])
+        rows = list(zip(*transposed))
+    placeholders = ', '.join('?' for _ in columns)
+    sql = f"INSERT INTO {storage_table(table)} ({', '.join(columns)}) VALUES ({placeholders})"
+    if skip_existing:
+        sql += ' ON CONFLICT DO NOTHING'
+    conn.executemany(sql, rows)
+
+def _range_query(conn, table, date_column, columns, start, end, project_id=None):
+    """Rows of `table` with `date_column` in [start, end), using integer bounds when compact"""
+    compact = is_compact_schema(conn)
+    unit = DATE_COLUMNS[table][date_column]
+    source = storage_table(table) if compact else table
+    conditions = []
+    params = []
+    for bound, op in ((start, '>='), (end, '<')):
+        if bound is None:
+            continue
+        if compact:
+            bound = (to_epoch_days if unit == 'day' else to_epoch_seconds)([bound])[0]
+        elif not isinstance(bound, str):
+            bound = str(np.datetime64(bound, 'D' if unit == 'day' else 's')).replace('T', ' ')
+        conditions.append(f"{date_column} {op} ?")
+        params.append(bound)
+    if project_id is not None:
+        conditions.append("project_id = ?")
+        params.append(project_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    cursor = conn.execute(
+        f"SELECT {', '.join(columns)} FROM {source} {where} ORDER BY {date_column}", params)
+    return compact, cursor.fetchall()
+
+def _decode_column(values, unit, compact):
+    if compact:
+        return from_epoch_days(values) if unit == 'day' else from_epoch_seconds(values)
+    dtype = 'datetime64[D]' if unit == 'day' else 'datetime64[s]'
+    return np.asarray(values, dtype=dtype)
+
+def milestones_between(conn, start=None, end=None, project_id=None):
+    """Milestones planned in [start, end) as columns, with datetime64 date arrays"""
+    columns = ['milestone_id', 'project_id', 'milestone_name', 'milestone_type',
+               'planned_date', 'actual_date', 'status']
+    compact, rows = _range_query(conn, 'milestones', 'planned_date', columns, start, end, project_id)
+    data = dict(zip(columns, map(list, zip(*rows)))) if rows else {c: [] for c in columns}
+    data['planned_date'] = _decode_column(data['planned_date'], 'day', compact)
+    data['actual_date'] = _decode_column(data['actual_date'], 'day', compact)
+    return data
+
+def emails_between(conn, start=None, end=None, project_id=None):
+    """Emails sent in [start, end) as columns, with a datetime64 sent_date array"""
+    columns = ['email_id', 'project_id', 'sender', 'recipient', 'subject', 'sent_date', 'is_read']
+    compact, rows = _range_query(conn, 'email_correspondence', 'sent_date', columns, start, end, project_id)
+    data = dict(zip(columns, map(list, zip(*rows)))) if rows else {c: [] for c in columns}
+    data['sent_date'] = _decode_column(data['sent_date'], 'second', compact)
+    return data
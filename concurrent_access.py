@@ -0,0 +1,216 @@
+import sqlite3
+import sys
+import time
+import queue
+import random
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+
+def enable_wal(db_path='project_management.db'):
+    """Switch a database to WAL so readers and the writer don't block each other.
+
+    The journal mode is stored in the database file, so this only needs to
+    run once. Returns the resulting journal mode.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+    finally:
+        conn.close()
+    return mode
+
+def configure_connection(conn, busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS):
+    """Per-connection settings for concurrent use"""
+    conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    return conn
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+def with_retry(func, *args, retries=8, base_delay=0.05, max_delay=2.0, **kwargs):
+    """Call func, retrying with jittered exponential backoff while the database is busy"""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+class ReadPool:
+    """Fixed pool of read-only connections for analysis queries.
+
+    Connections are opened with ``mode=ro`` and shared across threads, one
+    thread at a time. ``snapshot()`` holds a read transaction open so every
+    query in the block sees the same committed state, even while the writer
+    keeps committing.
+    """
+
+    def __init__(self, db_path='project_management.db', size=4, busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS):
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._connections = queue.Queue()
+        self._executor = None
+        self._lock = threading.Lock()
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+            conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection (autocommit: each statement is its own snapshot)"""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    @contextmanager
+    def snapshot(self):
+        """Borrow a connection inside one read transaction"""
+        with self.connection() as conn:
+            with_retry(conn.execute, 'BEGIN')
+            try:
+                # A read transaction only pins its snapshot at the first read
+                with_retry(lambda: conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone())
+                yield conn
+            finally:
+                conn.execute('COMMIT')
+
+    def submit(self, func, *args, **kwargs):
+        """Run func(conn, *args, **kwargs) in a snapshot on a pool thread; returns a Future"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='read-pool')
+
+        def run():
+            with self.snapshot() as conn:
+                return func(conn, *args, **kwargs)
+        return self._executor.submit(run)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class WriterQueue:
+    """Single writer thread owning the only write connection.
+
+    ``submit(func, *args)`` queues ``func(conn, *args)`` and returns a
+    Future. Each job runs in its own transaction and is committed when it
+    returns; a job that hits a busy database is rolled back and retried with
+    backoff.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path='project_management.db', busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS,
+                 retries=8):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.retries = retries
+        self._jobs = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='writer-queue', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        conn = configure_connection(sqlite3.connect(self.db_path), self.busy_timeout_ms)
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is self._STOP:
+                    break
+                future, func, args, kwargs = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = with_retry(self._run_job, conn, func, args, kwargs, retries=self.retries)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _run_job(conn, func, args, kwargs):
+        try:
+            result = func(conn, *args, **kwargs)
+            conn.commit()
+            return result
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def submit(self, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError('WriterQueue is closed')
+        future = Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future
+
+    def close(self):
+        """Finish queued jobs and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._jobs.put(self._STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _analyze(conn):
+    from analyze_projects import get_room_volume_comparison, get_material_performance_comparison
+    return get_room_volume_comparison(conn=conn), get_material_performance_comparison(conn=conn)
+
+def analyze_snapshot(pool):
+    """Room and material analysis from one consistent snapshot"""
+    return pool.submit(_analyze).result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run analysis against a database that is being written')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--interval', type=float, default=0,
+                        help='repeat the analysis every N seconds (0 runs it once)')
+    args = parser.parse_args(argv)
+
+    print(f"Journal mode: {enable_wal(args.db)}")
+    with ReadPool(args.db, args.readers) as pool:
+        while True:
+            (_, room_summary), (_, material_summary) = analyze_snapshot(pool)
+            print("\nRoom Volume Analysis by Project:")
+            print(room_summary)
+            print("\nMaterial Performance Summary:")
+            print(material_summary)
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+import sqlite3
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from concurrent_access import is_busy_error
+
+DEFAULT_DURATION = 5.0
+DEFAULT_PROJECTS = 50
+
+class WorkloadConfig:
+    """One point in the contention matrix"""
+
+    __slots__ = ('writers', 'readers', 'mode', 'journal_mode', 'busy_timeout_ms', 'batch_size', 'duration')
+
+    def __init__(self, writers=4, readers=4, mode='thread', journal_mode='wal', busy_timeout_ms=5000,
+                 batch_size=100, duration=DEFAULT_DURATION):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"mode must be 'thread' or 'process', got {mode!r}")
+        self.writers = writers
+        self.readers = readers
+        self.mode = mode
+        self.journal_mode = journal_mode
+        self.busy_timeout_ms = busy_timeout_ms
+        self.batch_size = batch_size
+        self.duration = duration
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def label(self):
+        return (f"{self.mode} w{self.writers}/r{self.readers} {self.journal_mode} "
+                f"busy={self.busy_timeout_ms}ms batch={self.batch_size}")
+
+# Database setup
+
+def prepare_database(target, journal_mode, source=None, num_projects=DEFAULT_PROJECTS):
+    """Fresh copy of `source` (or a newly generated database) in the given journal mode"""
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(f"{target}{suffix}"):
+            os.remove(f"{target}{suffix}")
+
+    if source is not None:
+        # Backup API, so the source may be in use while we copy it
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(target)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    else:
+        from create_project_database import create_database, generate_sample_data
+        from generate_sample_data import populate_project_data
+        conn = create_database(target)
+        generate_sample_data(conn, num_projects)
+        populate_project_data(conn)
+        conn.close()
+
+    conn = sqlite3.connect(target)
+    mode = conn.execute(f'PRAGMA journal_mode = {journal_mode}').fetchone()[0]
+    conn.close()
+    return mode
+
+# Workers
+
+def _writer_rows(conn, seed):
+    """Pre-built email and milestone rows to append, so generation isn't timed"""
+    from generate_sample_data import email_correspondence_rows, milestone_rows
+    rng = random.Random(seed)
+    projects = conn.execute('SELECT project_id, start_date, end_date FROM projects').fetchall()
+    emails, milestones = [], []
+    for project_id, start, end in rng.sample(projects, min(5, len(projects))):
+        start, end = datetime.strptime(start, '%Y-%m-%d'), datetime.strptime(end, '%Y-%m-%d')
+        emails += email_correspondence_rows(project_id, start)
+        milestones += milestone_rows(project_id, start, end)
+    return emails, milestones
+
+# Position of the text column that is part of each stream's natural key (subject, milestone_name)
+EMAIL_KEY_COLUMN = 3
+MILESTONE_KEY_COLUMN = 1
+
+def _tagged(rows, column, tag):
+    """Rows with `tag` appended to a natural-key column, so repeated batches stay unique"""
+    return [row[:column] + (f"{row[column]} [{tag}]",) + row[column + 1:] for row in rows]
+
+def _run_writer(db_path, config, start_at, seed):
+    from generate_sample_data import EMAIL_INSERT, MILESTONE_INSERT
+    conn = sqlite3.connect(db_path, timeout=config.busy_timeout_ms / 1000, isolation_level=None)
+    emails, milestones = _writer_rows(conn, seed)
+    streams = [(EMAIL_INSERT, itertools.cycle(emails), EMAIL_KEY_COLUMN),
+               (MILESTONE_INSERT, itertools.cycle(milestones), MILESTONE_KEY_COLUMN)]
+    stats = {'role': 'writer', 'attempts': 0, 'operations': 0, 'rows': 0, 'busy': 0, 'errors': 0,
+             'latencies': [], 'lock_waits': []}
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + config.duration
+    turn = 0
+    while time.time() < deadline:
+        sql, rows, key_column = streams[turn % 2]
+        # Databases with natural-key unique indexes would reject the cycled rows on their second pass
+        batch = _tagged(list(itertools.islice(rows, config.batch_size)), key_column, f"w{seed}.{turn}")
+        turn += 1
+        stats['attempts'] += 1
+        started = time.perf_counter()
+        try:
+            # The write lock is taken up front, so the wait for it is measured on its own
+            conn.execute('BEGIN IMMEDIATE')
+            locked = time.perf_counter()
+            conn.executemany(sql, batch)
+            conn.execute('COMMIT')
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            stats['busy' if is_busy_error(e) else 'errors'] += 1
+            time.sleep(0.001)  # don't spin on an immediate SQLITE_BUSY
+            continue
+        finished = time.perf_counter()
+        stats['operations'] += 1
+        stats['rows'] += len(batch)
+        stats['lock_waits'].append(locked - started)
+        stats['latencies'].append(finished - started)
+    conn.close()
+    return stats
+
+def _run_reader(db_path, config, start_at, seed):
+    from analyze_projects import get_room_volume_comparison, get_material_performance_comparison
+    conn = sqlite3.connect(db_path, timeout=config.busy_timeout_ms / 1000)
+    queries = [get_room_volume_comparison, get_material_performance_comparison]
+    random.Random(seed).shuffle(queries)
+    stats = {'role': 'reader', 'attempts': 0, 'operations': 0, 'rows': 0, 'busy': 0, 'errors': 0,
+             'latencies': [], 'lock_waits': []}
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + config.duration
+    turn = 0
+    while time.time() < deadline:
+        query = queries[turn % len(queries)]
+        turn += 1
+        stats['attempts'] += 1
+        started = time.perf_counter()
+        try:
+            df, _ = query(conn=conn)
+        except Exception as e:
+            # pandas wraps driver errors, so check the message rather than the type
+            stats['busy' if is_busy_error(e) else 'errors'] += 1
+            time.sleep(0.001)
+            continue
+        stats['operations'] += 1
+        stats['rows'] += len(df)
+        stats['latencies'].append(time.perf_counter() - started)
+    conn.close()
+    return stats
+
+def _run_worker(role, db_path, config, start_at, seed):
+    runner = _run_writer if role == 'writer' else _run_reader
+    return runner(db_path, config, start_at, seed)
+
+# Reporting
+
+def _percentiles_ms(samples):
+    if not samples:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {'p50_ms': round(p50, 3), 'p95_ms': round(p95, 3), 'p99_ms': round(p99, 3),
+            'max_ms': round(max(samples) * 1000, 3)}
+
+def summarize(worker_stats, duration):
+    """Combine per-worker stats into per-role throughput, busy rate and latency figures"""
+    summary = {}
+    for role in ('writer', 'reader'):
+        stats = [s for s in worker_stats if s['role'] == role]
+        if not stats:
+            continue
+        attempts = sum(s['attempts'] for s in stats)
+        busy = sum(s['busy'] for s in stats)
+        latencies = [x for s in stats for x in s['latencies']]
+        lock_waits = [x for s in stats for x in s['lock_waits']]
+        summary[role] = {
+            'workers': len(stats),
+            'operations': sum(s['operations'] for s in stats),
+            'ops_per_sec': round(sum(s['operations'] for s in stats) / duration, 1),
+            'rows_per_sec': round(sum(s['rows'] for s in stats) / duration, 1),
+            'busy': busy,
+            'busy_rate': round(busy / attempts, 4) if attempts else 0.0,
+            'errors': sum(s['errors'] for s in stats),
+            'latency': _percentiles_ms(latencies),
+        }
+        if role == 'writer':
+            summary[role]['lock_wait'] = {'total_s': round(sum(lock_waits), 3), **_percentiles_ms(lock_waits)}
+    return summary
+
+def run_workload(config, db_path):
+    """Run one configuration against db_path and return its summary"""
+    roles = ['writer'] * config.writers + ['reader'] * config.readers
+    executor = ThreadPoolExecutor if config.mode == 'thread' else ProcessPoolExecutor
+    # Workers wait for a common start time so process start-up isn't counted
+    start_at = time.time() + (0.5 if config.mode == 'thread' else 3.0)
+    with executor(max_workers=len(roles)) as pool:
+        futures = [pool.submit(_run_worker, role, db_path, config, start_at, seed)
+                   for seed, role in enumerate(roles)]
+        worker_stats = [future.result() for future in futures]
+    return {'config': config.to_dict(), **summarize(worker_stats, config.duration)}
+
+def run_matrix(configs, source=None, work_dir=None, num_projects=DEFAULT_PROJECTS):
+    """Run every configuration on a fresh copy of the database"""
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix='contention_'))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    template = work_dir / 'template.db'
+    if source is None:
+        prepare_database(template, 'delete', num_projects=num_projects)
+        source = template
+
+    results = []
+    for config in configs:
+        db_path = work_dir / 'contention.db'
+        config.journal_mode = prepare_database(db_path, config.journal_mode, source)
+        print(f"Running {config.label()} for {config.duration:g}s...")
+        results.append(run_workload(config, str(db_path)))
+    return results
+
+def format_results(results):
+    lines = [f"{'configuration':<52} {'tx/s':>8} {'rows/s':>9} {'w busy':>7} {'wait p95':>9} "
+             f"{'w p95':>8} {'q/s':>7} {'r busy':>7} {'r p95':>8}"]
+    for result in results:
+        label = WorkloadConfig(**result['config']).label()
+        writer, reader = result.get('writer', {}), result.get('reader', {})
+
+        def ms(value):
+            return '-' if value is None else f"{value:.1f}"
+
+        lines.append(
+            f"{label[:52]:<52} {writer.get('ops_per_sec', 0):>8} {writer.get('rows_per_sec', 0):>9} "
+            f"{writer.get('busy_rate', 0):>7.1%} {ms(writer.get('lock_wait', {}).get('p95_ms')):>9} "
+            f"{ms(writer.get('latency', {}).get('p95_ms')):>8} {reader.get('ops_per_sec', 0):>7} "
+            f"{reader.get('busy_rate', 0):>7.1%} {ms(reader.get('latency', {}).get('p95_ms')):>8}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure lock contention between writers and analysis readers')
+    parser.add_argument('--db', help='copy this database for each run (default: generate one)')
+    parser.add_argument('--projects', type=int, default=DEFAULT_PROJECTS, help='projects when generating')
+    parser.add_argument('--writers', type=int, nargs='+', default=[4])
+    parser.add_argument('--readers', type=int, nargs='+', default=[4])
+    parser.add_argument('--mode', nargs='+', choices=['thread', 'process'], default=['thread'])
+    parser.add_argument('--journal-modes', nargs='+', default=['wal', 'delete'])
+    parser.add_argument('--busy-timeouts', type=int, nargs='+', default=[0, 100, 5000], metavar='MS')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='seconds per configuration')
+    parser.add_argument('--work-dir', help='where the test databases are written')
+    parser.add_argument('--output', help='write the results as JSON here')
+    args = parser.parse_args(argv)
+
+    configs = [WorkloadConfig(writers, readers, mode, journal_mode, busy_timeout, batch_size, args.duration)
+               for mode, journal_mode, busy_timeout, batch_size, writers, readers in itertools.product(
+                   args.mode, args.journal_modes, args.busy_timeouts, args.batch_sizes, args.writers, args.readers)]
+    results = run_matrix(configs, args.db, args.work_dir, args.projects)
+    print()
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,10 @@ from datetime import datetime, timedelta
 import os
 import random
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-# Database setup
-def create_database():
-    conn = sqlite3.connect('project_management.db')
-    cursor = conn.cursor()
-    
-    # Create tables
-    cursor.executescript('''
+# Database schema
+SCHEMA_SQL = '''
     -- Projects table
     CREATE TABLE IF NOT EXISTS projects (
         project_id INTEGER PRIMARY KEY,
@@ -143,12 +139,97 @@ def create_database():
         notes TEXT,
         FOREIGN KEY (project_id) REFERENCES projects(project_id)
     );
-    ''')
+'''
+
+# Natural keys identifying a row within a project, used by incremental generation
+NATURAL_KEYS = {
+    'budget': ('project_id',),
+    'astm_tests': ('project_id', 'test_name'),
+    'acoustic_materials': ('project_id', 'material_name'),
+    'equipment_spaces': ('project_id', 'space_name'),
+    'equipment': ('project_id', 'equipment_name'),
+    'email_correspondence': ('project_id', 'sent_date', 'subject'),
+    'deliverables': ('project_id', 'deliverable_name'),
+    'milestones': ('project_id', 'milestone_name'),
+}
+
+def _missing_natural_key_indexes(conn):
+    """(index name, table to index, key columns) for each natural-key index not created yet"""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table, columns in NATURAL_KEYS.items():
+        index_name = f'ux_{table}_natural_key'
+        if index_name in existing:
+            continue
+        # The compact date variant keeps rows in <table>_data behind a view
+        if f'{table}_data' in tables:
+            table = f'{table}_data'
+        # Other views (e.g. normalized acoustic_materials) span several tables and can't be indexed
+        if table not in tables:
+            continue
+        yield index_name, table, ', '.join(columns)
+
+def find_natural_key_duplicates(conn):
+    """Number of rows repeating an earlier row's natural key, per table still lacking its index"""
+    duplicates = {}
+    for _, table, key in _missing_natural_key_indexes(conn):
+        count = conn.execute(
+            f'SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {table} GROUP BY {key})'
+        ).fetchone()[0]
+        if count:
+            duplicates[table] = count
+    return duplicates
+
+def create_natural_key_indexes(conn, dedupe=False):
+    """Add unique natural-key indexes.
+
+    Existing duplicates raise a RuntimeError naming them before any index is
+    created; with ``dedupe`` the later copies are deleted instead.
+    """
+    if not dedupe:
+        duplicates = find_natural_key_duplicates(conn)
+        if duplicates:
+            found = ', '.join(f'{table}: {count}' for table, count in duplicates.items())
+            raise RuntimeError(f"Duplicate natural keys ({found}); remove them or run with dedupe=True")
+    for index_name, table, key in list(_missing_natural_key_indexes(conn)):
+        if dedupe:
+            conn.execute(f'''
+            DELETE FROM {table}
+            WHERE rowid NOT IN (SELECT MIN(rowid) FROM {table} GROUP BY {key})
+            ''')
+        conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table} ({key})')
+    conn.commit()
+
+def conflict_safe_insert(conn, table, insert_sql):
+    """`insert_sql` skipping rows whose natural key exists, once `table` has its natural-key index"""
+    index = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                         (f'ux_{table}_natural_key',)).fetchone()
+    if index is None:
+        return insert_sql
+    view = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = ?", (table,)).fetchone()
+    if view is not None:
+        # Views (compact date schema) cannot take an upsert clause
+        return insert_sql.replace('INSERT INTO', 'INSERT OR IGNORE INTO', 1)
+    return insert_sql.rstrip() + '\nON CONFLICT DO NOTHING'
+
+# Database setup
+def create_database(db_path='project_management.db', compact_dates=False):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    if compact_dates:
+        # Integer date storage behind ISO-string compatibility views
+        from compact_dates import create_compact_schema
+        create_compact_schema(conn)
+        return conn
+    
+    # Create tables
+    cursor.executescript(SCHEMA_SQL)
     
     conn.commit()
     return conn
 
-def generate_sample_data(conn):
+def generate_sample_data(conn, num_projects=5):
     # Sample project names and clients
     project_names = [
         "Acoustic Design - Corporate Office",
@@ -166,8 +247,8 @@ def generate_sample_data(conn):
         "HealthCare Plus"
     ]
     
-    # Generate projects
-    for i in range(5):
+    # Generate projects, cycling through the sample names for larger datasets
+    for i in range(num_projects):
         start_date = datetime(2024, 1, 1) + timedelta(days=random.randint(0, 60))
         end_date = start_date + timedelta(days=random.randint(180, 365))
         
@@ -175,8 +256,8 @@ def generate_sample_data(conn):
         INSERT INTO projects (project_name, client_name, start_date, end_date, status, percent_complete)
         VALUES (?, ?, ?, ?, ?, ?)
         ''', (
-            project_names[i],
-            clients[i],
+            project_names[i % len(project_names)],
+            clients[i % len(clients)],
             start_date.strftime('%Y-%m-%d'),
             end_date.strftime('%Y-%m-%d'),
             random.choice(['In Progress', 'Planning', 'Review', 'Completed']),
@@ -185,6 +266,54 @@ def generate_sample_data(conn):
     
     conn.commit()
 
+# Folder layout and sample files created for each project
+PROJECT_FOLDERS = [
+    'astm_tests_db',
+    'budget',
+    'acoustic_materials_db',
+    'equipment_spaces_db',
+    'email_db',
+    'deliverables_db'
+]
+
+SAMPLE_FILES = {
+    'astm_tests_db': ['test_results_001.txt', 'raw_data_001.txt'],
+    'budget': ['project_budget.xlsx', 'scope_of_work.txt'],
+    'acoustic_materials_db': ['material_specs.txt', 'nrc_ratings.csv'],
+    'equipment_spaces_db': ['space_requirements.txt', 'equipment_list.csv'],
+    'email_db': ['client_correspondence.txt', 'team_meetings.txt'],
+    'deliverables_db': ['final_report.txt', 'presentation.pptx']
+}
+
+def project_folder_name(project_id):
+    return f"Project_{project_id}_Acoustic_Design"
+
+def materialize_project_folder(base_dir, project_id):
+    """Create one project's folder tree and sample files, leaving existing files alone"""
+    base_path = Path(base_dir) / project_folder_name(project_id)
+    for folder in PROJECT_FOLDERS:
+        (base_path / folder).mkdir(parents=True, exist_ok=True)
+    
+    # Create sample text files
+    created = 0
+    for folder, files in SAMPLE_FILES.items():
+        for file in files:
+            file_path = base_path / folder / file
+            if file_path.exists():
+                continue
+            with open(file_path, 'w') as f:
+                f.write(f"Sample content for {file}\n")
+            created += 1
+    return created
+
+def materialize_project_folders(conn, base_dir='.', max_workers=8):
+    """Create the folder layout for every project on a thread pool"""
+    project_ids = [row[0] for row in conn.execute('SELECT project_id FROM projects ORDER BY project_id')]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        created = sum(pool.map(lambda project_id: materialize_project_folder(base_dir, project_id),
+                               project_ids))
+    return len(project_ids), created
+
 def main():
     # Create database and tables
     conn = create_database()
@@ -192,34 +321,8 @@ def main():
     # Generate sample data
     generate_sample_data(conn)
     
-    # Create folder structure for the first project
-    project_folders = [
-        'astm_tests_db',
-        'budget',
-        'acoustic_materials_db',
-        'equipment_spaces_db',
-        'email_db',
-        'deliverables_db'
-    ]
-    
-    base_path = Path('Project_1_Acoustic_Design')
-    for folder in project_folders:
-        (base_path / folder).mkdir(parents=True, exist_ok=True)
-    
-    # Create sample text files
-    sample_files = {
-        'astm_tests_db': ['test_results_001.txt', 'raw_data_001.txt'],
-        'budget': ['project_budget.xlsx', 'scope_of_work.txt'],
-        'acoustic_materials_db': ['material_specs.txt', 'nrc_ratings.csv'],
-        'equipment_spaces_db': ['space_requirements.txt', 'equipment_list.csv'],
-        'email_db': ['client_correspondence.txt', 'team_meetings.txt'],
-        'deliverables_db': ['final_report.txt', 'presentation.pptx']
-    }
-    
-    for folder, files in sample_files.items():
-        for file in files:
-            with open(base_path / folder / file, 'w') as f:
-                f.write(f"Sample content for {file}\n")
+    # Create folder structure and sample files for every project
+    materialize_project_folders(conn)
     
     conn.close()
 
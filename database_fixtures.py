@@ -0,0 +1,116 @@
+import sqlite3
+import os
+import tempfile
+import threading
+import itertools
+import random
+from contextlib import contextmanager
+
+from create_project_database import SCHEMA_SQL, generate_sample_data
+from generate_sample_data import populate_project_data
+
+class FixtureConnection(sqlite3.Connection):
+    """Connection to a fixture copy; ``shared_uri`` is set for shared-cache copies."""
+    shared_uri = None
+
+class DatabaseFixtureFactory:
+    """Build template databases once and hand out cheap copies of them.
+
+    Two templates are available: ``'schema'`` holds only the tables created by
+    ``create_database()``, while ``'sample'`` also holds the sample projects and
+    the data generated for them. Each template is built lazily in memory the
+    first time it is requested; every copy after that is a page-level clone
+    made with ``sqlite3.Connection.backup``.
+    """
+
+    TEMPLATES = ('schema', 'sample')
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._shared_names = itertools.count(1)
+
+    def _build_template(self, template):
+        """Build a template database in memory."""
+        if template not in self.TEMPLATES:
+            raise ValueError(f"Unknown template '{template}', expected one of {self.TEMPLATES}")
+
+        # Templates are shared by every thread that asks for a copy
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        conn.executescript(SCHEMA_SQL)
+        if template == 'sample':
+            if self.seed is not None:
+                random.seed(self.seed)
+            generate_sample_data(conn)
+            populate_project_data(conn)
+        return conn
+
+    def _copy_template(self, template, target):
+        """Copy a template into an open target connection."""
+        with self._lock:
+            source = self._templates.get(template)
+            if source is None:
+                source = self._build_template(template)
+                self._templates[template] = source
+            source.backup(target)
+        return target
+
+    def connect(self, template='schema', shared=False, **kwargs):
+        """Return a new in-memory connection holding a copy of a template.
+
+        With ``shared=True`` the copy lives in a named shared-cache in-memory
+        database, so other threads can open it with ``connect_shared(uri)``
+        while this connection stays open. The URI is available as
+        ``conn.shared_uri``.
+        """
+        if shared:
+            uri = f"file:fixture_{os.getpid()}_{next(self._shared_names)}?mode=memory&cache=shared"
+            kwargs.setdefault('check_same_thread', False)
+            conn = sqlite3.connect(uri, uri=True, factory=FixtureConnection, **kwargs)
+            conn.shared_uri = uri
+        else:
+            conn = sqlite3.connect(':memory:', factory=FixtureConnection, **kwargs)
+        return self._copy_template(template, conn)
+
+    def connect_shared(self, uri, **kwargs):
+        """Open another connection to a shared in-memory copy."""
+        kwargs.setdefault('check_same_thread', False)
+        return sqlite3.connect(uri, uri=True, **kwargs)
+
+    def copy_to_file(self, path, template='schema'):
+        """Write a copy of a template to a database file and return its path."""
+        if os.path.exists(path):
+            os.remove(path)
+        conn = sqlite3.connect(path)
+        try:
+            self._copy_template(template, conn)
+        finally:
+            conn.close()
+        return path
+
+    @contextmanager
+    def temp_database(self, template='schema'):
+        """Yield the path of a temporary database file copied from a template."""
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            yield self.copy_to_file(path, template)
+        finally:
+            for suffix in ('', '-journal', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def close(self):
+        """Release the in-memory templates."""
+        with self._lock:
+            for conn in self._templates.values():
+                conn.close()
+            self._templates.clear()
+
+# Factory shared by callers in the same process so templates are built only once
+default_factory = DatabaseFixtureFactory()
+
+def memory_database(template='schema', shared=False):
+    """Return an isolated in-memory copy of a template from the default factory"""
+    return default_factory.connect(template, shared=shared)
@@ -5,16 +5,26 @@ import json
 from pathlib import Path
 import shutil
 
+from maintenance import enable_incremental_vacuum, run_maintenance
+from snapshot import take_snapshot
+
 class DatabaseMigration:
-    def __init__(self, db_path='project_management.db'):
+    def __init__(self, db_path='project_management.db', migrations_dir='migrations', maintenance=True):
         self.db_path = db_path
-        self.migrations_dir = Path('migrations')
-        self.migrations_dir.mkdir(exist_ok=True)
+        self.maintenance = maintenance
+        self.migrations_dir = Path(migrations_dir)
+        self.migrations_dir.mkdir(parents=True, exist_ok=True)
+        self.baselines_dir = self.migrations_dir / 'baselines'
         self._init_migrations_table()
 
     def _init_migrations_table(self):
         """Initialize the migrations tracking table if it doesn't exist."""
         conn = sqlite3.connect(self.db_path)
+        self._create_migrations_table(conn)
+        conn.close()
+
+    def _create_migrations_table(self, conn):
+        """Create the migrations tracking table on an open connection."""
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -29,7 +39,13 @@ class DatabaseMigration:
         ''')
         
         conn.commit()
-        conn.close()
+
+    def _run_maintenance(self, stage):
+        """Rebuild planner statistics and release free pages after schema churn."""
+        if not self.maintenance:
+            return
+        report = run_maintenance(self.db_path, stage=stage, full_analyze=True, stats=False)
+        print(f"Maintenance: analyzed, {report['pages_vacuumed']} free pages released.")
 
     def create_migration(self, name, up_sql, down_sql):
         """Create a new migration file."""
@@ -70,18 +86,18 @@ class DatabaseMigration:
         conn.close()
         return migrations
 
+    def get_all_migrations(self):
+        """Load every migration file in version order."""
+        migrations = []
+        for migration_file in sorted(self.migrations_dir.glob('V*.sql')):
+            with open(migration_file, 'r') as f:
+                migrations.append(json.load(f))
+        return migrations
+
     def get_pending_migrations(self):
         """Get list of pending migrations."""
         applied = {m[0] for m in self.get_applied_migrations()}
-        pending = []
-        
-        for migration_file in sorted(self.migrations_dir.glob('V*.sql')):
-            with open(migration_file, 'r') as f:
-                migration = json.load(f)
-                if migration['version'] not in applied:
-                    pending.append(migration)
-        
-        return pending
+        return [m for m in self.get_all_migrations() if m['version'] not in applied]
 
     def apply_migration(self, migration):
         """Apply a single migration."""
@@ -135,14 +151,22 @@ class DatabaseMigration:
         finally:
             conn.close()
 
-    def migrate(self):
-        """Apply all pending migrations."""
+    def migrate(self, snapshot_dir=None):
+        """Apply all pending migrations.
+        
+        With ``snapshot_dir`` a compressed snapshot of the database is taken
+        first, so a bad deploy can be undone with ``snapshot.restore_snapshot``.
+        """
         pending = self.get_pending_migrations()
         
         if not pending:
             print("No pending migrations.")
             return
         
+        if snapshot_dir is not None:
+            snapshot = take_snapshot(self.db_path, snapshot_dir, label=f"pre_{pending[0]['version']}")
+            print(f"Snapshot taken: {snapshot}")
+        
         print(f"Applying {len(pending)} pending migrations...")
         
         for migration in pending:
@@ -168,6 +192,7 @@ class DatabaseMigration:
                 self.rollback_migration(migration)
         
         print("Rollback completed successfully.")
+        self._run_maintenance('rollback')
 
     def reset_database(self):
         """Completely reset the database by removing it and recreating it."""
@@ -186,21 +211,136 @@ class DatabaseMigration:
             print("Removed existing database file.")
         
         # Recreate the database with initial schema
+        if self.maintenance:
+            # Set before any table exists, so no VACUUM is needed
+            conn = sqlite3.connect(self.db_path)
+            enable_incremental_vacuum(conn)
+            conn.close()
         self._init_migrations_table()
         print("Created fresh database with initial schema.")
 
+    def create_baseline(self, version=None):
+        """Squash migrations up to `version` into a template database snapshot.
+
+        The migrations are replayed once into an in-memory database, which is
+        then written to ``migrations/baselines/<version>_baseline.db`` with the
+        SQLite backup API. ``refresh_database`` clones the newest valid
+        baseline instead of replaying the migrations it covers.
+        """
+        migrations = self.get_all_migrations()
+        if version is not None:
+            migrations = [m for m in migrations if m['version'] <= version]
+        
+        if not migrations:
+            print("No migrations to squash into a baseline.")
+            return None
+        
+        baseline_version = migrations[-1]['version']
+        self.baselines_dir.mkdir(parents=True, exist_ok=True)
+        baseline_path = self.baselines_dir / f"{baseline_version}_baseline.db"
+        
+        source = sqlite3.connect(':memory:')
+        try:
+            if self.maintenance:
+                # Clones start with auto_vacuum=INCREMENTAL, like a reset database
+                source.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            self._create_migrations_table(source)
+            for migration in migrations:
+                source.executescript(migration['up'])
+                source.execute('''
+                INSERT INTO schema_migrations (version, name, checksum)
+                VALUES (?, ?, ?)
+                ''', (migration['version'], migration['name'], migration['checksum']))
+            source.commit()
+            
+            if baseline_path.exists():
+                baseline_path.unlink()
+            target = sqlite3.connect(baseline_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+        
+        print(f"Created baseline {baseline_version} from {len(migrations)} migrations.")
+        return baseline_path
+
+    def get_baselines(self):
+        """Get (version, path) pairs for stored baselines, newest first."""
+        baselines = []
+        for baseline_path in self.baselines_dir.glob('V*_baseline.db'):
+            version = baseline_path.name[:-len('_baseline.db')]
+            baselines.append((version, baseline_path))
+        return sorted(baselines, reverse=True)
+
+    def _baseline_is_valid(self, baseline_path, migrations_by_version):
+        """Check that a baseline matches the migration files it was built from."""
+        uri = f"file:{Path(baseline_path).resolve()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            squashed = conn.execute(
+                'SELECT version, checksum FROM schema_migrations ORDER BY id'
+            ).fetchall()
+        except sqlite3.DatabaseError:
+            return False
+        finally:
+            conn.close()
+        
+        for version, checksum in squashed:
+            migration = migrations_by_version.get(version)
+            if migration is None or migration['checksum'] != checksum:
+                return False
+        
+        # Every migration up to the baseline must have been squashed into it
+        squashed_versions = {version for version, _ in squashed}
+        newest = squashed[-1][0] if squashed else ''
+        return all(v in squashed_versions for v in migrations_by_version if v <= newest)
+
+    def _find_baseline(self, migrations):
+        """Return the newest baseline that is consistent with the migration files."""
+        migrations_by_version = {m['version']: m for m in migrations}
+        for version, baseline_path in self.get_baselines():
+            if self._baseline_is_valid(baseline_path, migrations_by_version):
+                return version, baseline_path
+            print(f"Skipping stale baseline: {baseline_path.name}")
+        return None
+
+    def _restore_baseline(self, baseline_path):
+        """Replace the database with a copy of a baseline via the backup API."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        
+        source = sqlite3.connect(f"file:{Path(baseline_path).resolve()}?mode=ro", uri=True)
+        target = sqlite3.connect(self.db_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
     def refresh_database(self):
-        """Refresh the database by resetting it and reapplying all migrations."""
+        """Refresh the database by resetting it and reapplying all migrations.
+
+        When a baseline exists the database is cloned from it and only the
+        migrations newer than the baseline are replayed. No maintenance pass
+        runs, so repeated refreshes stay fast; the fresh file has nothing to
+        vacuum.
+        """
         print("Refreshing database...")
         
         # Get all migrations before reset
-        all_migrations = []
-        for migration_file in sorted(self.migrations_dir.glob('V*.sql')):
-            with open(migration_file, 'r') as f:
-                all_migrations.append(json.load(f))
+        all_migrations = self.get_all_migrations()
         
-        # Reset the database
-        self.reset_database()
+        baseline = self._find_baseline(all_migrations)
+        if baseline:
+            baseline_version, baseline_path = baseline
+            print(f"Restoring baseline {baseline_version}...")
+            self._restore_baseline(baseline_path)
+            all_migrations = [m for m in all_migrations if m['version'] > baseline_version]
+        else:
+            # Reset the database
+            self.reset_database()
         
         # Apply all migrations
         if all_migrations:
@@ -5,221 +5,71 @@ from datetime import datetime, timedelta
 import random
 import json
 
+from in_memory_build import InMemoryBuild
+from create_project_database import create_natural_key_indexes, conflict_safe_insert
+from reference_catalogs import material_catalog, equipment_catalog, space_catalog
+from maintenance import after_load
+
+ACOUSTIC_MATERIAL_INSERT = '''
+INSERT INTO acoustic_materials (
+    project_id, material_name, material_type, nrc_single_value,
+    nrc_125, nrc_250, nrc_500, nrc_1000, nrc_2000, nrc_4000,
+    stc_rating, iic_rating, cost_per_sqft, notes
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+EQUIPMENT_INSERT = '''
+INSERT INTO equipment (
+    project_id, equipment_name, equipment_type,
+    sound_power_125, sound_power_250, sound_power_500,
+    sound_power_1000, sound_power_2000, sound_power_4000,
+    sound_power_8000, notes
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+EQUIPMENT_SPACE_INSERT = '''
+INSERT INTO equipment_spaces (
+    project_id, space_name, space_type,
+    length_ft, width_ft, height_ft,
+    volume_cubic_ft, nc_requirement,
+    rt60_500hz, rt60_1000hz, rt60_2000hz,
+    background_noise_dba, notes
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+EMAIL_INSERT = '''
+INSERT INTO email_correspondence (
+    project_id, sender, recipient, subject, content,
+    sent_date, is_read
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+MILESTONE_INSERT = '''
+INSERT INTO milestones (
+    project_id, milestone_name, milestone_type,
+    planned_date, actual_date, status, notes
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+def acoustic_material_rows(project_id):
+    return material_catalog().rows(project_id)
+
 def generate_acoustic_material_data(conn, project_id):
-    # Sample acoustic materials with realistic values
-    materials = [
-        # Room Treatment Materials (NRC values)
-        {
-            'name': 'Acoustic Panel A',
-            'type': 'Room Treatment',
-            'nrc_single': 0.85,
-            'nrc_bands': [0.75, 0.80, 0.85, 0.90, 0.85, 0.80],
-            'stc': None,
-            'iic': None,
-            'cost_per_sqft': 12.50  # Premium acoustic panel
-        },
-        {
-            'name': 'Bass Trap B',
-            'type': 'Room Treatment',
-            'nrc_single': 0.95,
-            'nrc_bands': [0.95, 0.90, 0.85, 0.80, 0.75, 0.70],
-            'stc': None,
-            'iic': None,
-            'cost_per_sqft': 15.75  # High-performance bass trap
-        },
-        {
-            'name': 'Ceiling Tile C',
-            'type': 'Room Treatment',
-            'nrc_single': 0.75,
-            'nrc_bands': [0.65, 0.70, 0.75, 0.80, 0.75, 0.70],
-            'stc': None,
-            'iic': None,
-            'cost_per_sqft': 8.25   # Standard acoustic ceiling tile
-        },
-        # Underlayment Materials (STC/IIC values)
-        {
-            'name': 'Floor Underlayment X',
-            'type': 'Underlayment',
-            'nrc_single': None,
-            'nrc_bands': [None, None, None, None, None, None],
-            'stc': 55,
-            'iic': 65,
-            'cost_per_sqft': 3.95    # Standard floor underlayment
-        },
-        {
-            'name': 'Isolation Mat Y',
-            'type': 'Underlayment',
-            'nrc_single': None,
-            'nrc_bands': [None, None, None, None, None, None],
-            'stc': 52,
-            'iic': 62,
-            'cost_per_sqft': 2.75    # Basic isolation mat
-        },
-        {
-            'name': 'Sound Barrier Z',
-            'type': 'Underlayment',
-            'nrc_single': None,
-            'nrc_bands': [None, None, None, None, None, None],
-            'stc': 58,
-            'iic': 68,
-            'cost_per_sqft': 5.25    # Premium sound barrier
-        }
-    ]
-    
-    for material in materials:
-        conn.execute('''
-        INSERT INTO acoustic_materials (
-            project_id, material_name, material_type, nrc_single_value,
-            nrc_125, nrc_250, nrc_500, nrc_1000, nrc_2000, nrc_4000,
-            stc_rating, iic_rating, cost_per_sqft, notes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            project_id,
-            material['name'],
-            material['type'],
-            material['nrc_single'],
-            *material['nrc_bands'],
-            material['stc'],
-            material['iic'],
-            material['cost_per_sqft'],
-            f"Sample {material['type']} material"
-        ))
+    conn.executemany(conflict_safe_insert(conn, 'acoustic_materials', ACOUSTIC_MATERIAL_INSERT), acoustic_material_rows(project_id))
+
+def equipment_rows(project_id):
+    return equipment_catalog().rows(project_id)
 
 def generate_equipment_data(conn, project_id):
-    # Sample equipment with realistic sound power levels
-    equipment_list = [
-        {
-            'name': 'HVAC Unit A',
-            'type': 'Mechanical',
-            'sound_power': [75, 78, 80, 82, 80, 78, 75]
-        },
-        {
-            'name': 'Generator B',
-            'type': 'Electrical',
-            'sound_power': [85, 88, 90, 92, 90, 88, 85]
-        },
-        {
-            'name': 'Pump C',
-            'type': 'Mechanical',
-            'sound_power': [70, 73, 75, 77, 75, 73, 70]
-        }
-    ]
-    
-    for equipment in equipment_list:
-        conn.execute('''
-        INSERT INTO equipment (
-            project_id, equipment_name, equipment_type,
-            sound_power_125, sound_power_250, sound_power_500,
-            sound_power_1000, sound_power_2000, sound_power_4000,
-            sound_power_8000, notes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            project_id,
-            equipment['name'],
-            equipment['type'],
-            *equipment['sound_power'],
-            f"Sample {equipment['type']} equipment"
-        ))
+    conn.executemany(conflict_safe_insert(conn, 'equipment', EQUIPMENT_INSERT), equipment_rows(project_id))
+
+def equipment_space_rows(project_id):
+    return space_catalog().rows(project_id)
 
 def generate_equipment_spaces_data(conn, project_id):
-    # Sample noise sensitive spaces with realistic dimensions and acoustic parameters
-    spaces = [
-        {
-            'name': 'Main Conference Room',
-            'type': 'Meeting Space',
-            'length_ft': 30.0,
-            'width_ft': 20.0,
-            'height_ft': 10.0,
-            'nc_requirement': 30,
-            'rt60_500hz': 0.6,    # Optimized for speech intelligibility
-            'rt60_1000hz': 0.5,
-            'rt60_2000hz': 0.4,
-            'background_noise_dba': 35.0,
-            'notes': 'Primary meeting space with video conferencing'
-        },
-        {
-            'name': 'Executive Office',
-            'type': 'Office Space',
-            'length_ft': 15.0,
-            'width_ft': 12.0,
-            'height_ft': 9.0,
-            'nc_requirement': 35,
-            'rt60_500hz': 0.4,    # Shorter RT60 for smaller space
-            'rt60_1000hz': 0.35,
-            'rt60_2000hz': 0.3,
-            'background_noise_dba': 40.0,
-            'notes': 'Private executive office'
-        },
-        {
-            'name': 'Recording Studio',
-            'type': 'Specialized Space',
-            'length_ft': 25.0,
-            'width_ft': 18.0,
-            'height_ft': 12.0,
-            'nc_requirement': 20,
-            'rt60_500hz': 0.3,    # Very controlled RT60 for recording
-            'rt60_1000hz': 0.25,
-            'rt60_2000hz': 0.2,
-            'background_noise_dba': 25.0,
-            'notes': 'Professional recording studio'
-        },
-        {
-            'name': 'Open Office Area',
-            'type': 'Work Space',
-            'length_ft': 50.0,
-            'width_ft': 40.0,
-            'height_ft': 9.0,
-            'nc_requirement': 40,
-            'rt60_500hz': 0.5,    # Moderate RT60 for open office
-            'rt60_1000hz': 0.45,
-            'rt60_2000hz': 0.4,
-            'background_noise_dba': 45.0,
-            'notes': 'Open plan office space'
-        },
-        {
-            'name': 'Quiet Room',
-            'type': 'Specialized Space',
-            'length_ft': 12.0,
-            'width_ft': 10.0,
-            'height_ft': 8.0,
-            'nc_requirement': 25,
-            'rt60_500hz': 0.2,    # Very short RT60 for quiet room
-            'rt60_1000hz': 0.15,
-            'rt60_2000hz': 0.1,
-            'background_noise_dba': 30.0,
-            'notes': 'Sound isolated quiet room'
-        }
-    ]
-    
-    for space in spaces:
-        # Calculate volume in cubic feet
-        volume = space['length_ft'] * space['width_ft'] * space['height_ft']
-        
-        conn.execute('''
-        INSERT INTO equipment_spaces (
-            project_id, space_name, space_type,
-            length_ft, width_ft, height_ft,
-            volume_cubic_ft, nc_requirement,
-            rt60_500hz, rt60_1000hz, rt60_2000hz,
-            background_noise_dba, notes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            project_id,
-            space['name'],
-            space['type'],
-            space['length_ft'],
-            space['width_ft'],
-            space['height_ft'],
-            volume,
-            space['nc_requirement'],
-            space['rt60_500hz'],
-            space['rt60_1000hz'],
-            space['rt60_2000hz'],
-            space['background_noise_dba'],
-            space['notes']
-        ))
+    conn.executemany(conflict_safe_insert(conn, 'equipment_spaces', EQUIPMENT_SPACE_INSERT), equipment_space_rows(project_id))
 
-def generate_email_correspondence(conn, project_id, start_date):
+def email_correspondence_rows(project_id, start_date):
     # Extended acoustic recommendation discussion thread
     acoustic_discussion_thread = [
         {
@@ -529,14 +379,10 @@ P.S. The client specifically requested that you lead the acoustic design for all
     ]
     
     # Generate the extended acoustic discussion thread
+    rows = []
     for email in acoustic_discussion_thread:
         email_date = start_date + timedelta(days=email['date_offset'])
-        conn.execute('''
-        INSERT INTO email_correspondence (
-            project_id, sender, recipient, subject, content,
-            sent_date, is_read
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        rows.append((
             project_id,
             email['sender'],
             email['recipient'],
@@ -571,12 +417,7 @@ P.S. The client specifically requested that you lead the acoustic design for all
     while current_date < start_date + timedelta(days=365):
         if random.random() < 0.2:  # 20% chance of email on any given day
             template = random.choice(general_email_templates)
-            conn.execute('''
-            INSERT INTO email_correspondence (
-                project_id, sender, recipient, subject, content,
-                sent_date, is_read
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            rows.append((
                 project_id,
                 'project.manager@company.com',
                 'team@company.com',
@@ -586,8 +427,12 @@ P.S. The client specifically requested that you lead the acoustic design for all
                 random.choice([0, 1])
             ))
         current_date += timedelta(days=1)
+    return rows
 
-def generate_milestones(conn, project_id, start_date, end_date):
+def generate_email_correspondence(conn, project_id, start_date):
+    conn.executemany(conflict_safe_insert(conn, 'email_correspondence', EMAIL_INSERT), email_correspondence_rows(project_id, start_date))
+
+def milestone_rows(project_id, start_date, end_date):
     milestone_types = [
         'Project Percent Completion',
         'Project Invoice',
@@ -596,16 +441,12 @@ def generate_milestones(conn, project_id, start_date, end_date):
         'Report Submission'
     ]
     
+    rows = []
     current_date = start_date
     while current_date < end_date:
         if random.random() < 0.2:  # 20% chance of milestone on any given day
             milestone_type = random.choice(milestone_types)
-            conn.execute('''
-            INSERT INTO milestones (
-                project_id, milestone_name, milestone_type,
-                planned_date, actual_date, status, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            rows.append((
                 project_id,
                 f"{milestone_type} - {current_date.strftime('%Y-%m-%d')}",
                 milestone_type,
@@ -615,10 +456,17 @@ def generate_milestones(conn, project_id, start_date, end_date):
                 f"Sample {milestone_type} milestone"
             ))
         current_date += timedelta(days=1)
+    return rows
 
-def main():
-    conn = sqlite3.connect('project_management.db')
-    
+def generate_milestones(conn, project_id, start_date, end_date):
+    conn.executemany(conflict_safe_insert(conn, 'milestones', MILESTONE_INSERT), milestone_rows(project_id, start_date, end_date))
+
+def populate_project_data(conn, checkpoint=None):
+    """Generate sample data for every project in the database
+
+    ``checkpoint`` is called after each project and returns the connection to
+    continue with (see ``InMemoryBuild.check_memory``).
+    """
     # Get all projects
     cursor = conn.cursor()
     cursor.execute('SELECT project_id, start_date, end_date FROM projects')
@@ -633,8 +481,93 @@ def main():
         generate_milestones(conn, project_id, 
                           datetime.strptime(start_date, '%Y-%m-%d'),
                           datetime.strptime(end_date, '%Y-%m-%d'))
+        
+        if checkpoint is not None:
+            conn = checkpoint()
     
     conn.commit()
+
+# Tables filled by the incremental mode: (table, insert statement, row builder)
+INCREMENTAL_TABLES = [
+    ('acoustic_materials', ACOUSTIC_MATERIAL_INSERT,
+     lambda project_id, start, end: acoustic_material_rows(project_id)),
+    ('equipment', EQUIPMENT_INSERT,
+     lambda project_id, start, end: equipment_rows(project_id)),
+    ('equipment_spaces', EQUIPMENT_SPACE_INSERT,
+     lambda project_id, start, end: equipment_space_rows(project_id)),
+    ('email_correspondence', EMAIL_INSERT,
+     lambda project_id, start, end: email_correspondence_rows(project_id, start)),
+    ('milestones', MILESTONE_INSERT,
+     lambda project_id, start, end: milestone_rows(project_id, start, end)),
+]
+
+def find_missing_projects(conn, table):
+    """Projects with no rows in `table`, found through the natural key index"""
+    cursor = conn.execute(f'''
+    SELECT p.project_id, p.start_date, p.end_date
+    FROM projects p
+    WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.project_id = p.project_id)
+    ORDER BY p.project_id
+    ''')
+    return cursor.fetchall()
+
+def populate_missing_project_data(conn, batch_size=1000, checkpoint=None, dedupe=False):
+    """Generate data only for projects and tables that do not have any yet
+
+    Natural key unique indexes are created first, and rows are inserted in
+    batches with ``ON CONFLICT DO NOTHING`` so re-running never duplicates
+    data. Duplicates left by earlier non-incremental runs raise a
+    RuntimeError unless ``dedupe`` allows deleting them.
+    Returns the number of rows inserted per table.
+    """
+    create_natural_key_indexes(conn, dedupe)
+    inserted = {}
+    
+    for table, insert_sql, build_rows in INCREMENTAL_TABLES:
+        sql = conflict_safe_insert(conn, table, insert_sql)
+        before = conn.total_changes
+        batch = []
+        
+        for project_id, start_date, end_date in find_missing_projects(conn, table):
+            batch.extend(build_rows(project_id,
+                                    datetime.strptime(start_date, '%Y-%m-%d'),
+                                    datetime.strptime(end_date, '%Y-%m-%d')))
+            if len(batch) >= batch_size:
+                conn.executemany(sql, batch)
+                batch = []
+                if checkpoint is not None:
+                    conn = checkpoint()
+        
+        if batch:
+            conn.executemany(sql, batch)
+        conn.commit()
+        inserted[table] = conn.total_changes - before
+    
+    return inserted
+
+def main(db_path='project_management.db', in_memory=False, memory_limit_mb=512,
+         pages=-1, progress=None, incremental=False, batch_size=1000, dedupe=False):
+    if in_memory:
+        # Build in memory and persist once through the backup API
+        with InMemoryBuild(db_path, memory_limit_mb, pages, progress) as build:
+            if incremental:
+                populate_missing_project_data(build.conn, batch_size, build.check_memory, dedupe)
+            else:
+                populate_project_data(build.conn, checkpoint=build.check_memory)
+        conn = sqlite3.connect(db_path)
+        after_load(conn, 'generate')
+        conn.close()
+        return
+    
+    conn = sqlite3.connect(db_path)
+    if incremental:
+        inserted = populate_missing_project_data(conn, batch_size, dedupe=dedupe)
+        for table, count in inserted.items():
+            print(f"{table}: {count} new rows")
+    else:
+        populate_project_data(conn)
+    # Fresh planner statistics for the analysis queries that follow
+    after_load(conn, 'generate')
     conn.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import sqlite3
+import os
+
+class InMemoryBuild:
+    """Build a database in memory and persist it to disk in one backup pass.
+
+    The on-disk database (if any) is loaded into a ``:memory:`` connection,
+    generators write to that connection without journal or fsync costs, and
+    ``persist()`` copies the result back over the file with the SQLite backup
+    API. If the database is larger than ``memory_limit_mb`` the build falls back
+    to writing the file directly. ``check_memory()`` moves a build that outgrows
+    the limit mid-way to a ``<db>.building`` side file, which replaces the
+    database when the build succeeds.
+
+    Use it as a context manager; the database is persisted only when the block
+    exits without an exception, so a failed build leaves the file untouched
+    (the side file is deleted). A build that started on disk keeps whatever
+    the generators had already committed::
+
+        with InMemoryBuild('project_management.db') as build:
+            populate_project_data(build.conn, checkpoint=build.check_memory)
+    """
+
+    def __init__(self, db_path='project_management.db', memory_limit_mb=512,
+                 pages=-1, progress=None):
+        self.db_path = db_path
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.pages = pages
+        self.progress = progress
+        self.conn = None
+        self.in_memory = False
+        self.building_path = None
+
+    def connect(self):
+        """Open the build connection, in memory when the database fits."""
+        disk_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+
+        if disk_size > self.memory_limit_bytes:
+            print(f"Database exceeds memory limit ({disk_size} bytes), building on disk.")
+            self.conn = sqlite3.connect(self.db_path)
+            self.in_memory = False
+            return self.conn
+
+        self.conn = sqlite3.connect(':memory:')
+        self.in_memory = True
+        if disk_size:
+            disk = sqlite3.connect(self.db_path)
+            try:
+                disk.backup(self.conn)
+            finally:
+                disk.close()
+        return self.conn
+
+    def database_size(self):
+        """Current size of the build database in bytes."""
+        page_count = self.conn.execute('PRAGMA page_count').fetchone()[0]
+        page_size = self.conn.execute('PRAGMA page_size').fetchone()[0]
+        return page_count * page_size
+
+    def check_memory(self):
+        """Switch to on-disk mode if the in-memory copy outgrew the limit.
+
+        Returns the connection to keep writing to, which changes when the
+        build falls back to disk.
+        """
+        if self.in_memory and self.database_size() > self.memory_limit_bytes:
+            print("In-memory build exceeded memory limit, continuing on disk.")
+            # A side file, so the database is still untouched if the build fails
+            self.building_path = f"{self.db_path}.building"
+            if os.path.exists(self.building_path):
+                os.remove(self.building_path)
+            self.conn.commit()
+            disk = sqlite3.connect(self.building_path)
+            self.conn.backup(disk, pages=self.pages, progress=self.progress)
+            self.conn.close()
+            self.conn = disk
+            self.in_memory = False
+        return self.conn
+
+    def persist(self):
+        """Write the in-memory database (or the side file) over the on-disk file."""
+        self.conn.commit()
+        if self.building_path is not None:
+            self.conn.close()
+            os.replace(self.building_path, self.db_path)
+            self.building_path = None
+            self.conn = sqlite3.connect(self.db_path)
+            return
+        if not self.in_memory:
+            return
+
+        disk = sqlite3.connect(self.db_path)
+        try:
+            self.conn.backup(disk, pages=self.pages, progress=self.progress)
+        finally:
+            disk.close()
+
+    def close(self):
+        """Close the build connection without persisting."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.building_path is not None:
+            if os.path.exists(self.building_path):
+                os.remove(self.building_path)
+            self.building_path = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.persist()
+        finally:
+            self.close()
+        return False
@@ -0,0 +1,360 @@
+import sqlite3
+import re
+import sys
+import json
+import time
+import argparse
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+
+# Functions wrapped with stage timers by Instrumentation.activate()
+GENERATOR_FUNCTIONS = (
+    'populate_project_data',
+    'generate_acoustic_material_data',
+    'generate_equipment_data',
+    'generate_equipment_spaces_data',
+    'generate_email_correspondence',
+    'generate_milestones',
+)
+
+ANALYSIS_FUNCTIONS = (
+    'get_room_volume_comparison',
+    'get_material_performance_comparison',
+    'plot_room_volumes',
+    'plot_material_performance',
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_COMMENT = re.compile(r"--[^\n]*")
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape so executions with different values group together"""
+    sql = _COMMENT.sub(' ', sql)
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _VALUE_LIST.sub('(?, ...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+class LatencyHistogram:
+    """Latency histogram with power-of-two microsecond buckets"""
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+        bucket = max(int(seconds * 1e6), 1).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Approximate percentile in seconds (upper bound of the matching bucket)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min((1 << bucket) / 1e6, self.maximum)
+        return self.maximum
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'min_ms': round((self.minimum or 0.0) * 1000, 3),
+            'p50_ms': round(self.percentile(0.5) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'max_ms': round(self.maximum * 1000, 3),
+            'histogram_us': {str(1 << bucket): n for bucket, n in sorted(self.buckets.items())},
+        }
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports execute/fetch latency to its connection's Instrumentation"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._last_sql = sql
+            self.connection.instrumentation.record_statement(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._last_sql = sql
+            self.connection.instrumentation.record_statement(sql, time.perf_counter() - start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self.connection.instrumentation.record_statement(sql_script, time.perf_counter() - start)
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            sql = getattr(self, '_last_sql', None)
+            if sql is not None:
+                self.connection.instrumentation.record_fetch(sql, time.perf_counter() - start)
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed_fetch(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute) are TracedCursors"""
+
+    instrumentation = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+class Instrumentation:
+    """Per-statement and per-stage timing for generation and analysis runs.
+
+    Statement latency is measured around ``execute``/``executemany`` (and the
+    fetches that follow them) on connections opened while the instrumentation
+    is active; ``set_trace_callback`` counts every statement SQLite runs,
+    including those inside scripts and triggers, and a progress handler counts
+    VM steps per stage. Stage timers wrap the generator and analysis functions.
+
+    When ``enabled`` is False nothing is installed: ``activate()`` and
+    ``stage()`` return no-op context managers and ``timed()`` returns the
+    function unchanged.
+    """
+
+    def __init__(self, enabled=True, progress_steps=1000):
+        self.enabled = enabled
+        self.progress_steps = progress_steps
+        self.statements = {}
+        self.fetches = {}
+        self.executions = {}
+        self.stages = {}
+        self.vm_steps = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # Recording
+
+    def _stage_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_stage(self):
+        stack = self._stage_stack()
+        return '/'.join(stack) if stack else '(none)'
+
+    def _add(self, table, key, seconds):
+        with self._lock:
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def record_statement(self, sql, seconds):
+        self._add(self.statements, normalize_sql(sql), seconds)
+
+    def record_fetch(self, sql, seconds):
+        self._add(self.fetches, normalize_sql(sql), seconds)
+
+    def _trace(self, sql):
+        key = normalize_sql(sql)
+        with self._lock:
+            self.executions[key] = self.executions.get(key, 0) + 1
+
+    def _progress(self):
+        stage = self.current_stage()
+        with self._lock:
+            self.vm_steps[stage] = self.vm_steps.get(stage, 0) + self.progress_steps
+        return 0
+
+    # Hooks
+
+    def instrument_connection(self, conn):
+        """Install the trace callback and progress handler on a connection"""
+        if not self.enabled:
+            return conn
+        conn.set_trace_callback(self._trace)
+        if self.progress_steps:
+            conn.set_progress_handler(self._progress, self.progress_steps)
+        if isinstance(conn, TracedConnection):
+            conn.instrumentation = self
+        return conn
+
+    def connect(self, database, *args, **kwargs):
+        """sqlite3.connect replacement returning an instrumented connection"""
+        kwargs.setdefault('factory', TracedConnection)
+        conn = _original_connect(database, *args, **kwargs)
+        return self.instrument_connection(conn)
+
+    def stage(self, name):
+        """Context manager timing a named stage; stages nest"""
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name):
+        stack = self._stage_stack()
+        stack.append(name)
+        key = '/'.join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(self.stages, key, time.perf_counter() - start)
+            stack.pop()
+
+    def timed(self, name=None):
+        """Decorator running a function inside a stage"""
+        def decorator(func):
+            if not self.enabled:
+                return func
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self._stage(stage_name):
+                    return func(*args, **kwargs)
+            wrapper.__wrapped_by_instrumentation__ = True
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def activate(self, modules=None):
+        """Instrument sqlite3.connect and the pipeline functions for a block.
+
+        ``modules`` defaults to generate_sample_data and analyze_projects; any
+        of GENERATOR_FUNCTIONS or ANALYSIS_FUNCTIONS found on them is wrapped
+        with a stage timer and restored afterwards.
+        """
+        if not self.enabled:
+            yield self
+            return
+
+        if modules is None:
+            import generate_sample_data
+            import analyze_projects
+            modules = (generate_sample_data, analyze_projects)
+
+        patched = []
+        for module in modules:
+            for name in GENERATOR_FUNCTIONS + ANALYSIS_FUNCTIONS:
+                func = getattr(module, name, None)
+                if func is None or getattr(func, '__wrapped_by_instrumentation__', False):
+                    continue
+                patched.append((module, name, func))
+                setattr(module, name, self.timed(name)(func))
+
+        sqlite3.connect = self.connect
+        try:
+            yield self
+        finally:
+            sqlite3.connect = _original_connect
+            for module, name, func in patched:
+                setattr(module, name, func)
+
+    # Reporting
+
+    def to_records(self):
+        """Aggregated results as a list of dicts, heaviest first within each kind"""
+        records = []
+        with self._lock:
+            for stage, histogram in self.stages.items():
+                records.append({'kind': 'stage', 'name': stage,
+                                'vm_steps': self.vm_steps.get(stage, 0), **histogram.to_dict()})
+            for sql, histogram in self.statements.items():
+                fetch = self.fetches.get(sql)
+                records.append({'kind': 'statement', 'sql': sql,
+                                'executions': self.executions.get(sql, histogram.count),
+                                'fetch_ms': round(fetch.total * 1000, 3) if fetch else 0.0,
+                                **histogram.to_dict()})
+        records.sort(key=lambda r: (r['kind'], -r['total_ms']))
+        return records
+
+    def write_jsonl(self, path):
+        """Write one JSON record per stage and statement"""
+        with open(path, 'w') as f:
+            for record in self.to_records():
+                f.write(json.dumps(record) + '\n')
+
+    def summary_table(self, limit=20):
+        """Readable summary of the slowest stages and statements"""
+        records = self.to_records()
+        lines = ['Stages:',
+                 f"  {'stage':<60} {'calls':>7} {'total ms':>11} {'p95 ms':>9} {'vm steps':>12}"]
+        for r in [r for r in records if r['kind'] == 'stage'][:limit]:
+            lines.append(f"  {r['name'][:60]:<60} {r['count']:>7} {r['total_ms']:>11.2f} "
+                         f"{r['p95_ms']:>9.3f} {r['vm_steps']:>12}")
+        lines += ['', 'Statements:',
+                  f"  {'statement':<60} {'calls':>7} {'total ms':>11} {'p95 ms':>9} {'fetch ms':>9}"]
+        for r in [r for r in records if r['kind'] == 'statement'][:limit]:
+            lines.append(f"  {r['sql'][:60]:<60} {r['count']:>7} {r['total_ms']:>11.2f} "
+                         f"{r['p95_ms']:>9.3f} {r['fetch_ms']:>9.2f}")
+        return '\n'.join(lines)
+
+_original_connect = sqlite3.connect
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profile a generation or analysis run')
+    parser.add_argument('run', choices=['generate', 'analyze'])
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--jsonl', help='write JSON lines here instead of printing a table')
+    args = parser.parse_args(argv)
+
+    import generate_sample_data
+    import analyze_projects
+
+    instrumentation = Instrumentation()
+    with instrumentation.activate():
+        if args.run == 'generate':
+            generate_sample_data.main(args.db)
+        else:
+            analyze_projects.main(args.db)
+
+    if args.jsonl:
+        instrumentation.write_jsonl(args.jsonl)
+        print(f"Wrote {args.jsonl}")
+    else:
+        print(instrumentation.summary_table())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import sqlite3
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from compact_dates import is_compact_schema, storage_table
+
+NRC_RANGE = (0.0, 1.2)
+SOUND_POWER_RANGE = (20.0, 140.0)
+MAX_SLIP_DAYS = 90
+VOLUME_TOLERANCE = 0.5  # ft³, volumes are stored rounded to one decimal
+AMOUNT_TOLERANCE = 0.01
+
+NRC_COLUMNS = ['nrc_single_value', 'nrc_125', 'nrc_250', 'nrc_500', 'nrc_1000', 'nrc_2000', 'nrc_4000']
+SOUND_POWER_COLUMNS = ['sound_power_125', 'sound_power_250', 'sound_power_500', 'sound_power_1000',
+                       'sound_power_2000', 'sound_power_4000', 'sound_power_8000']
+
+CHILD_TABLES = ['budget', 'astm_tests', 'acoustic_materials', 'equipment_spaces', 'equipment',
+                'email_correspondence', 'deliverables', 'milestones']
+
+def _day(column, compact):
+    """Expression giving a date column in days, for either schema variant"""
+    return column if compact else f"julianday({column})"
+
+def build_rules(compact=False, max_slip_days=MAX_SLIP_DAYS):
+    """Rules per table as (name, SQL condition true for violating rows, description)"""
+    low, high = NRC_RANGE
+    rules = {
+        'acoustic_materials': [
+            (f'{column}_range', f"{column} NOT BETWEEN {low} AND {high}",
+             f"{column} outside {low}-{high}")
+            for column in NRC_COLUMNS
+        ],
+        'equipment_spaces': [
+            ('volume_matches_dimensions',
+             f"ABS(volume_cubic_ft - length_ft * width_ft * height_ft) > {VOLUME_TOLERANCE}",
+             'volume_cubic_ft differs from length × width × height'),
+            ('positive_dimensions', "length_ft <= 0 OR width_ft <= 0 OR height_ft <= 0",
+             'non-positive room dimension'),
+        ],
+        'budget': [
+            ('remaining_matches_spent',
+             f"ABS(remaining_amount - (total_budget - spent_amount)) > {AMOUNT_TOLERANCE}",
+             'remaining_amount differs from total_budget - spent_amount'),
+            ('spent_not_negative', "spent_amount < 0", 'negative spent_amount'),
+        ],
+        'equipment': [
+            (f'{column}_range',
+             f"{column} NOT BETWEEN {SOUND_POWER_RANGE[0]} AND {SOUND_POWER_RANGE[1]}",
+             f"{column} outside {SOUND_POWER_RANGE[0]:g}-{SOUND_POWER_RANGE[1]:g} dB")
+            for column in SOUND_POWER_COLUMNS
+        ],
+        'milestones': [
+            ('actual_near_planned',
+             f"ABS({_day('actual_date', compact)} - {_day('planned_date', compact)}) > {max_slip_days}",
+             f"actual_date more than {max_slip_days} days from planned_date"),
+        ],
+        'deliverables': [],
+        'astm_tests': [],
+        'email_correspondence': [],
+    }
+    # Every child row must point at an existing project
+    projects = storage_table('projects') if compact else 'projects'
+    for table in CHILD_TABLES:
+        rules[table].append((
+            'orphaned_project_id',
+            f"project_id IS NULL OR NOT EXISTS (SELECT 1 FROM {projects} p WHERE p.project_id = t.project_id)",
+            'project_id missing from projects',
+        ))
+    return rules
+
+def _connect_ro(db_path):
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def key_column(conn, table):
+    """Primary key column of `table`; views have none, so their first column (the id) is used"""
+    columns = conn.execute(f"PRAGMA table_info('{table}')").fetchall()
+    keys = sorted((column for column in columns if column[5]), key=lambda column: column[5])
+    return (keys or columns)[0][1]
+
+def check_table(db_path, table, rules, sample_size=5):
+    """Count every rule's violations in one pass over a table, then sample offending rows"""
+    conn = _connect_ro(db_path)
+    try:
+        source = storage_table(table) if is_compact_schema(conn) else table
+        # rowid is NULL for views such as the normalized acoustic_materials, so sample by key
+        key = key_column(conn, source)
+        start = time.perf_counter()
+        counts = ', '.join(f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)" for _, condition, _ in rules)
+        row = conn.execute(f"SELECT COUNT(*), {counts} FROM {source} t").fetchone()
+        rows_checked, violations = row[0], row[1:]
+
+        results = []
+        for (name, condition, description), count in zip(rules, violations):
+            count = count or 0
+            sample = []
+            if count and sample_size:
+                sample = [r[0] for r in conn.execute(
+                    f"SELECT {key} FROM {source} t WHERE {condition} ORDER BY {key} LIMIT ?", (sample_size,))]
+            results.append({
+                'table': table,
+                'rule': name,
+                'description': description,
+                'rows_checked': rows_checked,
+                'violations': count,
+                'key_column': key,
+                'sample_keys': sample,
+            })
+        elapsed = time.perf_counter() - start
+        for result in results:
+            result['table_seconds'] = round(elapsed, 3)
+        return results
+    finally:
+        conn.close()
+
+def run_checks(db_path='project_management.db', tables=None, max_workers=4, sample_size=5,
+               max_slip_days=MAX_SLIP_DAYS):
+    """Run all rules, one table per worker, and return the flat list of results"""
+    conn = _connect_ro(db_path)
+    compact = is_compact_schema(conn)
+    conn.close()
+
+    rules = build_rules(compact, max_slip_days)
+    tables = tables or [table for table in rules if rules[table]]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(check_table, db_path, table, rules[table], sample_size) for table in tables]
+        return [result for future in futures for result in future.result()]
+
+def format_report(results, show_passing=False):
+    lines = [f"{'table':<22} {'rule':<28} {'rows':>10} {'violations':>11}  sample keys"]
+    for r in results:
+        if not r['violations'] and not show_passing:
+            continue
+        sample = ', '.join(map(str, r['sample_keys']))
+        if sample:
+            sample = f"{r['key_column']} {sample}"
+        lines.append(f"{r['table']:<22} {r['rule']:<28} {r['rows_checked']:>10} {r['violations']:>11}  {sample}")
+    failing = sum(1 for r in results if r['violations'])
+    lines.append(f"\n{failing} of {len(results)} rules failed")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check generated project data against integrity rules')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--tables', nargs='*', help='limit the scan to these tables')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--sample', type=int, default=5, help='offending row keys to list per rule')
+    parser.add_argument('--max-slip-days', type=int, default=MAX_SLIP_DAYS)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--all', action='store_true', help='list passing rules too')
+    args = parser.parse_args(argv)
+
+    results = run_checks(args.db, args.tables, args.workers, args.sample, args.max_slip_days)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_report(results, args.all))
+    return 1 if any(r['violations'] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import sqlite3
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+
+from concurrent_access import DEFAULT_BUSY_TIMEOUT_MS, configure_connection, with_retry
+
+ANALYSIS_LIMIT = 1000        # rows sampled per index by ANALYZE; 0 analyzes everything
+VACUUM_PAGES = 2000          # free pages released per incremental vacuum pass
+DEFAULT_INTERVAL = 3600      # seconds between scheduled runs
+
+# Child tables that parallel analysis reads by project_id range
+PROJECT_INDEXED_TABLES = ('equipment_spaces', 'acoustic_materials')
+
+# Planner statistics
+
+def analyze(conn, analysis_limit=ANALYSIS_LIMIT):
+    """Rebuild planner statistics for every table; use after bulk loads"""
+    conn.execute(f'PRAGMA analysis_limit = {int(analysis_limit)}')
+    conn.execute('ANALYZE')
+    conn.commit()
+
+def optimize(conn):
+    """Let SQLite refresh only the statistics that have gone stale"""
+    conn.execute('PRAGMA optimize')
+    conn.commit()
+
+# Free pages
+
+def auto_vacuum_mode(conn):
+    return {0: 'none', 1: 'full', 2: 'incremental'}[conn.execute('PRAGMA auto_vacuum').fetchone()[0]]
+
+def enable_incremental_vacuum(conn):
+    """Switch to auto_vacuum=INCREMENTAL; returns True if the file had to be rebuilt.
+
+    On a new database the pragma takes effect immediately. An existing one
+    needs a full VACUUM once to add the pointer-map pages.
+    """
+    if auto_vacuum_mode(conn) == 'incremental':
+        return False
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    has_tables = conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is not None
+    if has_tables:
+        conn.commit()
+        conn.execute('VACUUM')
+    return has_tables
+
+def incremental_vacuum(conn, max_pages=VACUUM_PAGES):
+    """Release at most `max_pages` free pages; returns the number released"""
+    if auto_vacuum_mode(conn) != 'incremental':
+        return 0
+    before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if before:
+        # The pragma frees one page per step and returns no rows, so execute()
+        # stops after the first page; executescript steps it to completion
+        conn.commit()
+        conn.executescript(f'PRAGMA incremental_vacuum({int(max_pages)});')
+    return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+# Indexes
+
+def missing_project_indexes(conn, tables=PROJECT_INDEXED_TABLES):
+    """Tables with no index leading with project_id; views (e.g. normalized acoustic_materials) are skipped"""
+    missing = []
+    for table in tables:
+        kind = conn.execute('SELECT type FROM sqlite_master WHERE name = ?', (table,)).fetchone()
+        if kind is None or kind[0] != 'table':
+            continue
+        leading = {conn.execute(f"PRAGMA index_info('{index[1]}')").fetchone()[2]
+                   for index in conn.execute(f"PRAGMA index_list('{table}')")}
+        if 'project_id' not in leading:
+            missing.append(table)
+    return missing
+
+def ensure_project_indexes(conn, tables=PROJECT_INDEXED_TABLES):
+    """Index project_id where missing, so range scans by project read only their rows; returns the indexes created"""
+    created = []
+    for table in missing_project_indexes(conn, tables):
+        conn.execute(f'CREATE INDEX idx_{table}_project_id ON {table}(project_id)')
+        created.append(f'idx_{table}_project_id')
+    conn.commit()
+    return created
+
+# WAL
+
+def checkpoint(conn, mode='PASSIVE'):
+    """Checkpoint the WAL; returns (busy, wal pages, checkpointed pages) or None outside WAL mode"""
+    if conn.execute('PRAGMA journal_mode').fetchone()[0] != 'wal':
+        return None
+    return tuple(conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone())
+
+# Statistics
+
+def has_dbstat(conn):
+    try:
+        conn.execute('SELECT 1 FROM dbstat LIMIT 1').fetchall()
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+def table_stats(conn):
+    """Per-table and per-index page counts and bytes, plus row counts for tables.
+
+    Page figures come from the ``dbstat`` virtual table; SQLite builds
+    without it report rows only, with pages and bytes left as None.
+    """
+    objects = conn.execute('''
+    SELECT name, type, tbl_name FROM sqlite_master
+    WHERE type IN ('table', 'index') AND name NOT LIKE 'sqlite_%'
+    ORDER BY tbl_name, type DESC, name
+    ''').fetchall()
+    pages = {}
+    if has_dbstat(conn):
+        pages = {name: (count, size) for name, count, size in conn.execute(
+            'SELECT name, COUNT(*), SUM(pgsize) FROM dbstat GROUP BY name')}
+
+    stats = []
+    for name, kind, table in objects:
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] if kind == 'table' else None
+        page_count, size = pages.get(name, (None, None))
+        stats.append({'name': name, 'type': kind, 'table': table, 'rows': rows,
+                      'pages': page_count, 'bytes': size})
+    return stats
+
+def database_stats(conn):
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    return {
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': conn.execute('PRAGMA freelist_count').fetchone()[0],
+        'size_bytes': page_size * page_count,
+        'auto_vacuum': auto_vacuum_mode(conn),
+        'journal_mode': conn.execute('PRAGMA journal_mode').fetchone()[0],
+    }
+
+# Runs
+
+def run_maintenance(db_path='project_management.db', stage=None, full_analyze=False,
+                    vacuum_pages=VACUUM_PAGES, checkpoint_mode='PASSIVE', stats=True,
+                    conn=None, busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS):
+    """One maintenance pass; returns a report dict.
+
+    ``full_analyze`` rebuilds all statistics (after bulk loads, rollbacks and
+    resets); otherwise ``PRAGMA optimize`` refreshes only stale ones. Free
+    pages are released in one bounded incremental vacuum pass, so a run never
+    rewrites the whole file.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = configure_connection(sqlite3.connect(db_path), busy_timeout_ms)
+    try:
+        start = time.perf_counter()
+        report = {'stage': stage, 'started_at': datetime.now().isoformat(timespec='seconds')}
+        if full_analyze:
+            with_retry(analyze, conn)
+        else:
+            with_retry(optimize, conn)
+        report['analyze'] = 'full' if full_analyze else 'optimize'
+        report['pages_vacuumed'] = with_retry(incremental_vacuum, conn, vacuum_pages)
+        report['checkpoint'] = checkpoint(conn, checkpoint_mode) if checkpoint_mode else None
+        report['database'] = database_stats(conn)
+        if stats:
+            report['tables'] = table_stats(conn)
+        report['seconds'] = round(time.perf_counter() - start, 3)
+        return report
+    finally:
+        if own_conn:
+            conn.close()
+
+def after_load(conn, stage='load'):
+    """Maintenance for the end of a bulk pipeline stage: full statistics, no table report"""
+    return run_maintenance(stage=stage, full_analyze=True, stats=False, conn=conn)
+
+class MaintenanceScheduler:
+    """Background thread running ``run_maintenance`` every ``interval`` seconds.
+
+    Each run opens its own connection with a busy timeout, so it can share
+    the database with a WriterQueue or ReadPool. The latest report is kept
+    in ``last_report``; ``run_now()`` triggers a run without waiting for
+    the interval.
+    """
+
+    def __init__(self, db_path='project_management.db', interval=DEFAULT_INTERVAL, on_report=None, **options):
+        self.db_path = db_path
+        self.interval = interval
+        self.on_report = on_report
+        self.options = options
+        self.last_report = None
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='maintenance', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                self.last_report = run_maintenance(self.db_path, stage='scheduled', **self.options)
+                self.last_error = None
+                if self.on_report is not None:
+                    self.on_report(self.last_report)
+            except sqlite3.Error as e:
+                self.last_error = e
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def run_now(self):
+        self._wake.set()
+
+    def stop(self):
+        """Stop after the current run finishes"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def format_report(report):
+    db = report['database']
+    lines = [f"{report['stage'] or 'maintenance'}: {report['analyze']}, "
+             f"{report['pages_vacuumed']} pages vacuumed, checkpoint {report['checkpoint']}, "
+             f"{db['size_bytes'] / 1e6:.1f} MB ({db['freelist_count']} free pages, "
+             f"auto_vacuum={db['auto_vacuum']}, journal={db['journal_mode']}) in {report['seconds']}s"]
+    if report.get('tables'):
+        lines.append(f"  {'name':<40} {'type':<6} {'rows':>10} {'pages':>8} {'KB':>10}")
+        for t in report['tables']:
+            rows = '' if t['rows'] is None else t['rows']
+            pages = '-' if t['pages'] is None else t['pages']
+            kb = '-' if t['bytes'] is None else f"{t['bytes'] / 1024:.0f}"
+            lines.append(f"  {t['name'][:40]:<40} {t['type']:<6} {rows:>10} {pages:>8} {kb:>10}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ANALYZE, vacuum, checkpoint and report table sizes')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--full-analyze', action='store_true', help='rebuild all statistics (after bulk loads)')
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help='switch the database to auto_vacuum=INCREMENTAL (one-off full VACUUM)')
+    parser.add_argument('--project-indexes', action='store_true',
+                        help='index project_id on the tables parallel analysis reads by range')
+    parser.add_argument('--vacuum-pages', type=int, default=VACUUM_PAGES)
+    parser.add_argument('--checkpoint', choices=['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'], default='PASSIVE')
+    parser.add_argument('--every', type=float, metavar='SECONDS', help='keep running on this interval')
+    parser.add_argument('--json', action='store_true', help='print reports as JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        return 1
+    if args.enable_incremental_vacuum:
+        conn = sqlite3.connect(args.db)
+        rebuilt = enable_incremental_vacuum(conn)
+        conn.close()
+        print("Rebuilt database with auto_vacuum=INCREMENTAL" if rebuilt else "auto_vacuum=INCREMENTAL enabled")
+    if args.project_indexes:
+        conn = sqlite3.connect(args.db)
+        created = ensure_project_indexes(conn)
+        conn.close()
+        print(f"Created {', '.join(created)}" if created else "project_id indexes already present")
+
+    options = {'full_analyze': args.full_analyze, 'vacuum_pages': args.vacuum_pages,
+               'checkpoint_mode': args.checkpoint}
+    show = (lambda report: print(json.dumps(report, indent=2))) if args.json else \
+        (lambda report: print(format_report(report)))
+
+    if args.every is None:
+        show(run_maintenance(args.db, **options))
+        return 0
+
+    scheduler = MaintenanceScheduler(args.db, args.every, on_report=show, **options)
+    with scheduler:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import sqlite3
+import sys
+import argparse
+
+import pandas as pd
+
+from database_migrations import DatabaseMigration
+
+MIGRATION_NAME = 'normalize_acoustic_materials'
+
+# Columns describing a material; identical values mean the same catalog entry
+CATALOG_COLUMNS = [
+    'material_name', 'material_type', 'nrc_single_value',
+    'nrc_125', 'nrc_250', 'nrc_500', 'nrc_1000', 'nrc_2000', 'nrc_4000',
+    'stc_rating', 'iic_rating', 'cost_per_sqft', 'notes',
+]
+
+def _match(left, right):
+    """NULL-safe equality on every catalog column"""
+    return ' AND '.join(f'{left}.{column} IS {right}.{column}' for column in CATALOG_COLUMNS)
+
+_columns = ', '.join(CATALOG_COLUMNS)
+_new_columns = ', '.join(f'NEW.{column}' for column in CATALOG_COLUMNS)
+_new_match = ' AND '.join(f'mc.{column} IS NEW.{column}' for column in CATALOG_COLUMNS)
+
+# Find or create the catalog entry for NEW; used by the insert and update triggers
+_ENSURE_CATALOG_ENTRY = f'''
+    INSERT INTO material_catalog ({_columns})
+    SELECT {_new_columns}
+    WHERE NOT EXISTS (SELECT 1 FROM material_catalog mc WHERE {_new_match});'''
+
+_CATALOG_ID = f'(SELECT mc.catalog_id FROM material_catalog mc WHERE {_new_match} LIMIT 1)'
+
+NORMALIZE_MATERIALS_UP = f'''
+CREATE TABLE IF NOT EXISTS material_catalog (
+    catalog_id INTEGER PRIMARY KEY,
+    material_name TEXT NOT NULL,
+    material_type TEXT NOT NULL,
+    nrc_single_value REAL,
+    nrc_125 REAL,
+    nrc_250 REAL,
+    nrc_500 REAL,
+    nrc_1000 REAL,
+    nrc_2000 REAL,
+    nrc_4000 REAL,
+    stc_rating INTEGER,
+    iic_rating INTEGER,
+    cost_per_sqft REAL NOT NULL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_material_catalog_name ON material_catalog(material_name, material_type);
+CREATE INDEX IF NOT EXISTS idx_material_catalog_type ON material_catalog(material_type);
+
+CREATE TABLE IF NOT EXISTS project_materials (
+    material_id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    catalog_id INTEGER NOT NULL,
+    quantity_sqft REAL,  -- the source rows record no quantities; filled in once takeoffs exist
+    FOREIGN KEY (project_id) REFERENCES projects(project_id),
+    FOREIGN KEY (catalog_id) REFERENCES material_catalog(catalog_id)
+);
+CREATE INDEX IF NOT EXISTS idx_project_materials_project ON project_materials(project_id, catalog_id);
+CREATE INDEX IF NOT EXISTS idx_project_materials_catalog ON project_materials(catalog_id);
+
+-- One catalog entry per distinct material record
+INSERT INTO material_catalog ({_columns})
+SELECT DISTINCT {_columns} FROM acoustic_materials;
+
+-- Keep the existing material ids so references to them stay valid
+INSERT INTO project_materials (material_id, project_id, catalog_id)
+SELECT am.material_id, am.project_id, mc.catalog_id
+FROM acoustic_materials am
+JOIN material_catalog mc ON {_match('mc', 'am')};
+
+DROP TABLE acoustic_materials;
+
+CREATE VIEW acoustic_materials AS
+SELECT pm.material_id, pm.project_id, {', '.join(f'mc.{column}' for column in CATALOG_COLUMNS)}
+FROM project_materials pm
+JOIN material_catalog mc ON mc.catalog_id = pm.catalog_id;
+
+CREATE TRIGGER acoustic_materials_insert INSTEAD OF INSERT ON acoustic_materials
+BEGIN{_ENSURE_CATALOG_ENTRY}
+    INSERT INTO project_materials (material_id, project_id, catalog_id)
+    VALUES (NEW.material_id, NEW.project_id, {_CATALOG_ID});
+END;
+
+CREATE TRIGGER acoustic_materials_update INSTEAD OF UPDATE ON acoustic_materials
+BEGIN{_ENSURE_CATALOG_ENTRY}
+    UPDATE project_materials
+    SET material_id = NEW.material_id, project_id = NEW.project_id, catalog_id = {_CATALOG_ID}
+    WHERE material_id = OLD.material_id;
+END;
+
+CREATE TRIGGER acoustic_materials_delete INSTEAD OF DELETE ON acoustic_materials
+BEGIN
+    DELETE FROM project_materials WHERE material_id = OLD.material_id;
+END;
+'''
+
+NORMALIZE_MATERIALS_DOWN = f'''
+CREATE TABLE acoustic_materials_restored (
+    material_id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    material_name TEXT NOT NULL,
+    material_type TEXT NOT NULL,
+    nrc_single_value REAL,
+    nrc_125 REAL,
+    nrc_250 REAL,
+    nrc_500 REAL,
+    nrc_1000 REAL,
+    nrc_2000 REAL,
+    nrc_4000 REAL,
+    stc_rating INTEGER,
+    iic_rating INTEGER,
+    cost_per_sqft REAL NOT NULL,
+    notes TEXT,
+    FOREIGN KEY (project_id) REFERENCES projects(project_id)
+);
+INSERT INTO acoustic_materials_restored (material_id, project_id, {_columns})
+SELECT material_id, project_id, {_columns} FROM acoustic_materials ORDER BY material_id;
+
+DROP VIEW acoustic_materials;
+DROP TABLE project_materials;
+DROP TABLE material_catalog;
+ALTER TABLE acoustic_materials_restored RENAME TO acoustic_materials;
+'''
+
+PERFORMANCE_SUMMARY_QUERY = '''
+WITH usage AS (
+    SELECT pm.catalog_id, COUNT(*) AS uses
+    FROM project_materials pm
+    JOIN projects p ON p.project_id = pm.project_id
+    GROUP BY pm.catalog_id
+)
+SELECT mc.material_type,
+       SUM(u.uses * mc.nrc_single_value) / SUM(CASE WHEN mc.nrc_single_value IS NOT NULL THEN u.uses END),
+       SUM(u.uses * mc.stc_rating) * 1.0 / SUM(CASE WHEN mc.stc_rating IS NOT NULL THEN u.uses END),
+       SUM(u.uses * mc.iic_rating) * 1.0 / SUM(CASE WHEN mc.iic_rating IS NOT NULL THEN u.uses END),
+       SUM(u.uses * mc.cost_per_sqft) / SUM(u.uses),
+       MIN(mc.cost_per_sqft),
+       MAX(mc.cost_per_sqft)
+FROM usage u
+JOIN material_catalog mc ON mc.catalog_id = u.catalog_id
+GROUP BY mc.material_type
+ORDER BY mc.material_type
+'''
+
+SUMMARY_COLUMNS = pd.MultiIndex.from_tuples([
+    ('nrc_single_value', 'mean'),
+    ('stc_rating', 'mean'),
+    ('iic_rating', 'mean'),
+    ('cost_per_sqft', 'mean'),
+    ('cost_per_sqft', 'min'),
+    ('cost_per_sqft', 'max'),
+])
+
+def has_material_catalog(conn):
+    """True if acoustic_materials has been normalized into material_catalog"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'material_catalog'"
+    ).fetchone()
+    return row is not None
+
+def material_performance_summary(conn):
+    """get_material_performance_comparison's summary, aggregated per catalog entry.
+
+    Usage counts come from project_materials joined to projects, the same
+    rows get_material_performance_comparison returns, so the averages are
+    weighted sums over the catalog instead of a pass over every
+    per-project material row.
+    """
+    rows = conn.execute(PERFORMANCE_SUMMARY_QUERY).fetchall()
+    summary = pd.DataFrame([row[1:] for row in rows], columns=SUMMARY_COLUMNS,
+                           index=pd.Index([row[0] for row in rows], name='material_type'))
+    return summary.astype(float).round(2)
+
+def add_normalization_migration(migrator):
+    """Create the normalization migration file unless one already exists"""
+    for migration in migrator.get_all_migrations():
+        if migration['name'] == MIGRATION_NAME:
+            return migration['version']
+    version, _ = migrator.create_migration(MIGRATION_NAME, NORMALIZE_MATERIALS_UP, NORMALIZE_MATERIALS_DOWN)
+    return version
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Normalize acoustic_materials into a shared catalog')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--migrations-dir', default='migrations')
+    args = parser.parse_args(argv)
+
+    migrator = DatabaseMigration(args.db, args.migrations_dir)
+    add_normalization_migration(migrator)
+    migrator.migrate()
+
+    conn = sqlite3.connect(args.db)
+    entries = conn.execute('SELECT COUNT(*) FROM material_catalog').fetchone()[0]
+    uses = conn.execute('SELECT COUNT(*) FROM project_materials').fetchone()[0]
+    conn.close()
+    print(f"{uses} project materials share {entries} catalog entries")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
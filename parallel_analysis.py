@@ -0,0 +1,127 @@
+import sqlite3
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sharded_storage import (
+    ROOM_ROWS_SQL,
+    ROOM_PARTIALS_SQL,
+    MATERIAL_ROWS_SQL,
+    MATERIAL_PARTIALS_SQL,
+    merge_room_partials,
+    merge_material_partials,
+)
+from maintenance import ensure_project_indexes, missing_project_indexes
+
+PARTITIONS_PER_WORKER = 4  # smaller partitions keep every worker busy until the end
+
+def _connect_ro(db_path):
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def check_project_indexes(db_path, create=False):
+    """Create the project_id indexes, or just report any that are missing.
+
+    Without them every worker scans the whole table for its range; the
+    analysis stays read-only unless ``create`` is set.
+    """
+    if create:
+        conn = sqlite3.connect(db_path)
+        try:
+            return ensure_project_indexes(conn)
+        finally:
+            conn.close()
+    conn = _connect_ro(db_path)
+    try:
+        missing = missing_project_indexes(conn)
+    finally:
+        conn.close()
+    if missing:
+        print(f"No project_id index on {', '.join(missing)}; each worker scans the whole table "
+              f"(python maintenance.py --project-indexes creates them)")
+    return []
+
+def project_partitions(db_path, partitions):
+    """Split the project ids into up to `partitions` contiguous (low, high) ranges of equal size"""
+    conn = _connect_ro(db_path)
+    try:
+        ids = np.array([row[0] for row in conn.execute('SELECT project_id FROM projects ORDER BY project_id')],
+                       dtype=np.int64)
+    finally:
+        conn.close()
+    if not len(ids):
+        return []
+    return [(int(chunk[0]), int(chunk[-1])) for chunk in np.array_split(ids, min(partitions, len(ids)))]
+
+def analyze_partition(db_path, low, high, include_rows=True):
+    """Rows and partial aggregates for projects low..high, on a read-only connection"""
+    conn = _connect_ro(db_path)
+    try:
+        def run(template, column):
+            sql = template.format(db='main', filter=f'{column} BETWEEN ? AND ?')
+            return pd.read_sql_query(sql, conn, params=(low, high))
+
+        return {
+            'room_rows': run(ROOM_ROWS_SQL, 'es.project_id') if include_rows else None,
+            'room_partials': run(ROOM_PARTIALS_SQL, 'es.project_id'),
+            'material_rows': run(MATERIAL_ROWS_SQL, 'am.project_id') if include_rows else None,
+            'material_partials': run(MATERIAL_PARTIALS_SQL, 'am.project_id'),
+        }
+    finally:
+        conn.close()
+
+def analyze_parallel(db_path='project_management.db', workers=None, include_rows=True, create_indexes=False):
+    """Run the room and material analysis across a process pool.
+
+    Project ids are split into contiguous ranges, each analysed by a worker
+    process on its own ``mode=ro`` connection. The partial SUM/COUNT/MIN/MAX
+    aggregates are reduced into the same ``project_summary`` and
+    ``performance_summary`` frames as ``analyze_projects``. Returns
+    (room_df, project_summary, material_df, performance_summary); the row
+    frames are None when ``include_rows`` is False. Missing ``project_id``
+    indexes are reported, and only created with ``create_indexes``.
+    """
+    workers = workers or os.cpu_count() or 1
+    check_project_indexes(db_path, create_indexes)
+    # An empty database still runs one (empty) range, so the frames keep their columns
+    ranges = project_partitions(db_path, workers * PARTITIONS_PER_WORKER) or [(0, 0)]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        futures = [pool.submit(analyze_partition, db_path, low, high, include_rows) for low, high in ranges]
+        results = [future.result() for future in futures]
+
+    def combine(key):
+        return pd.concat([result[key] for result in results], ignore_index=True)
+
+    room_df = material_df = None
+    if include_rows:
+        room_df = combine('room_rows').sort_values('volume_cubic_ft', ascending=False, ignore_index=True,
+                                                   kind='stable')
+        material_df = combine('material_rows')
+
+    project_summary = merge_room_partials(combine('room_partials'))
+    performance_summary = merge_material_partials(combine('material_partials'))
+    return room_df, project_summary, material_df, performance_summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze projects across a process pool')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--create-indexes', action='store_true', help='create missing project_id indexes first')
+    args = parser.parse_args(argv)
+
+    _, project_summary, _, performance_summary = analyze_parallel(args.db, args.workers, include_rows=False,
+                                                                  create_indexes=args.create_indexes)
+    print("\nRoom Volume Analysis by Project:")
+    print(project_summary)
+    print("\nMaterial Performance Summary:")
+    print(performance_summary)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import sqlite3
+import os
+import re
+import sys
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_FILES_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS project_files (
+    file_id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    relative_path TEXT NOT NULL UNIQUE,
+    size_bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    scanned_at TIMESTAMP NOT NULL,
+    FOREIGN KEY (project_id) REFERENCES projects(project_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_project_files_project ON project_files(project_id);
+'''
+
+UPSERT_FILE = '''
+INSERT INTO project_files (project_id, relative_path, size_bytes, mtime_ns, sha256, scanned_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(relative_path) DO UPDATE SET
+    project_id = excluded.project_id,
+    size_bytes = excluded.size_bytes,
+    mtime_ns = excluded.mtime_ns,
+    sha256 = excluded.sha256,
+    scanned_at = excluded.scanned_at
+'''
+
+# Matches folders created by create_project_database.materialize_project_folders
+PROJECT_DIR_PATTERN = re.compile(r'^Project_(\d+)_')
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def create_project_files_table(conn):
+    conn.executescript(PROJECT_FILES_SCHEMA)
+
+def hash_file(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_project_dirs(base_dir):
+    """(project_id, path) for each project folder directly under base_dir"""
+    project_dirs = []
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            match = PROJECT_DIR_PATTERN.match(entry.name)
+            if match and entry.is_dir():
+                project_dirs.append((int(match.group(1)), entry.path))
+    return sorted(project_dirs)
+
+def walk_files(root):
+    """Yield (path, stat) for every file under root using os.scandir"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
+def _scan_project_dir(base_dir, project_dir, known):
+    """Stat one project folder and hash only new or changed files.
+
+    ``known`` maps relative path to (size, mtime_ns) from the last scan.
+    Returns (changed rows, relative paths seen).
+    """
+    changed = []
+    seen = set()
+    for path, stat in walk_files(project_dir):
+        relative_path = os.path.relpath(path, base_dir).replace(os.sep, '/')
+        seen.add(relative_path)
+        if known.get(relative_path) == (stat.st_size, stat.st_mtime_ns):
+            continue
+        changed.append((relative_path, stat.st_size, stat.st_mtime_ns, hash_file(path)))
+    return changed, seen
+
+def scan_project_files(conn, base_dir='.', max_workers=8, batch_size=1000):
+    """Sync file metadata for every project folder into project_files.
+
+    Only files whose size or mtime differ from the stored values are hashed
+    and written; files that disappeared are removed. Project folders are
+    walked and hashed in parallel, while all writes stay on ``conn``.
+    Returns counts of files seen, (re)hashed and removed.
+    """
+    create_project_files_table(conn)
+    scanned_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    project_dirs = find_project_dirs(base_dir)
+    stats = {'projects': len(project_dirs), 'files': 0, 'hashed': 0, 'removed': 0}
+
+    def known_files(project_id):
+        cursor = conn.execute('''
+        SELECT relative_path, size_bytes, mtime_ns FROM project_files WHERE project_id = ?
+        ''', (project_id,))
+        return {path: (size, mtime) for path, size, mtime in cursor}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for project_id, project_dir in project_dirs:
+            known = known_files(project_id)
+            future = pool.submit(_scan_project_dir, base_dir, project_dir, known)
+            futures.append((project_id, known, future))
+
+        batch = []
+        for project_id, known, future in futures:
+            changed, seen = future.result()
+            stats['files'] += len(seen)
+            stats['hashed'] += len(changed)
+            batch.extend((project_id, path, size, mtime, digest, scanned_at)
+                         for path, size, mtime, digest in changed)
+            if len(batch) >= batch_size:
+                conn.executemany(UPSERT_FILE, batch)
+                batch = []
+
+            removed = [(path,) for path in known.keys() - seen]
+            if removed:
+                conn.executemany('DELETE FROM project_files WHERE relative_path = ?', removed)
+                stats['removed'] += len(removed)
+
+        if batch:
+            conn.executemany(UPSERT_FILE, batch)
+
+    # Folders that no longer exist at all
+    present = {project_id for project_id, _ in project_dirs}
+    stored = {row[0] for row in conn.execute('SELECT DISTINCT project_id FROM project_files')}
+    for project_id in stored - present:
+        cursor = conn.execute('DELETE FROM project_files WHERE project_id = ?', (project_id,))
+        stats['removed'] += cursor.rowcount
+
+    conn.commit()
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sync project folder file metadata into the database')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--base-dir', default='.')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    stats = scan_project_files(conn, args.base_dir, args.workers)
+    conn.close()
+    print(f"Scanned {stats['files']} files in {stats['projects']} projects: "
+          f"{stats['hashed']} hashed, {stats['removed']} removed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
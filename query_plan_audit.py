@@ -0,0 +1,288 @@
+import sqlite3
+import io
+import re
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from instrumentation import Instrumentation, normalize_sql
+
+DEFAULT_PROJECTS = 200
+# Accepted flags per statement; tests/test_query_plan_audit.py fails on anything new
+BASELINE_PATH = Path(__file__).resolve().parent / 'query_plan_baseline.json'
+
+# A self-contained migration, so migrate/rollback statements are captured too
+AUDIT_MIGRATION = {
+    'version': 'V20000101000000',
+    'name': 'plan_audit',
+    'up': 'CREATE TABLE plan_audit (id INTEGER PRIMARY KEY, value TEXT);',
+    'down': 'DROP TABLE plan_audit;',
+    'checksum': 'plan-audit',
+}
+
+_AUDITED = re.compile(r'^\s*(SELECT|WITH|UPDATE|DELETE|INSERT\b.*\bSELECT)\b', re.IGNORECASE | re.DOTALL)
+_TABLE_REF = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|INNER|CROSS|GROUP|ORDER|LIMIT|USING|SET)\b)(\w+))?',
+    re.IGNORECASE)
+_CLAUSE = r'\b{}\s+BY\s+(.+?)(?=\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bUNION\b|\)|;|$)'
+_FILTER = re.compile(r'(?:(\w+)\.)?(\w+)\s*(=|IN\b|<=?|>=?|BETWEEN\b)\s*(\?|-?\d|\'|\()', re.IGNORECASE)
+
+# Plan details worth flagging: (flag, pattern)
+PLAN_FLAGS = [
+    ('full_scan', re.compile(r'^SCAN (\w+)$')),
+    ('temp_btree', re.compile(r'^USE TEMP B-TREE FOR (.+)$')),
+    ('automatic_index', re.compile(r'^(?:SEARCH|SCAN) (\w+) USING AUTOMATIC (?:COVERING |PARTIAL )*INDEX \((.+)\)$')),
+    ('non_covering_index', re.compile(r'^SEARCH (\w+) USING INDEX (\w+) \((.+)\)$')),
+]
+
+class StatementCapture(Instrumentation):
+    """Instrumentation that also keeps one runnable example of each statement.
+
+    The trace callback receives statements with their parameters expanded,
+    so the first execution of each normalized statement can be re-run under
+    ``EXPLAIN QUERY PLAN`` after the workload finishes.
+    """
+
+    def __init__(self):
+        super().__init__(progress_steps=0)
+        self.samples = {}
+
+    def _trace(self, sql):
+        super()._trace(sql)
+        # Statements run by triggers are traced as "-- TRIGGER ..." comments
+        if sql.lstrip().startswith('--') or not _AUDITED.match(sql):
+            return
+        key = normalize_sql(sql)
+        with self._lock:
+            self.samples.setdefault(key, sql)
+
+def run_workload(work_dir, num_projects=DEFAULT_PROJECTS):
+    """Generate a database, analyze it and run a migration cycle, capturing every statement"""
+    from create_project_database import create_database, generate_sample_data
+    from generate_sample_data import populate_project_data
+    from analyze_projects import get_room_volume_comparison, get_material_performance_comparison
+    from database_migrations import DatabaseMigration
+
+    db_path = str(Path(work_dir) / 'project_management.db')
+    migrations_dir = Path(work_dir) / 'migrations'
+    capture = StatementCapture()
+    with capture.activate(), redirect_stdout(io.StringIO()):
+        conn = create_database(db_path)
+        generate_sample_data(conn, num_projects)
+        populate_project_data(conn)
+        conn.close()
+
+        get_room_volume_comparison(db_path)
+        get_material_performance_comparison(db_path)
+
+        migrator = DatabaseMigration(db_path, migrations_dir)
+        with open(migrations_dir / f"{AUDIT_MIGRATION['version']}_{AUDIT_MIGRATION['name']}.sql", 'w') as f:
+            json.dump(AUDIT_MIGRATION, f, indent=2)
+        migrator.migrate()
+        migrator.rollback()
+        migrator.migrate()
+    return db_path, capture.samples
+
+# Plan analysis
+
+def _table_refs(sql):
+    """Map of alias (or bare table name) to table name"""
+    refs = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        refs[alias or table] = table
+        refs.setdefault(table, table)
+    return refs
+
+def _clause_columns(sql, clause, alias, single_table):
+    match = re.search(_CLAUSE.format(clause), sql, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return []
+    columns = []
+    for term in match.group(1).split(','):
+        term = term.strip()
+        qualified = re.match(r'(\w+)\.(\w+)(\s+DESC)?', term, re.IGNORECASE)
+        if qualified and qualified.group(1) == alias:
+            columns.append(qualified.group(2) + (' DESC' if qualified.group(3) else ''))
+        elif not qualified and single_table and re.match(r'\w+(\s+DESC)?$', term, re.IGNORECASE):
+            columns.append(term)
+        else:
+            # A term from another table or an expression: no single-table index covers it
+            return []
+    return columns
+
+def _filter_columns(sql, alias, single_table, table_columns):
+    """Columns of `alias` compared with a constant, equality comparisons first"""
+    where = re.search(r'\bWHERE\b(.+)', sql, re.IGNORECASE | re.DOTALL)
+    if not where:
+        return []
+    equality, ranges = [], []
+    for qualifier, column, op, _ in _FILTER.findall(where.group(1)):
+        if (qualifier != alias if qualifier else not single_table) or column not in table_columns:
+            continue
+        target = equality if op.upper() in ('=', 'IN') else ranges
+        if column not in equality + ranges:
+            target.append(column)
+    return equality + ranges[:1]
+
+def _index_statement(table, columns):
+    names = '_'.join(column.split()[0] for column in columns)
+    return f"CREATE INDEX IF NOT EXISTS idx_{table}_{names} ON {table}({', '.join(columns)});"
+
+def explain(conn, sql):
+    """EXPLAIN QUERY PLAN detail lines, or raises sqlite3.Error"""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+
+def audit_statement(conn, sql, schema):
+    """Flags and recommended indexes for one statement's plan"""
+    plan = explain(conn, sql)
+    refs = _table_refs(sql)
+    real_tables = {alias: table for alias, table in refs.items() if table in schema}
+    single_table = len(set(real_tables.values())) == 1
+    flags, recommendations = [], []
+
+    def recommend(table, columns):
+        if columns:
+            recommendations.append(_index_statement(table, columns))
+
+    for detail in plan:
+        for flag, pattern in PLAN_FLAGS:
+            match = pattern.match(detail)
+            if not match:
+                continue
+            if flag == 'temp_btree':
+                flags.append(f"temp_btree:{match.group(1)}")
+                clause = match.group(1).split()[0]
+                if clause in ('ORDER', 'GROUP') and real_tables:
+                    for alias, table in real_tables.items():
+                        columns = _clause_columns(sql, clause, alias, single_table)
+                        if columns:
+                            # Lead with filtered columns so the index serves both
+                            leading = _filter_columns(sql, alias, single_table, schema[table])
+                            recommend(table, [c for c in leading if c not in columns] + columns)
+                            break
+                continue
+            alias = match.group(1)
+            table = real_tables.get(alias)
+            if table is None:
+                continue  # CTEs and subqueries
+            if flag == 'full_scan':
+                columns = _filter_columns(sql, alias, single_table, schema[table])
+                # Unfiltered scans read every row anyway; only flag what an index could avoid
+                if columns:
+                    flags.append(f"full_scan:{table}")
+                    recommend(table, columns)
+            elif flag == 'automatic_index':
+                flags.append(f"automatic_index:{table}")
+                recommend(table, [term.split('=')[0].split('>')[0].split('<')[0].strip()
+                                  for term in match.group(2).split(' AND ')])
+            else:
+                flags.append(f"non_covering_index:{table}")
+                keyed = [term.split('=')[0].split('>')[0].split('<')[0].strip()
+                         for term in match.group(3).split(' AND ')]
+                used = {column for qualifier, column in re.findall(r'\b(\w+)\.(\w+)\b', sql)
+                        if qualifier == alias and column in schema[table]}
+                if single_table:
+                    used |= {column for column in schema[table] if re.search(rf'\b{column}\b', sql)}
+                extra = sorted(used - set(keyed))
+                if 0 < len(extra) <= 4:
+                    recommend(table, keyed + extra)
+    return plan, sorted(set(flags)), list(dict.fromkeys(recommendations))
+
+def audit(db_path, statements):
+    """Explain every captured statement; returns one record per statement shape"""
+    conn = sqlite3.connect(db_path)
+    schema = {table: [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+              for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    records = []
+    for key, sql in sorted(statements.items()):
+        try:
+            plan, flags, recommendations = audit_statement(conn, sql, schema)
+            error = None
+        except sqlite3.Error as e:
+            # e.g. temp tables or tables a later migration dropped
+            plan, flags, recommendations, error = [], [], [], str(e)
+        records.append({'sql': key, 'plan': plan, 'flags': flags,
+                        'recommendations': recommendations, 'error': error})
+    conn.close()
+    return records
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def write_baseline(records, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump({r['sql']: r['flags'] for r in records}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def compare_to_baseline(records, baseline):
+    """Flags that are new relative to a baseline {sql: [flags]} mapping"""
+    regressions = []
+    for record in records:
+        new_flags = set(record['flags']) - set(baseline.get(record['sql'], []))
+        if new_flags:
+            regressions.append((record['sql'], sorted(new_flags)))
+    return regressions
+
+def print_report(records):
+    flagged = [r for r in records if r['flags']]
+    for r in flagged:
+        print(f"\n{r['sql'][:120]}")
+        for detail in r['plan']:
+            print(f"    plan: {detail}")
+        print(f"    flags: {', '.join(r['flags'])}")
+    recommendations = list(dict.fromkeys(rec for r in records for rec in r['recommendations']))
+    print(f"\n{len(flagged)} of {len(records)} statements flagged, "
+          f"{sum(1 for r in records if r['error'])} could not be explained")
+    if recommendations:
+        print("\nRecommended indexes:")
+        for statement in recommendations:
+            print(f"  {statement}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Audit the query plans of every statement the project runs')
+    parser.add_argument('--projects', type=int, default=DEFAULT_PROJECTS,
+                        help='projects in the generated audit database')
+    parser.add_argument('--output', help='write the full audit as JSON here')
+    parser.add_argument('--write-baseline', metavar='BASELINE', nargs='?', const=str(BASELINE_PATH),
+                        help='record the current flags as the accepted baseline (default: the committed one)')
+    parser.add_argument('--compare', metavar='BASELINE', nargs='?', const=str(BASELINE_PATH),
+                        help='exit non-zero if any statement gained a flag since this baseline '
+                             '(default: the committed one)')
+    parser.add_argument('--keep-dir', help='copy the generated database here')
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='plan_audit_')
+    try:
+        db_path, statements = run_workload(work_dir, args.projects)
+        records = audit(db_path, statements)
+        if args.keep_dir:
+            shutil.copytree(work_dir, args.keep_dir, dirs_exist_ok=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(records)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(records, f, indent=2)
+    if args.write_baseline:
+        write_baseline(records, args.write_baseline)
+        print(f"\nBaseline written to {args.write_baseline}")
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        regressions = compare_to_baseline(records, baseline)
+        if regressions:
+            print(f"\n{len(regressions)} plan regressions against {args.compare}:")
+            for sql, flags in regressions:
+                print(f"  {sql[:100]}: {', '.join(flags)}")
+            return 1
+        print(f"\nNo plan regressions against {args.compare}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+import sqlite3
+import sys
+import json
+import asyncio
+import argparse
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+from concurrent_access import ReadPool
+from analyze_projects import get_room_volume_comparison, get_material_performance_comparison
+
+SPACES_QUERY = '''
+SELECT space_id, space_name, space_type, length_ft, width_ft, height_ft, volume_cubic_ft,
+       nc_requirement, rt60_500hz, rt60_1000hz, rt60_2000hz, background_noise_dba, notes
+FROM equipment_spaces
+WHERE project_id = ?
+ORDER BY space_id
+'''
+
+EQUIPMENT_QUERY = '''
+SELECT equipment_id, equipment_name, equipment_type,
+       sound_power_125, sound_power_250, sound_power_500, sound_power_1000,
+       sound_power_2000, sound_power_4000, sound_power_8000, notes
+FROM equipment
+WHERE project_id = ?
+ORDER BY equipment_id
+'''
+
+ROOMS_QUERY = '''
+SELECT p.project_id, p.project_name, p.client_name, es.space_name, es.space_type,
+       es.volume_cubic_ft, es.nc_requirement, es.rt60_500hz, es.background_noise_dba
+FROM equipment_spaces es
+JOIN projects p ON es.project_id = p.project_id
+'''
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ResponseCache:
+    """LRU cache of encoded responses, cleared whenever the database changes.
+
+    Changes are detected with ``PRAGMA data_version`` on a dedicated
+    read-only connection: its value moves whenever another connection
+    commits, so writes made while the service runs are picked up on the
+    next request.
+    """
+
+    def __init__(self, db_path, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        self._version_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._version = self._data_version()
+        self.hits = 0
+        self.misses = 0
+
+    def _data_version(self):
+        return self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _check_version(self):
+        version = self._data_version()
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+
+    def get(self, key):
+        with self._lock:
+            self._check_version()
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def version(self):
+        """Current data version; pass it to put() for a response computed after this call"""
+        with self._lock:
+            self._check_version()
+            return self._version
+
+    def put(self, key, value, version):
+        """Store a response unless the database changed since `version` was read"""
+        with self._lock:
+            self._check_version()
+            if version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def close(self):
+        self._version_conn.close()
+
+def _frame_json(df):
+    """Summary frame as a JSON list of records, flattening grouped column names"""
+    df = df.copy()
+    if df.columns.nlevels > 1:
+        df.columns = ['_'.join(part for part in column if part) for column in df.columns]
+    return df.reset_index().to_json(orient='records').encode()
+
+def _rows_json(cursor):
+    columns = [d[0] for d in cursor.description]
+    return json.dumps([dict(zip(columns, row)) for row in cursor.fetchall()]).encode()
+
+def _require_project(conn, project_id):
+    if conn.execute('SELECT 1 FROM projects WHERE project_id = ?', (project_id,)).fetchone() is None:
+        raise HTTPError(404, f'Project {project_id} not found')
+
+def room_summary(conn):
+    return _frame_json(get_room_volume_comparison(conn=conn)[1])
+
+def material_summary(conn):
+    return _frame_json(get_material_performance_comparison(conn=conn, include_rows=False)[1])
+
+def project_list(conn):
+    return _rows_json(conn.execute(
+        'SELECT project_id, project_name, client_name, status, percent_complete '
+        'FROM projects ORDER BY project_id'))
+
+def project_spaces(conn, project_id):
+    _require_project(conn, project_id)
+    return _rows_json(conn.execute(SPACES_QUERY, (project_id,)))
+
+def project_equipment(conn, project_id):
+    _require_project(conn, project_id)
+    return _rows_json(conn.execute(EQUIPMENT_QUERY, (project_id,)))
+
+class QueryService:
+    """Read-only JSON API over the project database.
+
+    Queries run on a ``ReadPool`` of read-only connections, off the event
+    loop. Summary and per-project responses are cached (identical requests
+    that arrive while one is being computed share its result), and
+    ``/rooms`` streams every room as a chunked JSON array.
+
+    Routes::
+
+        GET /health
+        GET /projects
+        GET /projects/<id>/spaces
+        GET /projects/<id>/equipment
+        GET /summary/rooms
+        GET /summary/materials
+        GET /rooms[?project_id=<id>]
+    """
+
+    def __init__(self, db_path='project_management.db', readers=8, cache_entries=256, chunk_rows=1000):
+        self.db_path = db_path
+        self.chunk_rows = chunk_rows
+        self.pool = ReadPool(db_path, readers)
+        self.cache = ResponseCache(db_path, cache_entries)
+        self._inflight = {}
+        self._server = None
+
+    # Query execution
+
+    async def _query(self, func, *args):
+        return await asyncio.wrap_future(self.pool.submit(func, *args))
+
+    async def _cached(self, key, func, *args):
+        body = self.cache.get(key)
+        if body is not None:
+            return body
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        # Read before the query runs, so a commit landing mid-query keeps the body out of the cache
+        version = self.cache.version()
+        task = asyncio.ensure_future(self._query(func, *args))
+        self._inflight[key] = task
+        try:
+            body = await task
+        finally:
+            del self._inflight[key]
+        self.cache.put(key, body, version)
+        return body
+
+    def _route(self, path):
+        parts = [part for part in path.split('/') if part]
+        if parts == ['health']:
+            return None, None, ()
+        if parts == ['projects']:
+            return path, project_list, ()
+        if parts == ['summary', 'rooms']:
+            return path, room_summary, ()
+        if parts == ['summary', 'materials']:
+            return path, material_summary, ()
+        if len(parts) == 3 and parts[0] == 'projects' and parts[2] in ('spaces', 'equipment'):
+            try:
+                project_id = int(parts[1])
+            except ValueError:
+                raise HTTPError(400, f'Invalid project id: {parts[1]}')
+            func = project_spaces if parts[2] == 'spaces' else project_equipment
+            return path, func, (project_id,)
+        raise HTTPError(404, f'No route for {path}')
+
+    # Streaming
+
+    def _stream_rooms(self, conn, project_id, loop, chunks, stop):
+        """Pool job: push encoded chunks of room rows onto an asyncio queue"""
+        def put(item):
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        sql = ROOMS_QUERY
+        params = ()
+        if project_id is not None:
+            sql += 'WHERE es.project_id = ?\n'
+            params = (project_id,)
+        cursor = conn.execute(sql + 'ORDER BY es.project_id, es.space_id', params)
+        columns = [d[0] for d in cursor.description]
+        first = True
+        try:
+            while not stop.is_set():
+                rows = cursor.fetchmany(self.chunk_rows)
+                if not rows:
+                    break
+                records = ','.join(json.dumps(dict(zip(columns, row))) for row in rows)
+                put((('[' if first else ',') + records).encode())
+                first = False
+            put((b'[' if first else b'') + b']')
+        finally:
+            put(None)
+
+    async def _send_rooms(self, writer, query, keep_alive):
+        project_id = None
+        if 'project_id' in query:
+            try:
+                project_id = int(query['project_id'][0])
+            except ValueError:
+                raise HTTPError(400, f"Invalid project id: {query['project_id'][0]}")
+
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(maxsize=4)
+        stop = threading.Event()
+        job = asyncio.wrap_future(self.pool.submit(self._stream_rooms, project_id, loop, chunks, stop))
+
+        writer.write(self._head(200, keep_alive, chunked=True))
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                await writer.drain()
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        finally:
+            # Unblock the pool job if the client went away mid-stream
+            stop.set()
+            while not job.done():
+                while not chunks.empty():
+                    chunks.get_nowait()
+                await asyncio.sleep(0)
+            await job
+
+    # HTTP
+
+    @staticmethod
+    def _head(status, keep_alive, length=None, chunked=False):
+        lines = [f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}',
+                 'Content-Type: application/json',
+                 f'Connection: {"keep-alive" if keep_alive else "close"}']
+        if chunked:
+            lines.append('Transfer-Encoding: chunked')
+        else:
+            lines.append(f'Content-Length: {length}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode()
+
+    def _send(self, writer, status, body, keep_alive):
+        writer.write(self._head(status, keep_alive, len(body)) + body)
+
+    async def _respond(self, writer, method, target, keep_alive):
+        url = urlsplit(target)
+        try:
+            if method != 'GET':
+                raise HTTPError(405, f'Method {method} not allowed')
+            if url.path.rstrip('/') == '/rooms':
+                try:
+                    await self._send_rooms(writer, parse_qs(url.query), keep_alive)
+                except sqlite3.Error as e:
+                    # Headers are already sent, so the only signal left is dropping the connection
+                    raise ConnectionAbortedError(str(e)) from e
+                return
+            key, func, args = self._route(url.path)
+            if func is None:
+                body = json.dumps({'status': 'ok', 'cache_hits': self.cache.hits,
+                                   'cache_misses': self.cache.misses}).encode()
+            else:
+                body = await self._cached(key, func, *args)
+            self._send(writer, 200, body, keep_alive)
+        except HTTPError as e:
+            self._send(writer, e.status, json.dumps({'error': str(e)}).encode(), keep_alive)
+        except sqlite3.Error as e:
+            self._send(writer, 500, json.dumps({'error': str(e)}).encode(), keep_alive)
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    self._send(writer, 400, b'{"error": "Malformed request line"}', False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, method, target, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=1024)
+        return self._server
+
+    async def serve_forever(self, host='127.0.0.1', port=8765):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self.pool.close()
+        self.cache.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve project analyses as JSON over HTTP')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--cache-entries', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    service = QueryService(args.db, args.readers, args.cache_entries)
+    print(f"Serving {args.db} on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+from functools import lru_cache
+
+import numpy as np
+
+NRC_BANDS = ('nrc_125', 'nrc_250', 'nrc_500', 'nrc_1000', 'nrc_2000', 'nrc_4000')
+SOUND_POWER_BANDS = ('sound_power_125', 'sound_power_250', 'sound_power_500', 'sound_power_1000',
+                     'sound_power_2000', 'sound_power_4000', 'sound_power_8000')
+RT60_BANDS = ('rt60_500hz', 'rt60_1000hz', 'rt60_2000hz')
+
+# Sample acoustic materials with realistic values
+SAMPLE_MATERIALS = [
+    # Room Treatment Materials (NRC values)
+    {
+        'name': 'Acoustic Panel A',
+        'type': 'Room Treatment',
+        'nrc_single': 0.85,
+        'nrc_bands': [0.75, 0.80, 0.85, 0.90, 0.85, 0.80],
+        'stc': None,
+        'iic': None,
+        'cost_per_sqft': 12.50  # Premium acoustic panel
+    },
+    {
+        'name': 'Bass Trap B',
+        'type': 'Room Treatment',
+        'nrc_single': 0.95,
+        'nrc_bands': [0.95, 0.90, 0.85, 0.80, 0.75, 0.70],
+        'stc': None,
+        'iic': None,
+        'cost_per_sqft': 15.75  # High-performance bass trap
+    },
+    {
+        'name': 'Ceiling Tile C',
+        'type': 'Room Treatment',
+        'nrc_single': 0.75,
+        'nrc_bands': [0.65, 0.70, 0.75, 0.80, 0.75, 0.70],
+        'stc': None,
+        'iic': None,
+        'cost_per_sqft': 8.25   # Standard acoustic ceiling tile
+    },
+    # Underlayment Materials (STC/IIC values)
+    {
+        'name': 'Floor Underlayment X',
+        'type': 'Underlayment',
+        'nrc_single': None,
+        'nrc_bands': [None, None, None, None, None, None],
+        'stc': 55,
+        'iic': 65,
+        'cost_per_sqft': 3.95    # Standard floor underlayment
+    },
+    {
+        'name': 'Isolation Mat Y',
+        'type': 'Underlayment',
+        'nrc_single': None,
+        'nrc_bands': [None, None, None, None, None, None],
+        'stc': 52,
+        'iic': 62,
+        'cost_per_sqft': 2.75    # Basic isolation mat
+    },
+    {
+        'name': 'Sound Barrier Z',
+        'type': 'Underlayment',
+        'nrc_single': None,
+        'nrc_bands': [None, None, None, None, None, None],
+        'stc': 58,
+        'iic': 68,
+        'cost_per_sqft': 5.25    # Premium sound barrier
+    }
+]
+
+# Sample equipment with realistic sound power levels
+SAMPLE_EQUIPMENT = [
+    {
+        'name': 'HVAC Unit A',
+        'type': 'Mechanical',
+        'sound_power': [75, 78, 80, 82, 80, 78, 75]
+    },
+    {
+        'name': 'Generator B',
+        'type': 'Electrical',
+        'sound_power': [85, 88, 90, 92, 90, 88, 85]
+    },
+    {
+        'name': 'Pump C',
+        'type': 'Mechanical',
+        'sound_power': [70, 73, 75, 77, 75, 73, 70]
+    }
+]
+
+# Sample noise sensitive spaces with realistic dimensions and acoustic parameters
+SAMPLE_SPACES = [
+    {
+        'name': 'Main Conference Room',
+        'type': 'Meeting Space',
+        'length_ft': 30.0,
+        'width_ft': 20.0,
+        'height_ft': 10.0,
+        'nc_requirement': 30,
+        'rt60_500hz': 0.6,    # Optimized for speech intelligibility
+        'rt60_1000hz': 0.5,
+        'rt60_2000hz': 0.4,
+        'background_noise_dba': 35.0,
+        'notes': 'Primary meeting space with video conferencing'
+    },
+    {
+        'name': 'Executive Office',
+        'type': 'Office Space',
+        'length_ft': 15.0,
+        'width_ft': 12.0,
+        'height_ft': 9.0,
+        'nc_requirement': 35,
+        'rt60_500hz': 0.4,    # Shorter RT60 for smaller space
+        'rt60_1000hz': 0.35,
+        'rt60_2000hz': 0.3,
+        'background_noise_dba': 40.0,
+        'notes': 'Private executive office'
+    },
+    {
+        'name': 'Recording Studio',
+        'type': 'Specialized Space',
+        'length_ft': 25.0,
+        'width_ft': 18.0,
+        'height_ft': 12.0,
+        'nc_requirement': 20,
+        'rt60_500hz': 0.3,    # Very controlled RT60 for recording
+        'rt60_1000hz': 0.25,
+        'rt60_2000hz': 0.2,
+        'background_noise_dba': 25.0,
+        'notes': 'Professional recording studio'
+    },
+    {
+        'name': 'Open Office Area',
+        'type': 'Work Space',
+        'length_ft': 50.0,
+        'width_ft': 40.0,
+        'height_ft': 9.0,
+        'nc_requirement': 40,
+        'rt60_500hz': 0.5,    # Moderate RT60 for open office
+        'rt60_1000hz': 0.45,
+        'rt60_2000hz': 0.4,
+        'background_noise_dba': 45.0,
+        'notes': 'Open plan office space'
+    },
+    {
+        'name': 'Quiet Room',
+        'type': 'Specialized Space',
+        'length_ft': 12.0,
+        'width_ft': 10.0,
+        'height_ft': 8.0,
+        'nc_requirement': 25,
+        'rt60_500hz': 0.2,    # Very short RT60 for quiet room
+        'rt60_1000hz': 0.15,
+        'rt60_2000hz': 0.1,
+        'background_noise_dba': 30.0,
+        'notes': 'Sound isolated quiet room'
+    }
+]
+
+class MaterialRecord:
+    """One catalog material; `tail` is its insert row without the project_id"""
+
+    __slots__ = ('name', 'type', 'nrc_single', 'nrc_bands', 'stc', 'iic', 'cost_per_sqft', 'tail')
+
+    def __init__(self, name, type, nrc_single, nrc_bands, stc, iic, cost_per_sqft):
+        self.name = name
+        self.type = type
+        self.nrc_single = nrc_single
+        self.nrc_bands = tuple(nrc_bands)
+        self.stc = stc
+        self.iic = iic
+        self.cost_per_sqft = cost_per_sqft
+        self.tail = (name, type, nrc_single, *self.nrc_bands, stc, iic, cost_per_sqft,
+                     f"Sample {type} material")
+
+class EquipmentRecord:
+    """One catalog equipment item; `tail` is its insert row without the project_id"""
+
+    __slots__ = ('name', 'type', 'sound_power', 'tail')
+
+    def __init__(self, name, type, sound_power):
+        self.name = name
+        self.type = type
+        self.sound_power = tuple(sound_power)
+        self.tail = (name, type, *self.sound_power, f"Sample {type} equipment")
+
+class SpaceRecord:
+    """One catalog space; `tail` is its insert row without the project_id"""
+
+    __slots__ = ('name', 'type', 'length_ft', 'width_ft', 'height_ft', 'volume_cubic_ft',
+                 'nc_requirement', 'rt60', 'background_noise_dba', 'notes', 'tail')
+
+    def __init__(self, name, type, length_ft, width_ft, height_ft, nc_requirement, rt60,
+                 background_noise_dba, notes):
+        self.name = name
+        self.type = type
+        self.length_ft = length_ft
+        self.width_ft = width_ft
+        self.height_ft = height_ft
+        self.volume_cubic_ft = length_ft * width_ft * height_ft
+        self.nc_requirement = nc_requirement
+        self.rt60 = tuple(rt60)
+        self.background_noise_dba = background_noise_dba
+        self.notes = notes
+        self.tail = (name, type, length_ft, width_ft, height_ft, self.volume_cubic_ft,
+                     nc_requirement, *self.rt60, background_noise_dba, notes)
+
+class Catalog:
+    """Immutable set of records built once, with their row tails ready to stamp.
+
+    ``rows(project_id)`` prepends the project id to each precomputed tail,
+    so per-project generation allocates only the row tuples themselves.
+    ``bands`` is a NumPy structured array of the numeric band data (NaN
+    where a value is missing) for vectorised consumers.
+    """
+
+    __slots__ = ('records', 'tails', 'bands')
+
+    def __init__(self, records, band_fields):
+        self.records = tuple(records)
+        self.tails = tuple(record.tail for record in self.records)
+        dtype = [(field, 'f8') for field, _ in band_fields]
+        values = [tuple(np.nan if getter(record) is None else getter(record) for _, getter in band_fields)
+                  for record in self.records]
+        self.bands = np.array(values, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def rows(self, project_id):
+        return [(project_id, *tail) for tail in self.tails]
+
+def _band_getter(attribute, index):
+    return lambda record: getattr(record, attribute)[index]
+
+@lru_cache(maxsize=None)
+def material_catalog():
+    records = [MaterialRecord(m['name'], m['type'], m['nrc_single'], m['nrc_bands'],
+                              m['stc'], m['iic'], m['cost_per_sqft'])
+               for m in SAMPLE_MATERIALS]
+    band_fields = [('nrc_single_value', lambda record: record.nrc_single)]
+    band_fields += [(band, _band_getter('nrc_bands', i)) for i, band in enumerate(NRC_BANDS)]
+    band_fields += [('stc_rating', lambda record: record.stc), ('iic_rating', lambda record: record.iic),
+                    ('cost_per_sqft', lambda record: record.cost_per_sqft)]
+    return Catalog(records, band_fields)
+
+@lru_cache(maxsize=None)
+def equipment_catalog():
+    records = [EquipmentRecord(e['name'], e['type'], e['sound_power']) for e in SAMPLE_EQUIPMENT]
+    return Catalog(records, [(band, _band_getter('sound_power', i)) for i, band in enumerate(SOUND_POWER_BANDS)])
+
+@lru_cache(maxsize=None)
+def space_catalog():
+    records = [SpaceRecord(s['name'], s['type'], s['length_ft'], s['width_ft'], s['height_ft'],
+                           s['nc_requirement'], [s[band] for band in RT60_BANDS],
+                           s['background_noise_dba'], s['notes'])
+               for s in SAMPLE_SPACES]
+    band_fields = [(field, lambda record, field=field: getattr(record, field))
+                   for field in ('length_ft', 'width_ft', 'height_ft', 'volume_cubic_ft', 'nc_requirement')]
+    band_fields += [(band, _band_getter('rt60', i)) for i, band in enumerate(RT60_BANDS)]
+    band_fields.append(('background_noise_dba', lambda record: record.background_noise_dba))
+    return Catalog(records, band_fields)
@@ -0,0 +1,312 @@
+import sqlite3
+import os
+import re
+import sys
+import html
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from string import Template
+
+try:
+    import weasyprint
+except ImportError:
+    weasyprint = None
+
+from create_project_database import project_folder_name
+
+DEFAULT_REPORT = 'Project Acoustic Report'
+ASSET_DIR = 'report_assets'
+BATCH_SIZE = 100
+
+REPORT_RENDERS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS report_renders (
+    project_id INTEGER NOT NULL,
+    report_name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    rendered_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (project_id, report_name)
+);
+'''
+
+REPORT_CSS = '''body { font-family: "Helvetica Neue", Arial, sans-serif; color: #222; margin: 2em; }
+header { border-bottom: 2px solid #2a5d84; margin-bottom: 1.5em; }
+h1 { color: #2a5d84; margin-bottom: 0.2em; }
+h2 { color: #2a5d84; font-size: 1.1em; margin-top: 1.8em; }
+.project { font-size: 1.1em; margin: 0; }
+.meta, .empty { color: #666; font-size: 0.9em; }
+table { border-collapse: collapse; width: 100%; font-size: 0.85em; }
+th, td { border: 1px solid #ccc; padding: 4px 6px; text-align: left; }
+th { background: #eef3f7; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+@page { size: letter; margin: 1.5cm; }
+'''
+
+# Compiled once per process and reused for every report
+PAGE_TEMPLATE = Template('''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<link rel="stylesheet" href="$stylesheet">
+</head>
+<body>
+<header>
+<h1>$title</h1>
+<p class="project">$project_name &middot; $client_name</p>
+<p class="meta">Status: $status ($percent_complete% complete) &middot; $start_date to $end_date &middot; rendered $rendered_on</p>
+</header>
+$sections
+</body>
+</html>
+''')
+
+SECTION_TEMPLATE = Template('''<section>
+<h2>$heading</h2>
+<table>
+<thead><tr>$header_cells</tr></thead>
+<tbody>
+$rows
+</tbody>
+</table>
+</section>''')
+
+EMPTY_SECTION_TEMPLATE = Template('''<section>
+<h2>$heading</h2>
+<p class="empty">No records.</p>
+</section>''')
+
+PROJECT_QUERY = '''
+SELECT project_id, project_name, client_name, status, percent_complete, start_date, end_date
+FROM projects WHERE project_id BETWEEN ? AND ?
+'''
+
+# Report sections: (heading, column headers, query returning project_id first)
+REPORT_SECTIONS = [
+    ('Spaces', ['Space', 'Type', 'Volume (ft³)', 'NC', 'RT60 500 Hz', 'RT60 1 kHz', 'RT60 2 kHz', 'Background (dBA)'],
+     '''SELECT project_id, space_name, space_type, volume_cubic_ft, nc_requirement,
+               rt60_500hz, rt60_1000hz, rt60_2000hz, background_noise_dba
+        FROM equipment_spaces WHERE project_id BETWEEN ? AND ? ORDER BY project_id, space_id'''),
+    ('Materials', ['Material', 'Type', 'NRC', 'STC', 'IIC', 'Cost ($/ft²)'],
+     '''SELECT project_id, material_name, material_type, nrc_single_value, stc_rating, iic_rating, cost_per_sqft
+        FROM acoustic_materials WHERE project_id BETWEEN ? AND ? ORDER BY project_id, material_id'''),
+    ('Equipment Sound Power (dB)', ['Equipment', 'Type', '125', '250', '500', '1k', '2k', '4k', '8k'],
+     '''SELECT project_id, equipment_name, equipment_type, sound_power_125, sound_power_250, sound_power_500,
+               sound_power_1000, sound_power_2000, sound_power_4000, sound_power_8000
+        FROM equipment WHERE project_id BETWEEN ? AND ? ORDER BY project_id, equipment_id'''),
+    ('ASTM Tests', ['Test', 'Date', 'Type', 'Result', 'Unit'],
+     '''SELECT project_id, test_name, test_date, test_type, result_value, result_unit
+        FROM astm_tests WHERE project_id BETWEEN ? AND ? ORDER BY project_id, test_date, test_id'''),
+    ('Budget', ['Total', 'Spent', 'Remaining', 'Last Updated'],
+     '''SELECT project_id, total_budget, spent_amount, remaining_amount, last_updated
+        FROM budget WHERE project_id BETWEEN ? AND ? ORDER BY project_id, budget_id'''),
+    ('Milestones', ['Milestone', 'Type', 'Planned', 'Actual', 'Status'],
+     '''SELECT project_id, milestone_name, milestone_type, planned_date, actual_date, status
+        FROM milestones WHERE project_id BETWEEN ? AND ? ORDER BY project_id, planned_date, milestone_id'''),
+]
+
+REPORT_DELIVERABLES_QUERY = '''
+SELECT deliverable_id, project_id, deliverable_name, status
+FROM deliverables
+WHERE deliverable_type LIKE '%Report%' AND project_id BETWEEN ? AND ?
+ORDER BY project_id, deliverable_id
+'''
+
+# Part of every fingerprint, so template or stylesheet edits re-render everything
+TEMPLATE_VERSION = hashlib.sha256(''.join(
+    [PAGE_TEMPLATE.template, SECTION_TEMPLATE.template, EMPTY_SECTION_TEMPLATE.template, REPORT_CSS]
+    + [query for _, _, query in REPORT_SECTIONS]).encode()).hexdigest()
+
+def _connect_ro(db_path):
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def report_slug(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+def report_path(base_dir, project_id, report_name):
+    return Path(base_dir) / project_folder_name(project_id) / 'deliverables_db' / f"{report_slug(report_name)}.html"
+
+def write_assets(base_dir):
+    """Write the shared stylesheet once; returns its path"""
+    path = Path(base_dir) / ASSET_DIR / 'report.css'
+    if not path.exists() or path.read_text() != REPORT_CSS:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(REPORT_CSS)
+    return path
+
+# Rendering
+
+def _cell(value):
+    if value is None:
+        return '<td>&mdash;</td>'
+    if isinstance(value, float):
+        return f'<td class="num">{value:,.2f}</td>'
+    if isinstance(value, int):
+        return f'<td class="num">{value}</td>'
+    return f'<td>{html.escape(str(value))}</td>'
+
+def render_section(heading, headers, rows):
+    if not rows:
+        return EMPTY_SECTION_TEMPLATE.substitute(heading=html.escape(heading))
+    return SECTION_TEMPLATE.substitute(
+        heading=html.escape(heading),
+        header_cells=''.join(f'<th>{html.escape(header)}</th>' for header in headers),
+        rows='\n'.join(f"<tr>{''.join(_cell(value) for value in row)}</tr>" for row in rows),
+    )
+
+def render_report(title, project, sections, stylesheet, rendered_on):
+    """One report page from a project row and its (heading, headers, rows) sections"""
+    _, project_name, client_name, status, percent_complete, start_date, end_date = project
+    return PAGE_TEMPLATE.substitute(
+        title=html.escape(title),
+        stylesheet=html.escape(stylesheet),
+        project_name=html.escape(project_name),
+        client_name=html.escape(client_name),
+        status=html.escape(status),
+        percent_complete=percent_complete or 0,
+        start_date=start_date,
+        end_date=end_date,
+        rendered_on=rendered_on,
+        sections='\n'.join(render_section(*section) for section in sections),
+    )
+
+def fingerprint(title, project, sections):
+    digest = hashlib.sha256(TEMPLATE_VERSION.encode())
+    digest.update(repr((title, project, [rows for _, _, rows in sections])).encode())
+    return digest.hexdigest()
+
+def render_batch(db_path, base_dir, low, high, previous, pdf=False, rendered_on=None):
+    """Render the reports of projects low..high whose inputs changed.
+
+    Every table is read once for the whole batch on a ``mode=ro``
+    connection. ``previous`` maps (project_id, report_name) to the last
+    fingerprint; reports with an unchanged fingerprint and an existing file
+    are skipped. Returns one dict per report.
+    """
+    rendered_on = rendered_on or datetime.now().strftime('%Y-%m-%d')
+    stylesheet_path = Path(base_dir) / ASSET_DIR / 'report.css'
+    conn = _connect_ro(db_path)
+    try:
+        projects = conn.execute(PROJECT_QUERY, (low, high)).fetchall()
+        section_rows = {}
+        for heading, _, query in REPORT_SECTIONS:
+            grouped = section_rows[heading] = {}
+            for row in conn.execute(query, (low, high)):
+                grouped.setdefault(row[0], []).append(row[1:])
+        deliverables = {}
+        for deliverable_id, project_id, name, status in conn.execute(REPORT_DELIVERABLES_QUERY, (low, high)):
+            deliverables.setdefault(project_id, {}).setdefault(name, []).append((deliverable_id, status))
+    finally:
+        conn.close()
+
+    results = []
+    for project in projects:
+        project_id = project[0]
+        sections = [(heading, headers, section_rows[heading].get(project_id, []))
+                    for heading, headers, _ in REPORT_SECTIONS]
+        reports = deliverables.get(project_id) or {DEFAULT_REPORT: []}
+        for report_name, report_deliverables in reports.items():
+            path = report_path(base_dir, project_id, report_name)
+            digest = fingerprint(report_name, project, sections)
+            result = {'project_id': project_id, 'report_name': report_name, 'fingerprint': digest,
+                      'output_path': str(path), 'deliverables': report_deliverables, 'rendered': False}
+            if previous.get((project_id, report_name)) == digest and path.exists():
+                results.append(result)
+                continue
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stylesheet = os.path.relpath(stylesheet_path, path.parent)
+            path.write_text(render_report(report_name, project, sections, stylesheet, rendered_on),
+                            encoding='utf-8')
+            if pdf:
+                weasyprint.HTML(filename=str(path)).write_pdf(str(path.with_suffix('.pdf')))
+            result['rendered'] = True
+            results.append(result)
+    return results
+
+# Pipeline
+
+def _batches(project_ids, batch_size):
+    """Contiguous (low, high) id ranges of at most batch_size projects"""
+    return [(project_ids[i], project_ids[min(i + batch_size, len(project_ids)) - 1])
+            for i in range(0, len(project_ids), batch_size)]
+
+def render_reports(db_path='project_management.db', base_dir='.', workers=None, batch_size=BATCH_SIZE,
+                   pdf=False, force=False):
+    """Render every project's reports on a process pool and record the results.
+
+    Reports go to each project's ``deliverables_db`` folder and share one
+    stylesheet under ``report_assets/``. A report is re-rendered only when
+    its inputs (project data, templates and stylesheet) changed, unless
+    ``force`` is set. At the end, one transaction records the fingerprints
+    in ``report_renders`` and marks the rendered report deliverables as
+    completed with today's submission date. Returns counts.
+    """
+    if pdf and weasyprint is None:
+        raise RuntimeError("PDF reports require weasyprint (pip install weasyprint)")
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(REPORT_RENDERS_SCHEMA)
+    previous = {} if force else {
+        (project_id, report_name): digest
+        for project_id, report_name, digest in conn.execute(
+            'SELECT project_id, report_name, fingerprint FROM report_renders')
+    }
+    project_ids = [row[0] for row in conn.execute('SELECT project_id FROM projects ORDER BY project_id')]
+    write_assets(base_dir)
+
+    rendered_on = datetime.now().strftime('%Y-%m-%d')
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for low, high in _batches(project_ids, batch_size):
+            batch_previous = {key: digest for key, digest in previous.items() if low <= key[0] <= high}
+            futures.append(pool.submit(render_batch, db_path, base_dir, low, high, batch_previous,
+                                       pdf, rendered_on))
+        for future in futures:
+            results.extend(future.result())
+
+    rendered = [r for r in results if r['rendered']]
+    rendered_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    pending = [(rendered_on, deliverable_id) for r in rendered
+               for deliverable_id, status in r['deliverables'] if status != 'Completed']
+    try:
+        conn.executemany('''
+        INSERT INTO report_renders (project_id, report_name, fingerprint, output_path, rendered_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(project_id, report_name) DO UPDATE SET
+            fingerprint = excluded.fingerprint, output_path = excluded.output_path,
+            rendered_at = excluded.rendered_at
+        ''', [(r['project_id'], r['report_name'], r['fingerprint'], r['output_path'], rendered_at)
+              for r in rendered])
+        conn.executemany('''
+        UPDATE deliverables SET submission_date = ?, status = 'Completed' WHERE deliverable_id = ?
+        ''', pending)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'rendered': len(rendered), 'skipped': len(results) - len(rendered),
+            'deliverables_completed': len(pending)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render per-project acoustic reports')
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--base-dir', default='.', help='directory holding the project folders')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='projects per worker task')
+    parser.add_argument('--pdf', action='store_true', help='also write PDFs (requires weasyprint)')
+    parser.add_argument('--force', action='store_true', help='re-render unchanged reports')
+    args = parser.parse_args(argv)
+
+    counts = render_reports(args.db, args.base_dir, args.workers, args.batch_size, args.pdf, args.force)
+    print(f"Rendered {counts['rendered']} reports, skipped {counts['skipped']} unchanged, "
+          f"completed {counts['deliverables_completed']} deliverables")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import sqlite3
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+from generate_sample_data import (
+    ACOUSTIC_MATERIAL_INSERT,
+    EQUIPMENT_INSERT,
+    EQUIPMENT_SPACE_INSERT,
+    EMAIL_INSERT,
+    MILESTONE_INSERT,
+)
+from compact_dates import is_compact_schema, insert_columns, bulk_load
+from create_project_database import conflict_safe_insert
+
+SCENARIOS_DIR = Path(__file__).resolve().parent / 'scenarios'
+
+PROJECT_INSERT = '''
+INSERT INTO projects (
+    project_id, project_name, client_name, start_date, end_date,
+    status, percent_complete
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+BUDGET_INSERT = '''
+INSERT INTO budget (project_id, total_budget, spent_amount, remaining_amount, last_updated)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+ASTM_TEST_INSERT = '''
+INSERT INTO astm_tests (project_id, test_name, test_date, test_type, result_value, result_unit, notes)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+DELIVERABLE_INSERT = '''
+INSERT INTO deliverables (project_id, deliverable_name, deliverable_type, due_date, submission_date, status, notes)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Insert order matters only for readability; every child row carries its project_id
+TABLE_INSERTS = {
+    'projects': PROJECT_INSERT,
+    'budget': BUDGET_INSERT,
+    'astm_tests': ASTM_TEST_INSERT,
+    'acoustic_materials': ACOUSTIC_MATERIAL_INSERT,
+    'equipment_spaces': EQUIPMENT_SPACE_INSERT,
+    'equipment': EQUIPMENT_INSERT,
+    'email_correspondence': EMAIL_INSERT,
+    'deliverables': DELIVERABLE_INSERT,
+    'milestones': MILESTONE_INSERT,
+}
+
+REQUIRED_SECTIONS = ('archetype', 'project', 'budget', 'astm_tests', 'materials', 'spaces',
+                     'equipment', 'emails', 'deliverables', 'milestones')
+
+def load_scenario(path):
+    """Load a scenario definition from a JSON or TOML file"""
+    path = Path(path)
+    if not path.exists() and not path.is_absolute():
+        path = SCENARIOS_DIR / path
+
+    if path.suffix == '.toml':
+        if tomllib is None:
+            raise RuntimeError("TOML scenarios require Python 3.11+ (tomllib)")
+        with open(path, 'rb') as f:
+            scenario = tomllib.load(f)
+    else:
+        with open(path, 'r') as f:
+            scenario = json.load(f)
+
+    missing = [section for section in REQUIRED_SECTIONS if section not in scenario]
+    if missing:
+        raise ValueError(f"Scenario {path} is missing sections: {', '.join(missing)}")
+    scenario.setdefault('jitter', {})
+    return scenario
+
+class ScenarioCompiler:
+    """Turn a scenario definition into rows for one project at a time.
+
+    Dates in a scenario are day offsets from the project start date. With
+    ``jitter=True`` numeric values and dates are varied within the ranges in
+    the scenario's ``jitter`` section, so stamped projects differ from each
+    other while keeping the archetype's shape.
+    """
+
+    def __init__(self, scenario, seed=None, jitter=True):
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        self.jitter = scenario['jitter'] if jitter else {}
+
+    # Jitter helpers
+
+    def _scale(self, value, key, digits=2):
+        if value is None:
+            return None
+        pct = self.jitter.get(key, 0)
+        if pct:
+            value = value * (1 + self.rng.uniform(-pct, pct))
+        return round(value, digits)
+
+    def _shift(self, value, key, low=None, high=None, digits=1):
+        if value is None:
+            return None
+        spread = self.jitter.get(key, 0)
+        if spread:
+            value = value + self.rng.uniform(-spread, spread)
+            if low is not None:
+                value = max(low, value)
+            if high is not None:
+                value = min(high, value)
+        return round(value, digits)
+
+    def _offset(self, offset):
+        if offset is None:
+            return None
+        days = self.jitter.get('date_days', 0)
+        if days:
+            offset = max(0, offset + self.rng.randint(-days, days))
+        return offset
+
+    @staticmethod
+    def _date(start_date, offset, fmt='%Y-%m-%d'):
+        if offset is None:
+            return None
+        return (start_date + timedelta(days=offset)).strftime(fmt)
+
+    # Row builders
+
+    def project_row(self, project_id, start_date, name=None):
+        project = self.scenario['project']
+        end_date = start_date + timedelta(days=project['duration_days'])
+        low, high = project.get('percent_complete', [0, 100])
+        return (
+            project_id,
+            name or f"{project['name']} {project_id}",
+            self.rng.choice(project['clients']),
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            self.rng.choice(project['statuses']),
+            self.rng.randint(low, high),
+        )
+
+    def rows(self, project_id, start_date):
+        """Rows for every child table of one project, keyed by table name"""
+        scenario = self.scenario
+        rows = {}
+
+        budget = scenario['budget']
+        total = self._scale(budget['total'], 'budget_pct')
+        spent = round(total * min(1.0, self._scale(budget['spent_fraction'], 'spent_pct', 4)), 2)
+        rows['budget'] = [(project_id, total, spent, round(total - spent, 2),
+                           self._date(start_date, budget['last_updated_offset']))]
+
+        rows['astm_tests'] = [
+            (project_id, test['name'], self._date(start_date, self._offset(test['offset'])),
+             test['type'], self._scale(test['value'], 'test_value_pct'), test['unit'], test['notes'])
+            for test in scenario['astm_tests']
+        ]
+
+        rows['acoustic_materials'] = []
+        for material in scenario['materials']:
+            bands = [self._shift(band, 'nrc', 0.0, 1.2, 2) for band in material['nrc_bands']]
+            rows['acoustic_materials'].append((
+                project_id, material['name'], material['type'],
+                self._shift(material['nrc_single'], 'nrc', 0.0, 1.2, 2), *bands,
+                material['stc'], material['iic'],
+                self._scale(material['cost_per_sqft'], 'cost_pct'), material['notes'],
+            ))
+
+        rows['equipment_spaces'] = []
+        for space in scenario['spaces']:
+            length = self._scale(space['length_ft'], 'dimension_pct', 1)
+            width = self._scale(space['width_ft'], 'dimension_pct', 1)
+            height = space['height_ft']
+            rt60 = [self._scale(value, 'rt60_pct') for value in space['rt60']]
+            rows['equipment_spaces'].append((
+                project_id, space['name'], space['type'], length, width, height,
+                round(length * width * height, 1), space['nc_requirement'], *rt60,
+                self._shift(space['background_noise_dba'], 'background_dba'), space['notes'],
+            ))
+
+        rows['equipment'] = [
+            (project_id, equipment['name'], equipment['type'],
+             *[self._shift(level, 'sound_power_db') for level in equipment['sound_power']],
+             equipment['notes'])
+            for equipment in scenario['equipment']
+        ]
+
+        rows['email_correspondence'] = [
+            (project_id, email['sender'], email['recipient'], email['subject'], email['content'],
+             f"{self._date(start_date, self._offset(email['offset']))} {email.get('time', '09:00:00')}",
+             1)
+            for email in scenario['emails']
+        ]
+
+        rows['deliverables'] = []
+        for deliverable in scenario['deliverables']:
+            due = self._offset(deliverable['due_offset'])
+            submitted = deliverable['submitted_offset']
+            if submitted is not None:
+                submitted = due + (submitted - deliverable['due_offset'])
+            rows['deliverables'].append((
+                project_id, deliverable['name'], deliverable['type'],
+                self._date(start_date, due), self._date(start_date, submitted),
+                deliverable['status'], deliverable['notes'],
+            ))
+
+        rows['milestones'] = []
+        for milestone in scenario['milestones']:
+            planned = self._offset(milestone['planned_offset'])
+            actual = milestone['actual_offset']
+            if actual is not None:
+                actual = planned + (actual - milestone['planned_offset'])
+            rows['milestones'].append((
+                project_id, milestone['name'], milestone['type'],
+                self._date(start_date, planned), self._date(start_date, actual),
+                milestone['status'], milestone['notes'],
+            ))
+
+        return rows
+
+def _insert_batch(conn, batch):
+    compact = is_compact_schema(conn)
+    for table, insert_sql in TABLE_INSERTS.items():
+        if not batch.get(table):
+            continue
+        safe_sql = conflict_safe_insert(conn, table, insert_sql)
+        if compact:
+            # Encode date columns with NumPy and skip the view triggers
+            bulk_load(conn, table, insert_columns(insert_sql), batch[table], skip_existing=safe_sql != insert_sql)
+        else:
+            conn.executemany(safe_sql, batch[table])
+    conn.commit()
+
+def stamp_project(conn, scenario, project_id, start_date, jitter=False, seed=None):
+    """Insert one scenario instance's child rows for an existing project"""
+    rows = ScenarioCompiler(scenario, seed, jitter).rows(project_id, start_date)
+    _insert_batch(conn, rows)
+    return rows
+
+def stamp_portfolio(conn, archetypes, count, seed=None, start_range=('2024-01-01', '2025-06-30'),
+                    batch_size=500):
+    """Stamp out `count` new projects drawn from weighted archetypes.
+
+    ``archetypes`` maps scenario paths to weights, or is a list of
+    ``(scenario, weight)`` pairs where a scenario is a path or a loaded dict.
+    Project ids continue from the current maximum, and rows are inserted
+    with one ``executemany`` per table per batch. Returns the new project ids.
+    """
+    rng = random.Random(seed)
+    compilers = []
+    weights = []
+    pairs = archetypes.items() if isinstance(archetypes, dict) else archetypes
+    for scenario, weight in pairs:
+        if not isinstance(scenario, dict):
+            scenario = load_scenario(scenario)
+        compilers.append(ScenarioCompiler(scenario, rng.random(), jitter=True))
+        weights.append(weight)
+
+    range_start = datetime.strptime(start_range[0], '%Y-%m-%d')
+    range_days = (datetime.strptime(start_range[1], '%Y-%m-%d') - range_start).days
+
+    next_id = conn.execute('SELECT COALESCE(MAX(project_id), 0) FROM projects').fetchone()[0] + 1
+    project_ids = []
+    batch = {table: [] for table in TABLE_INSERTS}
+
+    for i in range(count):
+        project_id = next_id + i
+        compiler = rng.choices(compilers, weights)[0]
+        start_date = range_start + timedelta(days=rng.randint(0, range_days))
+
+        batch['projects'].append(compiler.project_row(project_id, start_date))
+        for table, rows in compiler.rows(project_id, start_date).items():
+            batch[table].extend(rows)
+        project_ids.append(project_id)
+
+        if len(batch['projects']) >= batch_size:
+            _insert_batch(conn, batch)
+            batch = {table: [] for table in TABLE_INSERTS}
+
+    _insert_batch(conn, batch)
+    return project_ids
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stamp out projects from scenario templates')
+    parser.add_argument('scenarios', nargs='+',
+                        help='scenario files, optionally weighted as path:weight')
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--db', default='project_management.db')
+    args = parser.parse_args(argv)
+
+    archetypes = {}
+    for spec in args.scenarios:
+        path, _, weight = spec.partition(':')
+        archetypes[path] = float(weight) if weight else 1.0
+
+    conn = sqlite3.connect(args.db)
+    project_ids = stamp_portfolio(conn, archetypes, args.count, args.seed, batch_size=args.batch_size)
+    conn.close()
+    print(f"Created {len(project_ids)} projects ({project_ids[0]}-{project_ids[-1]})" if project_ids
+          else "No projects created.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+import sqlite3
+import sys
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from create_project_database import create_database
+from generate_sample_data import populate_project_data
+
+MANIFEST_NAME = 'shards.json'
+
+# Tables whose rows belong to a single project and move with it
+PROJECT_TABLES = [
+    'budget',
+    'astm_tests',
+    'acoustic_materials',
+    'equipment_spaces',
+    'equipment',
+    'email_correspondence',
+    'deliverables',
+    'milestones',
+]
+
+# SQLite attaches at most 10 databases by default
+MAX_ATTACHED = 8
+
+class ShardLayout:
+    """Layout of a database split into per-shard SQLite files.
+
+    Projects are assigned to a shard either by project_id range
+    (``strategy='project_range'``, ``range_size`` ids per shard) or by the
+    year of their start date (``strategy='year'``). The layout and the
+    project_id span held by each shard are stored in ``shards.json`` in the
+    shard directory, so queries can skip shards that cannot match.
+    """
+
+    STRATEGIES = ('project_range', 'year')
+
+    def __init__(self, directory, strategy='project_range', range_size=1000):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown shard strategy '{strategy}', expected one of {self.STRATEGIES}")
+        self.directory = Path(directory)
+        self.strategy = strategy
+        self.range_size = range_size
+        self.project_ranges = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, directory):
+        with open(Path(directory) / MANIFEST_NAME, 'r') as f:
+            manifest = json.load(f)
+        layout = cls(directory, manifest['strategy'], manifest['range_size'])
+        layout.project_ranges = {key: tuple(span) for key, span in manifest['project_ranges'].items()}
+        return layout
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / MANIFEST_NAME, 'w') as f:
+            json.dump({
+                'strategy': self.strategy,
+                'range_size': self.range_size,
+                'project_ranges': {key: list(span) for key, span in sorted(self.project_ranges.items())},
+            }, f, indent=2)
+
+    def shard_key(self, project_id, start_date=None):
+        if self.strategy == 'project_range':
+            return f"p{project_id // self.range_size:06d}"
+        if start_date is None:
+            raise ValueError("The 'year' strategy needs the project start date")
+        return f"y{str(start_date)[:4]}"
+
+    def shard_path(self, key):
+        return self.directory / f"{key}.db"
+
+    def shard_keys(self):
+        return sorted(path.stem for path in self.directory.glob('*.db'))
+
+    def record_projects(self, key, project_ids):
+        """Widen a shard's recorded project_id span"""
+        if not project_ids:
+            return
+        with self._lock:
+            low, high = self.project_ranges.get(key, (min(project_ids), max(project_ids)))
+            self.project_ranges[key] = (min(low, min(project_ids)), max(high, max(project_ids)))
+
+    def shards_for_projects(self, project_ids=None):
+        """Shards that may hold any of `project_ids` (all shards when None)"""
+        keys = self.shard_keys()
+        if project_ids is None:
+            return keys
+        selected = []
+        for key in keys:
+            span = self.project_ranges.get(key)
+            if span is None or any(span[0] <= project_id <= span[1] for project_id in project_ids):
+                selected.append(key)
+        return selected
+
+    def connect(self, key):
+        """Open a shard, creating it with the project schema if needed"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.shard_path(key)
+        if not path.exists():
+            return create_database(str(path))
+        return sqlite3.connect(path)
+
+    def connect_for_project(self, project_id, start_date=None):
+        """Writer connection to the shard that owns a project"""
+        key = self.shard_key(project_id, start_date)
+        self.record_projects(key, [project_id])
+        return self.connect(key)
+
+def _copy_shard(layout, source_path, key, project_ids):
+    """Copy a set of projects and their rows from the source database into one shard"""
+    conn = layout.connect(key)
+    try:
+        conn.execute('ATTACH DATABASE ? AS src', (str(Path(source_path).resolve()),))
+        conn.execute('CREATE TEMP TABLE shard_ids (project_id INTEGER PRIMARY KEY)')
+        conn.executemany('INSERT INTO temp.shard_ids VALUES (?)', [(pid,) for pid in project_ids])
+
+        for table in ['projects'] + PROJECT_TABLES:
+            shard_columns = [row[1] for row in conn.execute(f'PRAGMA main.table_info({table})')]
+            source_columns = {row[1] for row in conn.execute(f'PRAGMA src.table_info({table})')}
+            columns = ', '.join(c for c in shard_columns if c in source_columns)
+            conn.execute(f'''
+            INSERT INTO main.{table} ({columns})
+            SELECT {columns} FROM src.{table}
+            WHERE project_id IN (SELECT project_id FROM temp.shard_ids)
+            ''')
+        conn.commit()
+        conn.execute('DETACH DATABASE src')
+    finally:
+        conn.close()
+    return key, len(project_ids)
+
+def shard_database(source_path, layout, max_workers=4):
+    """Split an existing database into shards; shards are written in parallel"""
+    source = sqlite3.connect(source_path)
+    projects = source.execute('SELECT project_id, start_date FROM projects').fetchall()
+    source.close()
+
+    assignments = {}
+    for project_id, start_date in projects:
+        assignments.setdefault(layout.shard_key(project_id, start_date), []).append(project_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_copy_shard, layout, source_path, key, ids)
+                   for key, ids in assignments.items()]
+        for future in futures:
+            future.result()
+
+    for key, ids in assignments.items():
+        layout.record_projects(key, ids)
+    layout.save()
+    return {key: len(ids) for key, ids in assignments.items()}
+
+def populate_shards(layout, max_workers=4):
+    """Run the sample data generators on every shard in parallel"""
+    def populate(key):
+        conn = layout.connect(key)
+        try:
+            populate_project_data(conn)
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(populate, layout.shard_keys()))
+
+class FederatedQuery:
+    """Run one query across shards by attaching them to an in-memory connection.
+
+    ``branch_sql`` is a SELECT written with ``{db}.`` in front of every table
+    and ``{filter}`` where the filter on ``project_column`` is pushed down; it is
+    expanded once per attached shard and combined with UNION ALL. Shards
+    are attached in groups of ``max_attached``.
+    """
+
+    def __init__(self, layout, max_attached=MAX_ATTACHED):
+        self.layout = layout
+        self.max_attached = max_attached
+
+    def run(self, branch_sql, project_ids=None, project_column='project_id'):
+        keys = self.layout.shards_for_projects(project_ids)
+        columns = None
+        rows = []
+
+        for start in range(0, len(keys), self.max_attached):
+            group = keys[start:start + self.max_attached]
+            conn = sqlite3.connect(':memory:')
+            try:
+                if project_ids is not None:
+                    conn.execute('CREATE TEMP TABLE filter_ids (project_id INTEGER PRIMARY KEY)')
+                    conn.executemany('INSERT INTO temp.filter_ids VALUES (?)',
+                                     [(pid,) for pid in project_ids])
+                    pushdown = f"{project_column} IN (SELECT project_id FROM temp.filter_ids)"
+                else:
+                    pushdown = '1'
+
+                branches = []
+                for i, key in enumerate(group):
+                    conn.execute(f'ATTACH DATABASE ? AS s{i}', (str(self.layout.shard_path(key)),))
+                    branches.append(branch_sql.format(db=f's{i}', filter=pushdown))
+
+                cursor = conn.execute('\nUNION ALL\n'.join(branches))
+                columns = [d[0] for d in cursor.description]
+                rows.extend(cursor.fetchall())
+            finally:
+                conn.close()
+
+        if columns is None:
+            columns = self._columns(branch_sql)
+        return pd.DataFrame(rows, columns=columns)
+
+    @staticmethod
+    def _columns(branch_sql):
+        """Column names of a branch query, resolved against an empty schema"""
+        conn = create_database(':memory:')
+        try:
+            cursor = conn.execute(branch_sql.format(db='main', filter='0'))
+            return [d[0] for d in cursor.description]
+        finally:
+            conn.close()
+
+ROOM_ROWS_SQL = '''
+SELECT p.project_name, p.client_name, es.space_name, es.space_type,
+       es.volume_cubic_ft, es.nc_requirement, es.rt60_500hz, es.background_noise_dba
+FROM {db}.equipment_spaces es
+JOIN {db}.projects p ON es.project_id = p.project_id
+WHERE {filter}
+'''
+
+ROOM_PARTIALS_SQL = '''
+SELECT p.project_name,
+       SUM(es.volume_cubic_ft) AS volume_sum, COUNT(es.volume_cubic_ft) AS volume_count,
+       SUM(es.nc_requirement) AS nc_sum, COUNT(es.nc_requirement) AS nc_count,
+       SUM(es.background_noise_dba) AS noise_sum, COUNT(es.background_noise_dba) AS noise_count
+FROM {db}.equipment_spaces es
+JOIN {db}.projects p ON es.project_id = p.project_id
+WHERE {filter}
+GROUP BY p.project_name
+'''
+
+MATERIAL_ROWS_SQL = '''
+SELECT p.project_name, p.client_name, am.material_name, am.material_type,
+       am.nrc_single_value, am.stc_rating, am.iic_rating, am.cost_per_sqft
+FROM {db}.acoustic_materials am
+JOIN {db}.projects p ON am.project_id = p.project_id
+WHERE {filter}
+'''
+
+MATERIAL_PARTIALS_SQL = '''
+SELECT am.material_type,
+       SUM(am.nrc_single_value) AS nrc_sum, COUNT(am.nrc_single_value) AS nrc_count,
+       SUM(am.stc_rating) AS stc_sum, COUNT(am.stc_rating) AS stc_count,
+       SUM(am.iic_rating) AS iic_sum, COUNT(am.iic_rating) AS iic_count,
+       SUM(am.cost_per_sqft) AS cost_sum, COUNT(am.cost_per_sqft) AS cost_count,
+       MIN(am.cost_per_sqft) AS cost_min, MAX(am.cost_per_sqft) AS cost_max
+FROM {db}.acoustic_materials am
+JOIN {db}.projects p ON am.project_id = p.project_id
+WHERE {filter}
+GROUP BY am.material_type
+'''
+
+def _mean(sums, counts):
+    return np.where(counts > 0, sums / counts.where(counts > 0, 1), np.nan)
+
+def merge_room_partials(partials):
+    """Reduce ROOM_PARTIALS_SQL rows from any number of sources to the project summary"""
+    partials = partials.groupby('project_name').sum()
+    return pd.DataFrame({
+        'Total Volume (ft³)': partials['volume_sum'],
+        'Avg Room Volume (ft³)': _mean(partials['volume_sum'], partials['volume_count']),
+        'Number of Rooms': partials['volume_count'],
+        'Avg NC': _mean(partials['nc_sum'], partials['nc_count']),
+        'Avg Background Noise (dBA)': _mean(partials['noise_sum'], partials['noise_count']),
+    }).round(2)
+
+def merge_material_partials(partials):
+    """Reduce MATERIAL_PARTIALS_SQL rows from any number of sources to the performance summary"""
+    grouped = partials.groupby('material_type')
+    sums = grouped.sum()
+    return pd.DataFrame({
+        ('nrc_single_value', 'mean'): _mean(sums['nrc_sum'], sums['nrc_count']),
+        ('stc_rating', 'mean'): _mean(sums['stc_sum'], sums['stc_count']),
+        ('iic_rating', 'mean'): _mean(sums['iic_sum'], sums['iic_count']),
+        ('cost_per_sqft', 'mean'): _mean(sums['cost_sum'], sums['cost_count']),
+        ('cost_per_sqft', 'min'): grouped['cost_min'].min(),
+        ('cost_per_sqft', 'max'): grouped['cost_max'].max(),
+    }, index=sums.index).round(2)
+
+def get_room_volume_comparison(layout, project_ids=None, include_rows=True):
+    """Federated version of analyze_projects.get_room_volume_comparison"""
+    query = FederatedQuery(layout)
+
+    df = None
+    if include_rows:
+        df = query.run(ROOM_ROWS_SQL, project_ids, 'es.project_id')
+        df = df.sort_values('volume_cubic_ft', ascending=False, ignore_index=True)
+
+    project_summary = merge_room_partials(query.run(ROOM_PARTIALS_SQL, project_ids, 'es.project_id'))
+    return df, project_summary
+
+def get_material_performance_comparison(layout, project_ids=None, include_rows=True):
+    """Federated version of analyze_projects.get_material_performance_comparison"""
+    query = FederatedQuery(layout)
+
+    df = query.run(MATERIAL_ROWS_SQL, project_ids, 'am.project_id') if include_rows else None
+
+    performance_summary = merge_material_partials(
+        query.run(MATERIAL_PARTIALS_SQL, project_ids, 'am.project_id'))
+    return df, performance_summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Shard the project database and query across shards')
+    parser.add_argument('directory', help='shard directory')
+    parser.add_argument('--source', help='split this database into the shard directory')
+    parser.add_argument('--strategy', choices=ShardLayout.STRATEGIES, default='project_range')
+    parser.add_argument('--range-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    if args.source:
+        layout = ShardLayout(args.directory, args.strategy, args.range_size)
+        counts = shard_database(args.source, layout, args.workers)
+        print(f"Wrote {len(counts)} shards: " + ', '.join(f"{k} ({n})" for k, n in sorted(counts.items())))
+    else:
+        layout = ShardLayout.load(args.directory)
+
+    _, room_summary = get_room_volume_comparison(layout, include_rows=False)
+    print("\nRoom Volume Analysis by Project:")
+    print(room_summary)
+
+    _, material_summary = get_material_performance_comparison(layout, include_rows=False)
+    print("\nMaterial Performance Summary:")
+    print(material_summary)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
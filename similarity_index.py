@@ -0,0 +1,349 @@
+import sqlite3
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Feature sets: which rows and columns make up a vector, and per-column transforms
+FEATURE_SETS = {
+    'spaces': {
+        'table': 'equipment_spaces',
+        'key': 'space_id',
+        'columns': ['volume_cubic_ft', 'nc_requirement', 'rt60_500hz', 'rt60_1000hz',
+                    'rt60_2000hz', 'background_noise_dba'],
+        # Volumes span orders of magnitude; compare them on a log scale
+        'log_columns': ['volume_cubic_ft'],
+    },
+    'materials': {
+        'table': 'acoustic_materials',
+        'key': 'material_id',
+        'columns': ['nrc_125', 'nrc_250', 'nrc_500', 'nrc_1000', 'nrc_2000', 'nrc_4000'],
+        'log_columns': [],
+    },
+}
+
+class KDTree:
+    """Array-based KD-tree for Euclidean k-nearest-neighbour queries.
+
+    Nodes split at the median of their widest dimension until at most
+    ``leaf_size`` points remain; leaves are scanned with vectorised
+    distance computations. The tree is stored in flat arrays so it can be
+    saved with ``np.savez`` and loaded without rebuilding.
+    """
+
+    def __init__(self, points, leaf_size=32, _arrays=None):
+        self.points = points
+        self.leaf_size = leaf_size
+        if _arrays is not None:
+            (self.order, self.split_dim, self.split_value,
+             self.left, self.right, self.start, self.end) = _arrays
+            return
+        self._build()
+
+    def _build(self):
+        n = len(self.points)
+        self.order = np.arange(n, dtype=np.int64)
+        split_dim, split_value, left, right, start, end = [], [], [], [], [], []
+
+        def new_node(lo, hi):
+            for array, value in ((split_dim, -1), (split_value, 0.0), (left, -1), (right, -1),
+                                 (start, lo), (end, hi)):
+                array.append(value)
+            return len(start) - 1
+
+        stack = [new_node(0, n)] if n else []
+        while stack:
+            node = stack.pop()
+            lo, hi = start[node], end[node]
+            if hi - lo <= self.leaf_size:
+                continue
+            idx = self.order[lo:hi]
+            block = self.points[idx]
+            spread = block.max(axis=0) - block.min(axis=0)
+            dim = int(np.argmax(spread))
+            if spread[dim] == 0:
+                continue
+            mid = (hi - lo) // 2
+            partition = np.argpartition(block[:, dim], mid)
+            self.order[lo:hi] = idx[partition]
+            split_dim[node] = dim
+            split_value[node] = float(self.points[self.order[lo + mid], dim])
+            left[node] = new_node(lo, lo + mid)
+            right[node] = new_node(lo + mid, hi)
+            stack.extend((left[node], right[node]))
+
+        self.split_dim = np.array(split_dim, dtype=np.int32)
+        self.split_value = np.array(split_value, dtype=np.float64)
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        self.start = np.array(start, dtype=np.int64)
+        self.end = np.array(end, dtype=np.int64)
+
+    def arrays(self):
+        return (self.order, self.split_dim, self.split_value, self.left, self.right, self.start, self.end)
+
+    def query(self, point, k):
+        """(squared distances, point positions) of the k nearest points, closest first"""
+        best_d = np.full(0, np.inf)
+        best_i = np.full(0, -1, dtype=np.int64)
+        if not len(self.start):
+            return best_d, best_i
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best_d) == k and bound >= best_d[-1]:
+                continue
+            dim = self.split_dim[node]
+            if dim < 0:
+                idx = self.order[self.start[node]:self.end[node]]
+                diff = self.points[idx] - point
+                d = np.einsum('ij,ij->i', diff, diff)
+                best_d = np.concatenate((best_d, d))
+                best_i = np.concatenate((best_i, idx))
+                if len(best_d) > k:
+                    keep = np.argpartition(best_d, k - 1)[:k]
+                    best_d, best_i = best_d[keep], best_i[keep]
+                ordered = np.argsort(best_d, kind='stable')
+                best_d, best_i = best_d[ordered], best_i[ordered]
+                continue
+            gap = point[dim] - self.split_value[node]
+            near, far = (self.left[node], self.right[node]) if gap < 0 else (self.right[node], self.left[node])
+            # Visit the near side first; the far side only if it can still hold a closer point
+            stack.append((far, max(bound, gap * gap)))
+            stack.append((near, bound))
+        return best_d, best_i
+
+class SimilarityIndex:
+    """k-nearest-neighbour index over one feature set.
+
+    Feature columns are z-normalised with the statistics of the initial
+    build, so each feature contributes on the same scale. Rows added later
+    (higher keys) go into a delta buffer that is scanned by brute force and
+    merged into the tree once it grows past ``rebuild_fraction`` of the
+    indexed rows. Edits and deletes of rows already indexed are caught by a
+    fingerprint (row count and feature sums over the indexed key range) and
+    trigger a full rebuild. Rows with a NULL feature are not indexed.
+    """
+
+    def __init__(self, feature_set, leaf_size=32, rebuild_fraction=0.1):
+        if feature_set not in FEATURE_SETS:
+            raise ValueError(f"Unknown feature set '{feature_set}', expected one of {list(FEATURE_SETS)}")
+        self.feature_set = feature_set
+        self.spec = FEATURE_SETS[feature_set]
+        self.leaf_size = leaf_size
+        self.rebuild_fraction = rebuild_fraction
+        self.mean = None
+        self.std = None
+        self.keys = np.empty(0, dtype=np.int64)
+        self.points = np.empty((0, len(self.spec['columns'])), dtype=np.float32)
+        self.delta_keys = np.empty(0, dtype=np.int64)
+        self.delta_points = np.empty((0, len(self.spec['columns'])), dtype=np.float32)
+        self.max_key = 0
+        self.fingerprint = None
+        self.tree = None
+
+    # Features
+
+    def _not_null(self):
+        return ' AND '.join(f'{column} IS NOT NULL' for column in self.spec['columns'])
+
+    def _last_key(self, conn):
+        spec = self.spec
+        return conn.execute(f"SELECT COALESCE(MAX({spec['key']}), 0) FROM {spec['table']}").fetchone()[0]
+
+    def _fingerprint(self, conn, upto_key):
+        """Row count and feature sums of the indexable rows with keys up to `upto_key`"""
+        spec = self.spec
+        key = spec['key']
+        # Key-weighted sums also catch values moved between rows
+        sums = ', '.join(f'TOTAL({column}), TOTAL({column} * {key})' for column in spec['columns'])
+        row = conn.execute(f'''
+        SELECT COUNT(*), TOTAL({key}), {sums} FROM {spec['table']}
+        WHERE {key} <= ? AND {self._not_null()}
+        ''', (upto_key,)).fetchone()
+        return list(row)
+
+    def _load_rows(self, conn, after_key=0, upto_key=None):
+        spec = self.spec
+        columns = spec['columns']
+        upto = '' if upto_key is None else f"AND {spec['key']} <= {int(upto_key)}"
+        rows = conn.execute(f'''
+        SELECT {spec['key']}, {', '.join(columns)} FROM {spec['table']}
+        WHERE {spec['key']} > ? {upto} AND {self._not_null()}
+        ORDER BY {spec['key']}
+        ''', (after_key,)).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(columns)))
+        data = np.array(rows, dtype=np.float64)
+        return data[:, 0].astype(np.int64), data[:, 1:]
+
+    def _transform(self, raw):
+        raw = np.array(raw, dtype=np.float64, ndmin=2)
+        for column in self.spec['log_columns']:
+            j = self.spec['columns'].index(column)
+            raw[:, j] = np.log10(np.maximum(raw[:, j], 1e-9))
+        return raw
+
+    def _normalize(self, raw):
+        return ((self._transform(raw) - self.mean) / self.std).astype(np.float32)
+
+    # Building
+
+    def build(self, conn):
+        """Index every row from scratch"""
+        last_key = self._last_key(conn)
+        # Taken before the rows are read, so an edit in between shows up as a change next update
+        self.fingerprint = self._fingerprint(conn, last_key)
+        keys, raw = self._load_rows(conn, upto_key=last_key)
+        features = self._transform(raw)
+        self.mean = features.mean(axis=0) if len(features) else np.zeros(features.shape[1])
+        std = features.std(axis=0) if len(features) else np.ones(features.shape[1])
+        self.std = np.where(std > 0, std, 1.0)
+        self.keys = keys
+        self.points = ((features - self.mean) / self.std).astype(np.float32)
+        self.delta_keys = np.empty(0, dtype=np.int64)
+        self.delta_points = np.empty((0, self.points.shape[1]), dtype=np.float32)
+        self.max_key = last_key
+        self.tree = KDTree(self.points, self.leaf_size)
+        return len(keys)
+
+    def update(self, conn):
+        """Bring the index up to date; returns the number of rows added, or indexed if rebuilt.
+
+        New rows are appended to the delta buffer. If rows already indexed
+        were edited or deleted the whole index is rebuilt.
+        """
+        if self.tree is None or self._fingerprint(conn, self.max_key) != self.fingerprint:
+            return self.build(conn)
+        last_key = self._last_key(conn)
+        if last_key <= self.max_key:
+            return 0
+        fingerprint = self._fingerprint(conn, last_key)
+        keys, raw = self._load_rows(conn, self.max_key, last_key)
+        self.fingerprint = fingerprint
+        self.max_key = last_key
+        if not len(keys):
+            return 0
+        self.delta_keys = np.concatenate((self.delta_keys, keys))
+        self.delta_points = np.concatenate((self.delta_points, self._normalize(raw)))
+        if len(self.delta_keys) > self.rebuild_fraction * max(len(self.keys), 1):
+            self._merge_delta()
+        return len(keys)
+
+    def _merge_delta(self):
+        """Fold the delta buffer into the tree (normalisation statistics are kept)"""
+        self.keys = np.concatenate((self.keys, self.delta_keys))
+        self.points = np.concatenate((self.points, self.delta_points))
+        self.delta_keys = np.empty(0, dtype=np.int64)
+        self.delta_points = np.empty((0, self.points.shape[1]), dtype=np.float32)
+        self.tree = KDTree(self.points, self.leaf_size)
+
+    # Queries
+
+    def query(self, features, k=10):
+        """k nearest rows to a raw feature vector as (key, distance) pairs, closest first"""
+        point = self._normalize(features)[0]
+        distances, positions = self.tree.query(point, k)
+        keys = self.keys[positions]
+        if len(self.delta_keys):
+            diff = self.delta_points - point
+            delta_d = np.einsum('ij,ij->i', diff, diff)
+            distances = np.concatenate((distances, delta_d))
+            keys = np.concatenate((keys, self.delta_keys))
+            ordered = np.argsort(distances, kind='stable')[:k]
+            distances, keys = distances[ordered], keys[ordered]
+        return [(int(key), float(np.sqrt(d))) for key, d in zip(keys, distances)]
+
+    def query_key(self, conn, key, k=10):
+        """Rows most similar to an existing row, excluding the row itself"""
+        spec = self.spec
+        row = conn.execute(f"SELECT {', '.join(spec['columns'])} FROM {spec['table']} WHERE {spec['key']} = ?",
+                           (key,)).fetchone()
+        if row is None or None in row:
+            raise ValueError(f"No complete {self.feature_set} features for {spec['key']} {key}")
+        return [match for match in self.query(row, k + 1) if match[0] != key][:k]
+
+    # Persistence
+
+    def save(self, path):
+        meta = {'feature_set': self.feature_set, 'leaf_size': self.leaf_size,
+                'rebuild_fraction': self.rebuild_fraction, 'max_key': self.max_key,
+                'fingerprint': self.fingerprint, 'columns': self.spec['columns']}
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        order, split_dim, split_value, left, right, start, end = self.tree.arrays()
+        np.savez(path, meta=np.array(json.dumps(meta)), mean=self.mean, std=self.std,
+                 keys=self.keys, points=self.points,
+                 delta_keys=self.delta_keys, delta_points=self.delta_points,
+                 order=order, split_dim=split_dim, split_value=split_value,
+                 left=left, right=right, start=start, end=end)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            index = cls(meta['feature_set'], meta['leaf_size'], meta['rebuild_fraction'])
+            if meta['columns'] != index.spec['columns']:
+                raise ValueError(f"{path} was built with different feature columns; rebuild it")
+            index.mean, index.std = data['mean'], data['std']
+            index.keys, index.points = data['keys'], data['points']
+            index.delta_keys, index.delta_points = data['delta_keys'], data['delta_points']
+            index.max_key = meta['max_key']
+            # Indexes saved without one are rebuilt on the next update
+            index.fingerprint = meta.get('fingerprint')
+            arrays = tuple(data[name] for name in ('order', 'split_dim', 'split_value', 'left', 'right',
+                                                    'start', 'end'))
+        index.tree = KDTree(index.points, index.leaf_size, _arrays=arrays)
+        return index
+
+def index_path(index_dir, feature_set):
+    return Path(index_dir) / f"{feature_set}_index.npz"
+
+def open_index(conn, feature_set, index_dir='indexes'):
+    """Load a saved index, bring it up to date, save it again and return it"""
+    path = index_path(index_dir, feature_set)
+    if path.exists():
+        index = SimilarityIndex.load(path)
+        if not index.update(conn):
+            return index
+    else:
+        index = SimilarityIndex(feature_set)
+        index.build(conn)
+    index.save(path)
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find acoustically similar spaces or materials')
+    parser.add_argument('feature_set', choices=list(FEATURE_SETS))
+    parser.add_argument('--db', default='project_management.db')
+    parser.add_argument('--index-dir', default='indexes')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the index from scratch')
+    parser.add_argument('--key', type=int, help='find rows similar to this space_id/material_id')
+    parser.add_argument('--features', type=float, nargs='+', help='find rows similar to this raw vector')
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    if args.rebuild:
+        index = SimilarityIndex(args.feature_set)
+        print(f"Indexed {index.build(conn)} rows")
+        index.save(index_path(args.index_dir, args.feature_set))
+    else:
+        index = open_index(conn, args.feature_set, args.index_dir)
+
+    if args.key is not None:
+        matches = index.query_key(conn, args.key, args.k)
+    elif args.features:
+        matches = index.query(args.features, args.k)
+    else:
+        matches = []
+    conn.close()
+
+    key_name = FEATURE_SETS[args.feature_set]['key']
+    for key, distance in matches:
+        print(f"{key_name} {key}: distance {distance:.4f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+import sqlite3
+import os
+import sys
+import json
+import lzma
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST_NAME = 'manifest.json'
+CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_SNAPSHOT_DIR = 'snapshots'
+
+# Compression codecs: (file extension, default level)
+CODECS = {
+    'zstd': ('zst', 3),
+    'lzma': ('xz', 6),
+}
+
+def default_compression():
+    return 'zstd' if zstandard is not None else 'lzma'
+
+def _compressor(compression, level):
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd snapshots require zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=level).compress
+    if compression == 'lzma':
+        return lambda data: lzma.compress(data, preset=level)
+    raise ValueError(f"Unknown compression '{compression}', expected one of {list(CODECS)}")
+
+def _codec_errors():
+    return (lzma.LZMAError,) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+def _decompressor(compression):
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd snapshots require zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress
+    if compression == 'lzma':
+        return lzma.decompress
+    raise ValueError(f"Unknown compression '{compression}', expected one of {list(CODECS)}")
+
+def table_manifest(conn):
+    """Row count and content checksum of every table, in rowid order"""
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+    manifest = {}
+    for table in tables:
+        try:
+            cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+        except sqlite3.OperationalError:
+            cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY 1')  # WITHOUT ROWID tables
+        digest = hashlib.sha256()
+        rows = 0
+        while True:
+            batch = cursor.fetchmany(10000)
+            if not batch:
+                break
+            rows += len(batch)
+            digest.update(repr(batch).encode())
+        manifest[table] = {'rows': rows, 'sha256': digest.hexdigest()}
+    return manifest
+
+# Snapshots
+
+def take_snapshot(db_path='project_management.db', snapshot_dir=DEFAULT_SNAPSHOT_DIR, compression=None,
+                  level=None, chunk_size=CHUNK_SIZE, workers=4, label=None):
+    """Copy a live database with the backup API and store it as compressed chunks.
+
+    The backup gives a consistent copy even while other connections write.
+    The copy is split into ``chunk_size`` pieces compressed independently
+    on a thread pool, so a restore can decompress them in parallel. The
+    manifest records each chunk's checksum, the whole file's checksum and
+    every table's row count and content checksum. Returns the snapshot
+    directory.
+    """
+    compression = compression or default_compression()
+    extension, default_level = CODECS[compression]
+    compress = _compressor(compression, default_level if level is None else level)
+
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    name = f"{Path(db_path).stem}_{stamp}" + (f"_{label}" if label else '')
+    target = Path(snapshot_dir) / name
+    target.mkdir(parents=True)
+    copy_path = target / 'backup.db'
+
+    source = sqlite3.connect(db_path)
+    copy = sqlite3.connect(copy_path)
+    try:
+        source.backup(copy)
+        tables = table_manifest(copy)
+        page_size = copy.execute('PRAGMA page_size').fetchone()[0]
+    finally:
+        copy.close()
+        source.close()
+
+    def compress_chunk(index, data):
+        chunk_name = f"chunk_{index:06d}.{extension}"
+        (target / chunk_name).write_bytes(compress(data))
+        return {'file': chunk_name, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+
+    file_digest = hashlib.sha256()
+    chunks = []
+    with ThreadPoolExecutor(max_workers=workers) as pool, open(copy_path, 'rb') as f:
+        pending = []
+        index = 0
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            file_digest.update(data)
+            pending.append(pool.submit(compress_chunk, index, data))
+            index += 1
+            # Bound the number of raw chunks held in memory
+            if len(pending) >= workers * 2:
+                chunks.append(pending.pop(0).result())
+        chunks.extend(future.result() for future in pending)
+    size = copy_path.stat().st_size
+    copy_path.unlink()
+
+    manifest = {
+        'format': 1,
+        'source': str(Path(db_path).resolve()),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'label': label,
+        'compression': compression,
+        'chunk_size': chunk_size,
+        'size': size,
+        'page_size': page_size,
+        'sha256': file_digest.hexdigest(),
+        'chunks': chunks,
+        'tables': tables,
+    }
+    with open(target / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return target
+
+def load_manifest(snapshot):
+    with open(Path(snapshot) / MANIFEST_NAME, 'r') as f:
+        return json.load(f)
+
+def list_snapshots(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """(path, manifest) of every snapshot, newest first"""
+    root = Path(snapshot_dir)
+    if not root.exists():
+        return []
+    snapshots = [(path, load_manifest(path)) for path in root.iterdir() if (path / MANIFEST_NAME).exists()]
+    return sorted(snapshots, key=lambda item: item[1]['created_at'], reverse=True)
+
+def _read_chunk(snapshot, manifest, chunk):
+    decompress = _decompressor(manifest['compression'])
+    try:
+        data = decompress((Path(snapshot) / chunk['file']).read_bytes())
+    except _codec_errors():
+        raise RuntimeError(f"Snapshot chunk {chunk['file']} is corrupt")
+    if len(data) != chunk['size'] or hashlib.sha256(data).hexdigest() != chunk['sha256']:
+        raise RuntimeError(f"Snapshot chunk {chunk['file']} is corrupt")
+    return data
+
+def verify_snapshot(snapshot, workers=4):
+    """Decompress every chunk and check it against the manifest without writing anything"""
+    manifest = load_manifest(snapshot)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        sizes = list(pool.map(lambda chunk: len(_read_chunk(snapshot, manifest, chunk)), manifest['chunks']))
+    if sum(sizes) != manifest['size']:
+        raise RuntimeError(f"Snapshot {snapshot} is incomplete")
+    return manifest
+
+def _remove_journals(path):
+    for suffix in ('-wal', '-shm', '-journal'):
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
+
+def restore_snapshot(snapshot, db_path='project_management.db', workers=4, verify=True):
+    """Rebuild a database file from a snapshot and swap it into place.
+
+    Chunks are decompressed in parallel and written at their offsets into a
+    temporary file. With ``verify`` the file checksum, ``PRAGMA
+    quick_check`` and every table's row count and checksum must match the
+    manifest before the database is replaced; otherwise the existing
+    database is left untouched. No connection should have the target open.
+    """
+    manifest = load_manifest(snapshot)
+    temp_path = Path(f"{db_path}.restore")
+    if temp_path.exists():
+        temp_path.unlink()
+
+    offsets = []
+    offset = 0
+    for chunk in manifest['chunks']:
+        offsets.append(offset)
+        offset += chunk['size']
+
+    try:
+        fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, manifest['size'])
+
+            def restore_chunk(chunk, chunk_offset):
+                os.pwrite(fd, _read_chunk(snapshot, manifest, chunk), chunk_offset)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(restore_chunk, manifest['chunks'], offsets))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        if verify:
+            digest = hashlib.sha256()
+            with open(temp_path, 'rb') as f:
+                for data in iter(lambda: f.read(manifest['chunk_size']), b''):
+                    digest.update(data)
+            if digest.hexdigest() != manifest['sha256']:
+                raise RuntimeError("Restored file checksum does not match the snapshot")
+            # immutable: a snapshot of a WAL database would otherwise get -wal/-shm files
+            conn = sqlite3.connect(f"{temp_path.resolve().as_uri()}?mode=ro&immutable=1", uri=True)
+            try:
+                check = conn.execute('PRAGMA quick_check').fetchone()[0]
+                if check != 'ok':
+                    raise RuntimeError(f"Restored database failed quick_check: {check}")
+                tables = table_manifest(conn)
+            finally:
+                conn.close()
+            if tables != manifest['tables']:
+                mismatched = sorted(table for table in set(tables) | set(manifest['tables'])
+                                    if tables.get(table) != manifest['tables'].get(table))
+                raise RuntimeError(f"Restored tables differ from the snapshot: {', '.join(mismatched)}")
+    except BaseException:
+        _remove_journals(temp_path)
+        temp_path.unlink(missing_ok=True)
+        raise
+    _remove_journals(temp_path)
+
+    # Journals from the replaced database would corrupt the restored one
+    _remove_journals(db_path)
+    os.replace(temp_path, db_path)
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compressed snapshots of the project database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    take = subparsers.add_parser('take', help='snapshot a (possibly live) database')
+    take.add_argument('--db', default='project_management.db')
+    take.add_argument('--dir', default=DEFAULT_SNAPSHOT_DIR)
+    take.add_argument('--compression', choices=list(CODECS))
+    take.add_argument('--level', type=int)
+    take.add_argument('--workers', type=int, default=4)
+    take.add_argument('--label')
+
+    restore = subparsers.add_parser('restore', help='replace a database with a snapshot')
+    restore.add_argument('snapshot')
+    restore.add_argument('--db', default='project_management.db')
+    restore.add_argument('--workers', type=int, default=4)
+    restore.add_argument('--no-verify', action='store_true')
+
+    verify = subparsers.add_parser('verify', help='check a snapshot against its manifest')
+    verify.add_argument('snapshot')
+    verify.add_argument('--workers', type=int, default=4)
+
+    listing = subparsers.add_parser('list', help='list snapshots, newest first')
+    listing.add_argument('--dir', default=DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'take':
+        path = take_snapshot(args.db, args.dir, args.compression, args.level, workers=args.workers,
+                             label=args.label)
+        manifest = load_manifest(path)
+        stored = sum((path / chunk['file']).stat().st_size for chunk in manifest['chunks'])
+        print(f"Snapshot {path}: {manifest['size'] / 1e6:.1f} MB -> {stored / 1e6:.1f} MB "
+              f"({manifest['compression']}, {len(manifest['chunks'])} chunks)")
+    elif args.command == 'restore':
+        try:
+            manifest = restore_snapshot(args.snapshot, args.db, args.workers, verify=not args.no_verify)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        print(f"Restored {args.db} from {args.snapshot} ({len(manifest['tables'])} tables)")
+    elif args.command == 'verify':
+        try:
+            manifest = verify_snapshot(args.snapshot, args.workers)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        print(f"{args.snapshot} is intact ({len(manifest['chunks'])} chunks)")
+    else:
+        for path, manifest in list_snapshots(args.dir):
+            label = f" [{manifest['label']}]" if manifest.get('label') else ''
+            print(f"{manifest['created_at']}  {path}{label}  {manifest['size'] / 1e6:.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import sqlite3
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from reference_catalogs import NRC_BANDS, SOUND_POWER_BANDS
+from material_normalization import has_material_catalog
+
+SPECTRUM_DTYPE = np.dtype('<f4')
+
+THIRD_OCTAVE_CENTERS = [25, 31.5, 40, 50, 63, 80, 100, 125, 160, 200, 250, 315, 400, 500, 630, 800,
+                        1000, 1250, 1600, 2000, 2500, 3150, 4000, 5000, 6300, 8000, 10000, 12500,
+                        16000, 20000]
+
+# Layouts available out of the box: (name, resolution, center frequencies)
+STANDARD_LAYOUTS = [
+    ('octave_125_4000', 'octave', [125, 250, 500, 1000, 2000, 4000]),
+    ('octave_125_8000', 'octave', [125, 250, 500, 1000, 2000, 4000, 8000]),
+    ('third_octave_100_5000', 'third_octave', THIRD_OCTAVE_CENTERS[6:24]),
+    ('third_octave_50_10000', 'third_octave', THIRD_OCTAVE_CENTERS[3:27]),
+]
+
+BAND_LAYOUTS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS band_layouts (
+    layout_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    resolution TEXT NOT NULL CHECK (resolution IN ('octave', 'third_octave')),
+    band_count INTEGER NOT NULL,
+    center_frequencies TEXT NOT NULL  -- JSON list of Hz
+);
+'''
+
+# Tables with spectrum columns: prefix of the BLOB/layout columns, the octave
+# scalar columns kept in sync, their centers, how thirds combine into an
+# octave, and the default layout for backfilling from the scalars.
+SPECTRUM_TABLES = {
+    'equipment': {
+        'key': 'equipment_id',
+        'prefix': 'sound_power',
+        'scalar_columns': list(SOUND_POWER_BANDS),
+        'scalar_centers': [125, 250, 500, 1000, 2000, 4000, 8000],
+        'combine': 'energy',  # sound power levels in dB add as energy
+        'default_layout': 'octave_125_8000',
+    },
+    'acoustic_materials': {
+        'key': 'material_id',
+        'prefix': 'absorption',
+        'scalar_columns': list(NRC_BANDS),
+        'scalar_centers': [125, 250, 500, 1000, 2000, 4000],
+        'combine': 'mean',  # absorption coefficients average
+        'default_layout': 'octave_125_4000',
+    },
+}
+# With a normalized catalog, material spectra belong to the catalog entries
+SPECTRUM_TABLES['material_catalog'] = dict(SPECTRUM_TABLES['acoustic_materials'], key='catalog_id')
+
+def _materials_table(conn):
+    return 'material_catalog' if has_material_catalog(conn) else 'acoustic_materials'
+
+def spectrum_tables(conn):
+    """Tables that carry spectrum columns in this database"""
+    return ['equipment', _materials_table(conn)]
+
+def enable_spectral_storage(conn):
+    """Create band_layouts and add the optional spectrum/layout columns"""
+    conn.executescript(BAND_LAYOUTS_SCHEMA)
+    conn.executemany('''
+    INSERT OR IGNORE INTO band_layouts (name, resolution, band_count, center_frequencies)
+    VALUES (?, ?, ?, ?)
+    ''', [(name, resolution, len(centers), json.dumps(centers)) for name, resolution, centers in STANDARD_LAYOUTS])
+
+    for table in spectrum_tables(conn):
+        prefix = SPECTRUM_TABLES[table]['prefix']
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        if f'{prefix}_spectrum' not in columns:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {prefix}_spectrum BLOB')
+        if f'{prefix}_layout' not in columns:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {prefix}_layout INTEGER REFERENCES band_layouts(layout_id)')
+    conn.commit()
+
+def add_layout(conn, name, resolution, centers):
+    """Register a custom band layout; returns its layout_id"""
+    conn.execute('''
+    INSERT OR IGNORE INTO band_layouts (name, resolution, band_count, center_frequencies)
+    VALUES (?, ?, ?, ?)
+    ''', (name, resolution, len(centers), json.dumps(list(centers))))
+    return get_layout(conn, name)[0]
+
+def get_layout(conn, layout):
+    """(layout_id, name, resolution, centers) by name or id"""
+    column = 'layout_id' if isinstance(layout, int) else 'name'
+    row = conn.execute(f'''
+    SELECT layout_id, name, resolution, center_frequencies FROM band_layouts WHERE {column} = ?
+    ''', (layout,)).fetchone()
+    if row is None:
+        raise ValueError(f"Unknown band layout: {layout}")
+    return row[0], row[1], row[2], json.loads(row[3])
+
+# Packing
+
+def pack_spectrum(values):
+    return np.asarray(values, dtype=SPECTRUM_DTYPE).tobytes()
+
+def unpack_spectrum(blob):
+    """One spectrum as a read-only float32 view over the BLOB"""
+    return np.frombuffer(blob, dtype=SPECTRUM_DTYPE)
+
+def octave_bands(matrix, centers, resolution, octave_centers, combine):
+    """Octave values from spectra at `centers`.
+
+    Octave-resolution input is picked band by band; third-octave input is
+    combined from the three thirds around each octave center (energy sum
+    for levels, mean for coefficients). Octave bands that can't be formed
+    from the layout come back as NaN.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    position = {float(center): i for i, center in enumerate(centers)}
+    octaves = np.full((matrix.shape[0], len(octave_centers)), np.nan)
+    for j, center in enumerate(octave_centers):
+        i = position.get(float(center))
+        if i is None:
+            continue
+        if resolution == 'octave':
+            octaves[:, j] = matrix[:, i]
+        elif 0 < i < len(centers) - 1:
+            thirds = matrix[:, i - 1:i + 2]
+            if combine == 'energy':
+                octaves[:, j] = 10 * np.log10(np.sum(10 ** (thirds / 10), axis=1))
+            else:
+                octaves[:, j] = thirds.mean(axis=1)
+    return octaves
+
+# Writing
+
+def write_spectra(conn, table, spectra, layout):
+    """Store spectra for existing rows and refresh their octave scalar columns.
+
+    ``spectra`` is a sequence of (row_id, values) pairs, all in ``layout``.
+    The scalar band columns are derived from the same spectra in the same
+    statement, so the two representations never drift apart.
+    """
+    spec = SPECTRUM_TABLES[table]
+    layout_id, _, resolution, centers = get_layout(conn, layout)
+    if not spectra:
+        return 0
+    row_ids = [row_id for row_id, _ in spectra]
+    matrix = np.asarray([values for _, values in spectra], dtype=SPECTRUM_DTYPE)
+    if matrix.ndim != 2 or matrix.shape[1] != len(centers):
+        raise ValueError(f"Layout {layout} has {len(centers)} bands, got spectra of shape {matrix.shape}")
+
+    octaves = octave_bands(matrix, centers, resolution, spec['scalar_centers'], spec['combine'])
+    octaves = np.round(octaves, 2).astype(object)
+    octaves[np.isnan(octaves.astype(float))] = None
+
+    assignments = ', '.join(f'{column} = ?' for column in spec['scalar_columns'])
+    conn.executemany(f'''
+    UPDATE {table}
+    SET {spec['prefix']}_spectrum = ?, {spec['prefix']}_layout = ?, {assignments}
+    WHERE {spec['key']} = ?
+    ''', [(row.tobytes(), layout_id, *octave_row, row_id)
+          for row, octave_row, row_id in zip(matrix, octaves.tolist(), row_ids)])
+    conn.commit()
+    return len(row_ids)
+
+def backfill_spectra(conn, table=None, batch_size=10000):
+    """Pack the octave scalar columns into spectra for rows that have none yet"""
+    tables = [table] if table else spectrum_tables(conn)
+    filled = {}
+    for table in tables:
+        spec = SPECTRUM_TABLES[table]
+        layout_id = get_layout(conn, spec['default_layout'])[0]
+        filled[table] = 0
+        last_id = -1
+        while True:
+            # Keyset batches, so no cursor stays open on the table being updated
+            rows = conn.execute(f'''
+            SELECT {spec['key']}, {', '.join(spec['scalar_columns'])} FROM {table}
+            WHERE {spec['prefix']}_spectrum IS NULL AND {spec['key']} > ?
+            ORDER BY {spec['key']} LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            # NULL bands become NaN in the packed spectrum
+            matrix = np.array([row[1:] for row in rows], dtype=np.float64).astype(SPECTRUM_DTYPE)
+            conn.executemany(f'''
+            UPDATE {table} SET {spec['prefix']}_spectrum = ?, {spec['prefix']}_layout = ?
+            WHERE {spec['key']} = ?
+            ''', [(spectrum.tobytes(), layout_id, row[0]) for spectrum, row in zip(matrix, rows)])
+            filled[table] += len(rows)
+        conn.commit()
+    return filled
+
+# Reading
+
+def read_spectra(conn, table, where=None, params=(), layout=None):
+    """Spectra of a whole query as one (rows × bands) float32 matrix.
+
+    The BLOBs are joined into a single buffer and viewed with
+    ``np.frombuffer``, so no per-value Python floats are created. Returns
+    (row ids, layout name, centers, matrix). All rows must share one
+    layout; pass ``layout`` to select it when a table mixes layouts.
+    """
+    spec = SPECTRUM_TABLES[table]
+    prefix = spec['prefix']
+    conditions = [f'{prefix}_spectrum IS NOT NULL']
+    params = list(params)
+    if where:
+        conditions.append(f'({where})')
+    if layout is not None:
+        conditions.append(f'{prefix}_layout = ?')
+        params.append(get_layout(conn, layout)[0])
+
+    rows = conn.execute(f'''
+    SELECT {spec['key']}, {prefix}_layout, {prefix}_spectrum FROM {table}
+    WHERE {' AND '.join(conditions)}
+    ORDER BY {spec['key']}
+    ''', params).fetchall()
+    if not rows:
+        name = layout or spec['default_layout']
+        centers = get_layout(conn, name)[3]
+        return np.empty(0, dtype=np.int64), name, centers, np.empty((0, len(centers)), dtype=SPECTRUM_DTYPE)
+
+    layout_ids = {row[1] for row in rows}
+    if len(layout_ids) > 1:
+        raise ValueError(f"Query mixes band layouts {sorted(layout_ids)}; pass layout= to pick one")
+    _, name, _, centers = get_layout(conn, layout_ids.pop())
+
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    matrix = np.frombuffer(b''.join(row[2] for row in rows), dtype=SPECTRUM_DTYPE)
+    return ids, name, centers, matrix.reshape(len(rows), len(centers))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Enable packed spectrum columns and backfill them')
+    parser.add_argument('--db', default='project_management.db')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    enable_spectral_storage(conn)
+    for table, count in backfill_spectra(conn).items():
+        print(f"Packed {count} {table} spectra")
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
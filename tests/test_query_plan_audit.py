@@ -0,0 +1,13 @@
+from query_plan_audit import audit, compare_to_baseline, load_baseline, run_workload
+
+def test_no_plan_regressions(tmp_path):
+    db_path, statements = run_workload(tmp_path)
+    regressions = compare_to_baseline(audit(db_path, statements), load_baseline())
+    assert regressions == [], (
+        "Statements gained plan flags; fix the query or index, or accept the plans with "
+        "python query_plan_audit.py --write-baseline")
+
+def test_new_flag_is_a_regression():
+    records = [{'sql': 'SELECT * FROM projects WHERE client_name = ?', 'flags': ['full_scan:projects']}]
+    assert compare_to_baseline(records, {}) == [(records[0]['sql'], ['full_scan:projects'])]
+    assert compare_to_baseline(records, {records[0]['sql']: ['full_scan:projects']}) == []